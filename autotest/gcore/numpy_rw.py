@@ -966,3 +966,85 @@ def test_numpy_rw_band_read_as_array_getlasterrormsg():
     with gdaltest.error_handler():
         assert ds.GetRasterBand(1).ReadAsArray() is None
     assert gdal.GetLastErrorMsg() != ""
+
+
+###############################################################################
+# Test Band.SamplePoints() and Dataset.SamplePoints()
+
+
+def test_numpy_rw_sample_points():
+
+    ds = gdal.GetDriverByName("GTiff").Create(
+        "/vsimem/sample_points.tif",
+        40,
+        30,
+        2,
+        gdal.GDT_Float32,
+        options=["TILED=YES", "BLOCKXSIZE=16", "BLOCKYSIZE=16"],
+    )
+    ds.SetGeoTransform([1000, 10, 0, 2000, 0, -10])
+    data = numpy.arange(40 * 30, dtype=numpy.float32).reshape(30, 40)
+    ds.GetRasterBand(1).WriteArray(data)
+    ds.GetRasterBand(2).WriteArray(-data)
+    ds.GetRasterBand(2).SetNoDataValue(-1)
+
+    numpy.random.seed(0)
+    xs = numpy.random.uniform(0, 40, 500)
+    ys = numpy.random.uniform(0, 30, 500)
+
+    # Nearest neighbour
+    values = ds.GetRasterBand(1).SamplePoints(xs, ys)
+    assert values.dtype == numpy.float64
+    assert numpy.array_equal(values, data[ys.astype(int), xs.astype(int)])
+
+    # Georeferenced coordinates, several bands and 2D arrays
+    values = ds.SamplePoints(
+        (1000 + xs * 10).reshape(20, 25),
+        (2000 - ys * 10).reshape(20, 25),
+        georeferenced=True,
+    )
+    assert values.shape == (2, 20, 25)
+    assert numpy.array_equal(
+        values[1].ravel(), -data[ys.astype(int), xs.astype(int)].astype(numpy.float64)
+    )
+
+    # Bilinear and cubic against RasterIO of 1x1 windows
+    for resample_alg in (gdal.GRIORA_Bilinear, gdal.GRIORA_Cubic):
+        inside = (xs > 2) & (xs < 38) & (ys > 2) & (ys < 28)
+        values = ds.GetRasterBand(1).SamplePoints(
+            xs[inside], ys[inside], resample_alg=resample_alg
+        )
+        for value, x, y in zip(values, xs[inside], ys[inside]):
+            expected = ds.GetRasterBand(1).ReadAsArray(
+                x - 0.5,
+                y - 0.5,
+                1,
+                1,
+                buf_type=gdal.GDT_Float64,
+                resample_alg=resample_alg,
+            )[0][0]
+            assert value == pytest.approx(expected, rel=1e-5)
+
+    # Nodata pixels are left out of the kernel
+    values = ds.GetRasterBand(2).SamplePoints(
+        [1.0, 0.5], [0.5, 0.5], gdal.GRIORA_Bilinear
+    )
+    assert list(values) == [0, 0]
+
+    # Points outside of the raster
+    values = ds.SamplePoints([-1, 40, 5], [5, 5, 30])
+    assert values.tolist() == [[0, 0, 0], [-1, -1, -1]]
+
+    with pytest.raises(ValueError, match="same shape"):
+        ds.GetRasterBand(1).SamplePoints([1, 2], [1])
+
+    gdal.ErrorReset()
+    with gdaltest.error_handler():
+        assert (
+            ds.GetRasterBand(1).SamplePoints([1], [1], resample_alg=gdal.GRIORA_Lanczos)
+            is None
+        )
+    assert gdal.GetLastErrorMsg() != ""
+
+    ds = None
+    gdal.Unlink("/vsimem/sample_points.tif")
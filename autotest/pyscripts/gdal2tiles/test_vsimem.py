@@ -29,6 +29,8 @@
 # DEALINGS IN THE SOFTWARE.
 ###############################################################################
 
+import pytest
+
 from osgeo import gdal
 from osgeo_utils import gdal2tiles
 
@@ -51,3 +53,71 @@ def test_gdal2tiles_vsimem():
         ]
     )
     gdal.RmdirRecursive("/vsimem/gdal2tiles")
+
+
+def test_gdal2tiles_vsimem_antialias():
+    pytest.importorskip("numpy")
+
+    gdal2tiles.main(
+        argv=[
+            "gdal2tiles",
+            "-q",
+            "-r",
+            "antialias",
+            "../../gcore/data/byte.tif",
+            "/vsimem/gdal2tiles",
+        ]
+    )
+
+    ds = gdal.Open("/vsimem/gdal2tiles/14/2837/9833.png")
+    assert ds is not None
+    assert ds.RasterCount == 2
+    assert ds.GetRasterBand(1).Checksum() != 0
+    ds = None
+    gdal.RmdirRecursive("/vsimem/gdal2tiles")
+
+
+def test_gdal2tiles_lanczos_downsample_constant():
+    numpy = pytest.importorskip("numpy")
+
+    array = numpy.empty((4, 64, 64), numpy.uint8)
+    for i, value in enumerate((10, 120, 250, 255)):
+        array[i] = value
+
+    out = gdal2tiles.lanczos_downsample(array, 16)
+    assert out.shape == (4, 16, 16)
+    for i, value in enumerate((10, 120, 250, 255)):
+        assert numpy.all(out[i] == value)
+
+
+def test_gdal2tiles_lanczos_downsample_transparent():
+    numpy = pytest.importorskip("numpy")
+
+    # Opaque red on the right, fully transparent cyan on the left
+    array = numpy.zeros((4, 64, 64), numpy.uint8)
+    array[0, :, 32:] = 255
+    array[1:3, :, :32] = 255
+    array[3, :, 32:] = 255
+
+    out = gdal2tiles.lanczos_downsample(array, 16)
+    assert numpy.all(out[3, :, :4] == 0)
+    assert numpy.all(out[3, :, 9:] >= 250)
+    # The color of the transparent pixels does not bleed
+    assert numpy.all(out[0][out[3] > 0] == 255)
+    assert numpy.all(out[1:3] == 0)
+
+
+def test_gdal2tiles_lanczos_downsample_gradient():
+    numpy = pytest.importorskip("numpy")
+
+    y, x = numpy.mgrid[0:64, 0:64]
+    array = numpy.empty((4, 64, 64), numpy.uint8)
+    array[0] = x * 2
+    array[1] = y * 3
+    array[2] = x + y
+    array[3] = 255
+
+    out = gdal2tiles.lanczos_downsample(array, 16)
+    # A linear gradient is downsampled like with a box average
+    ref = array.astype(numpy.float64).reshape(4, 16, 4, 16, 4).mean(axis=(2, 4))
+    assert numpy.abs(out - ref).max() <= 1
@@ -33,12 +33,13 @@ import glob
 import os
 import os.path
 import shutil
+import sqlite3
 import sys
 
 import pytest
 import test_py_scripts  # noqa  # pylint: disable=E0401
 
-from osgeo import gdal  # noqa
+from osgeo import gdal, osr  # noqa
 from osgeo_utils.gdalcompare import compare_db
 
 
@@ -121,6 +122,339 @@ def test_gdal2tiles_py_zoom_option():
     assert ds is not None, "did not get kml"
 
 
+@pytest.mark.parametrize("nb_processes", [1, 2])
+def test_gdal2tiles_py_overview_block_levels(nb_processes):
+
+    script_path = test_py_scripts.get_py_script("gdal2tiles")
+    if script_path is None:
+        pytest.skip()
+
+    out_ref = "tmp/out_gdal2tiles_smallworld_ref"
+    out_blocks = "tmp/out_gdal2tiles_smallworld_blocks"
+    shutil.rmtree(out_ref, ignore_errors=True)
+    shutil.rmtree(out_blocks, ignore_errors=True)
+
+    input_file = test_py_scripts.get_data_path("gdrivers") + "small_world.tif"
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        "-q -z 0-3 --processes=%d %s %s" % (nb_processes, input_file, out_ref),
+    )
+    # Spill all raw buffers to disk with a null memory limit
+    for memory_limit in (256, 0):
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 0-3 --processes=%d --overview-block-levels=2 "
+            "--overview-memory-limit=%d %s %s"
+            % (nb_processes, memory_limit, input_file, out_blocks),
+        )
+
+        ref_tiles = sorted(glob.glob(out_ref + "/*/*/*.png"))
+        block_tiles = sorted(glob.glob(out_blocks + "/*/*/*.png"))
+        assert [x[len(out_ref) :] for x in ref_tiles] == [
+            x[len(out_blocks) :] for x in block_tiles
+        ]
+        for ref_tile, block_tile in zip(ref_tiles, block_tiles):
+            ref_ds = gdal.Open(ref_tile)
+            block_ds = gdal.Open(block_tile)
+            assert [
+                ref_ds.GetRasterBand(i + 1).Checksum()
+                for i in range(ref_ds.RasterCount)
+            ] == [
+                block_ds.GetRasterBand(i + 1).Checksum()
+                for i in range(block_ds.RasterCount)
+            ], block_tile
+
+        shutil.rmtree(out_blocks)
+
+    shutil.rmtree(out_ref)
+
+
+def _get_tile_checksums(output, container):
+    """Return the band checksums of all the tiles of a tile directory or container"""
+
+    checksums = {}
+    if container == "directory":
+        for filename in glob.glob(output + "/*/*/*.png"):
+            tz, tx, ty = filename[len(output) + 1 : -len(".png")].split("/")
+            ds = gdal.Open(filename)
+            checksums[(int(tz), int(tx), int(ty))] = [
+                ds.GetRasterBand(i + 1).Checksum() for i in range(ds.RasterCount)
+            ]
+        return checksums
+
+    conn = sqlite3.connect(output)
+    rows = conn.execute(
+        "SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles"
+    ).fetchall()
+    conn.close()
+    for tz, tx, ty, tile_data in rows:
+        gdal.FileFromMemBuffer("/vsimem/tile.png", tile_data)
+        ds = gdal.Open("/vsimem/tile.png")
+        checksums[(tz, tx, ty)] = [
+            ds.GetRasterBand(i + 1).Checksum() for i in range(ds.RasterCount)
+        ]
+        ds = None
+        gdal.Unlink("/vsimem/tile.png")
+    return checksums
+
+
+@pytest.mark.parametrize("container", ["directory", "mbtiles"])
+def test_gdal2tiles_py_processes(container):
+    """The multi-process scheduler must produce the same tiles as a single process"""
+
+    script_path = test_py_scripts.get_py_script("gdal2tiles")
+    if script_path is None:
+        pytest.skip()
+
+    if container == "mbtiles" and gdal.GetDriverByName("MBTiles") is None:
+        pytest.skip("MBTiles driver missing")
+
+    input_file = test_py_scripts.get_data_path("gdrivers") + "small_world.tif"
+    checksums = []
+    for nb_processes in (1, 2):
+        output = "tmp/out_gdal2tiles_smallworld_processes_%d" % nb_processes
+        if container == "directory":
+            shutil.rmtree(output, ignore_errors=True)
+        else:
+            output += ".mbtiles"
+            gdal.Unlink(output)
+
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 0-4 --processes=%d --container=%s %s %s"
+            % (nb_processes, container, input_file, output),
+        )
+        checksums.append(_get_tile_checksums(output, container))
+
+        if container == "directory":
+            shutil.rmtree(output)
+        else:
+            gdal.Unlink(output)
+
+    # All the zoom levels, including the overview ones, are generated
+    assert set(tz for tz, _, _ in checksums[0]) == {0, 1, 2, 3, 4}
+    assert checksums[0] == checksums[1]
+
+
+@pytest.mark.parametrize("container", ["mbtiles", "gpkg"])
+def test_gdal2tiles_py_container(container):
+
+    script_path = test_py_scripts.get_py_script("gdal2tiles")
+    if script_path is None:
+        pytest.skip()
+
+    driver_name = "MBTiles" if container == "mbtiles" else "GPKG"
+    if gdal.GetDriverByName(driver_name) is None:
+        pytest.skip("%s driver missing" % driver_name)
+
+    out_dir = "tmp/out_gdal2tiles_smallworld_dir"
+    out_container = "tmp/out_gdal2tiles_smallworld." + container
+    shutil.rmtree(out_dir, ignore_errors=True)
+    gdal.Unlink(out_container)
+
+    input_file = test_py_scripts.get_data_path("gdrivers") + "small_world.tif"
+    test_py_scripts.run_py_script_as_external_script(
+        script_path, "gdal2tiles", "-q -z 0-2 %s %s" % (input_file, out_dir)
+    )
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        "-q -z 0-2 --processes=2 --container=%s %s %s"
+        % (container, input_file, out_container),
+    )
+
+    ds = gdal.Open(out_container)
+    assert ds is not None
+    assert ds.GetDriver().ShortName == driver_name
+    assert ds.GetRasterBand(1).GetOverviewCount() == 2
+    ds = None
+
+    table_name = "tiles" if container == "mbtiles" else "out_gdal2tiles_smallworld"
+    conn = sqlite3.connect(out_container)
+    rows = conn.execute(
+        "SELECT zoom_level, tile_column, tile_row, tile_data FROM " + table_name
+    ).fetchall()
+    conn.close()
+    assert len(rows) == len(glob.glob(out_dir + "/*/*/*.png"))
+    for tz, tx, tile_row, tile_data in rows:
+        # MBTiles uses the TMS tile numbering, GeoPackage starts from the top
+        ty = tile_row if container == "mbtiles" else 2**tz - 1 - tile_row
+        gdal.FileFromMemBuffer("/vsimem/tile.png", tile_data)
+        tile_ds = gdal.Open("/vsimem/tile.png")
+        got_cs = [
+            tile_ds.GetRasterBand(i + 1).Checksum() for i in range(tile_ds.RasterCount)
+        ]
+        tile_ds = None
+        gdal.Unlink("/vsimem/tile.png")
+        _verify_raster_band_checksums(
+            "%s/%d/%d/%d.png" % (out_dir, tz, tx, ty), expected_cs=got_cs
+        )
+
+    # An existing container is replaced
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        "-q -z 0-1 --container=%s %s %s" % (container, input_file, out_container),
+    )
+    conn = sqlite3.connect(out_container)
+    assert conn.execute("SELECT MAX(zoom_level) FROM " + table_name).fetchone() == (1,)
+    conn.close()
+    gdal.Unlink(out_container)
+
+    # but not an existing directory
+    ret = test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        "-q -z 0-1 --container=%s %s %s" % (container, input_file, out_dir),
+    )
+    assert "ERROR ret code = 2" in ret
+    assert os.path.isdir(out_dir)
+
+    shutil.rmtree(out_dir)
+
+
+def test_gdal2tiles_py_deduplicate():
+
+    script_path = test_py_scripts.get_py_script("gdal2tiles")
+    if script_path is None:
+        pytest.skip()
+
+    src_filename = "tmp/test_gdal2tiles_py_deduplicate.tif"
+    src_ds = gdal.GetDriverByName("GTiff").Create(src_filename, 512, 512, 3)
+    src_ds.SetGeoTransform([-20, 40.0 / 512, 0, 20, 0, -40.0 / 512])
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(4326)
+    src_ds.SetSpatialRef(srs)
+    for i in range(3):
+        src_ds.GetRasterBand(i + 1).Fill(50 * (i + 1))
+    src_ds = None
+
+    out_ref = "tmp/out_gdal2tiles_deduplicate_ref"
+    out_dedup = "tmp/out_gdal2tiles_deduplicate"
+    shutil.rmtree(out_ref, ignore_errors=True)
+    shutil.rmtree(out_dedup, ignore_errors=True)
+
+    test_py_scripts.run_py_script_as_external_script(
+        script_path, "gdal2tiles", "-q -z 3-5 %s %s" % (src_filename, out_ref)
+    )
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        "-q -z 3-5 --deduplicate %s %s" % (src_filename, out_dedup),
+    )
+
+    ref_tiles = sorted(glob.glob(out_ref + "/*/*/*.png"))
+    dedup_tiles = sorted(glob.glob(out_dedup + "/*/*/*.png"))
+    assert [x[len(out_ref) :] for x in ref_tiles] == [
+        x[len(out_dedup) :] for x in dedup_tiles
+    ]
+    for ref_tile, dedup_tile in zip(ref_tiles, dedup_tiles):
+        ref_ds = gdal.Open(ref_tile)
+        _verify_raster_band_checksums(
+            dedup_tile,
+            expected_cs=[
+                ref_ds.GetRasterBand(i + 1).Checksum()
+                for i in range(ref_ds.RasterCount)
+            ],
+        )
+        ref_ds = None
+
+    # The fully covered tiles of the base level are hard links to a single file
+    if sys.platform != "win32":
+        assert max(os.stat(x).st_nlink for x in dedup_tiles) > 1
+
+    shutil.rmtree(out_ref)
+    shutil.rmtree(out_dedup)
+
+    if gdal.GetDriverByName("MBTiles") is not None:
+        out_mbtiles = "tmp/out_gdal2tiles_deduplicate.mbtiles"
+        gdal.Unlink(out_mbtiles)
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 3-5 --deduplicate --container=mbtiles %s %s"
+            % (src_filename, out_mbtiles),
+        )
+        conn = sqlite3.connect(out_mbtiles)
+        nb_tiles = conn.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+        nb_images = conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+        conn.close()
+        assert nb_tiles == len(ref_tiles)
+        assert nb_images < nb_tiles
+        gdal.Unlink(out_mbtiles)
+
+    gdal.Unlink(src_filename)
+
+
+@pytest.mark.parametrize("changed", ["area", "vrt"])
+def test_gdal2tiles_py_changed_area(changed):
+
+    script_path = test_py_scripts.get_py_script("gdal2tiles")
+    if script_path is None:
+        pytest.skip()
+
+    input_file = test_py_scripts.get_data_path("gdrivers") + "small_world.tif"
+    patch_filename = "tmp/test_gdal2tiles_py_changed_area_patch.tif"
+    old_filename = "tmp/test_gdal2tiles_py_changed_area_old.vrt"
+    new_filename = "tmp/test_gdal2tiles_py_changed_area_new.vrt"
+    out_ref = "tmp/out_gdal2tiles_changed_area_ref"
+    out_inc = "tmp/out_gdal2tiles_changed_area"
+    shutil.rmtree(out_ref, ignore_errors=True)
+    shutil.rmtree(out_inc, ignore_errors=True)
+
+    # Red square over [0,18]x[0,18] on the grid of small_world.tif
+    patch_ds = gdal.GetDriverByName("GTiff").Create(patch_filename, 20, 20, 3)
+    patch_ds.SetGeoTransform([0, 0.9, 0, 18, 0, -0.9])
+    patch_ds.SetProjection(gdal.Open(input_file).GetProjection())
+    patch_ds.GetRasterBand(1).Fill(255)
+    patch_ds = None
+    gdal.BuildVRT(old_filename, [input_file])
+    gdal.BuildVRT(new_filename, [input_file, patch_filename])
+
+    test_py_scripts.run_py_script_as_external_script(
+        script_path, "gdal2tiles", "-q -z 0-4 %s %s" % (new_filename, out_ref)
+    )
+    test_py_scripts.run_py_script_as_external_script(
+        script_path, "gdal2tiles", "-q -z 0-4 %s %s" % (old_filename, out_inc)
+    )
+    # Far from the changed area: not to be generated again
+    os.unlink(out_inc + "/4/0/0.png")
+
+    if changed == "area":
+        option = "--changed-area=0,0,18,18"
+    else:
+        option = "--changed-vrt=" + old_filename
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        "-q -z 0-4 %s %s %s" % (option, new_filename, out_inc),
+    )
+
+    assert not os.path.exists(out_inc + "/4/0/0.png")
+    ref_tiles = sorted(glob.glob(out_ref + "/*/*/*.png"))
+    for ref_tile in ref_tiles:
+        inc_tile = out_inc + ref_tile[len(out_ref) :]
+        if inc_tile == out_inc + "/4/0/0.png":
+            continue
+        ref_ds = gdal.Open(ref_tile)
+        _verify_raster_band_checksums(
+            inc_tile,
+            expected_cs=[
+                ref_ds.GetRasterBand(i + 1).Checksum()
+                for i in range(ref_ds.RasterCount)
+            ],
+        )
+        ref_ds = None
+
+    shutil.rmtree(out_ref)
+    shutil.rmtree(out_inc)
+    for filename in (patch_filename, old_filename, new_filename):
+        gdal.Unlink(filename)
+
+
 def test_gdal2tiles_py_resampling_option():
 
     script_path = test_py_scripts.get_py_script("gdal2tiles")
@@ -144,11 +478,8 @@ def test_gdal2tiles_py_resampling_option():
     ]
     try:
         import numpy
-        from PIL import Image
-
-        import osgeo.gdal_array as gdalarray
 
-        del Image, numpy, gdalarray
+        del numpy
     except ImportError:
         # 'antialias' resampling is not available
         resampling_list.remove("antialias")
@@ -636,14 +967,11 @@ def test_gdal2tiles_py_webp():
     _run_webp_test(script_path, "average")
     try:
         import numpy
-        from PIL import Image
-
-        import osgeo.gdal_array as gdalarray
 
-        del Image, numpy, gdalarray
-        pil_available = True
+        del numpy
+        numpy_available = True
     except ImportError:
-        pil_available = False
+        numpy_available = False
 
-    if pil_available:
+    if numpy_available:
         _run_webp_test(script_path, "antialias")
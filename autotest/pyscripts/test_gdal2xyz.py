@@ -41,7 +41,7 @@ from itertools import product
 
 import numpy as np
 
-from osgeo import gdal
+from osgeo import gdal, ogr
 from osgeo.gdal_array import flip_code
 from osgeo_utils import gdal2xyz
 from osgeo_utils.auxiliary.raster_creation import create_flat_raster
@@ -138,3 +138,119 @@ def test_gdal2xyz_py_3():
 
     assert os.path.exists("tmp/out.xyz")
     os.unlink("tmp/out.xyz")
+
+
+###############################################################################
+# Test the text output with -skip, -srcwin and nodata replacement
+
+
+def test_gdal2xyz_py_4():
+
+    ds = gdal.Open(test_py_scripts.get_data_path("gcore") + "byte.tif")
+    gt = ds.GetGeoTransform()
+    data = ds.GetRasterBand(1).ReadAsArray()
+    src_nodata = int(data[3, 3])
+
+    gdal2xyz.gdal2xyz(
+        ds,
+        "tmp/out.xyz",
+        srcwin=(1, 3, 17, 15),
+        skip=(2, 3),
+        src_nodata=src_nodata,
+        dst_nodata=0,
+        progress_callback=None,
+    )
+
+    expected = []
+    for y in range(3, 3 + 15, 3):
+        for x in range(1, 1 + 17, 2):
+            value = data[y, x]
+            if value == src_nodata:
+                value = 0
+            expected.append(
+                "%.3f %.3f %g"
+                % (gt[0] + (x + 0.5) * gt[1], gt[3] + (y + 0.5) * gt[5], value)
+            )
+
+    with open("tmp/out.xyz") as f:
+        assert f.read().splitlines() == expected
+    os.unlink("tmp/out.xyz")
+
+
+###############################################################################
+# Test the NPZ and Parquet outputs with -threads
+
+
+@pytest.mark.parametrize("output_format", ["NPZ", "Parquet"])
+def test_gdal2xyz_py_columns(output_format):
+
+    if output_format == "Parquet" and ogr.GetDriverByName("Parquet") is None:
+        pytest.skip("Parquet driver missing")
+
+    src_filename = test_py_scripts.get_data_path("gcore") + "byte.tif"
+    geo_x, geo_y, data, _ = gdal2xyz.gdal2xyz(
+        src_filename, None, return_np_arrays=True, progress_callback=None
+    )
+
+    dst_filename = "tmp/out." + output_format.lower()
+    gdal2xyz.gdal2xyz(src_filename, dst_filename, num_threads=2, progress_callback=None)
+
+    if output_format == "NPZ":
+        with np.load(dst_filename) as f:
+            assert list(f.keys()) == ["x", "y", "band_1"]
+            assert np.array_equal(f["x"], geo_x)
+            assert np.array_equal(f["y"], geo_y)
+            assert np.array_equal(f["band_1"], data[0])
+            assert f["band_1"].dtype == np.uint8
+    else:
+        ds = ogr.Open(dst_filename)
+        lyr = ds.GetLayer(0)
+        assert lyr.GetFeatureCount() == len(geo_x)
+        for i, f in enumerate(lyr):
+            assert f["x"] == geo_x[i]
+            assert f["y"] == geo_y[i]
+            assert f["band_1"] == data[0][i]
+        ds = None
+
+    gdal.Unlink(dst_filename)
+
+
+###############################################################################
+# Test the row groups of a Parquet output written with pyarrow, and -skipnodata
+
+
+def test_gdal2xyz_py_parquet_row_groups(monkeypatch):
+
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    src_ds = gdal.GetDriverByName("MEM").Create("", 20, 30, 1, gdal.GDT_Int16)
+    src_ds.SetGeoTransform([500000, 10, 0, 4000000, 0, -10])
+    src_ds.GetRasterBand(1).SetNoDataValue(-1)
+    data = np.arange(600, dtype=np.int16).reshape(30, 20)
+    # a chunk of nodata only, and a partly valid one
+    data[5:10] = -1
+    data[10:13] = -1
+    src_ds.GetRasterBand(1).WriteArray(data)
+
+    ref_geo_x, ref_geo_y, ref_data, _ = gdal2xyz.gdal2xyz(
+        src_ds, None, skip_nodata=True, return_np_arrays=True, progress_callback=None
+    )
+
+    # chunks of 5 rows
+    monkeypatch.setattr(gdal2xyz, "CHUNK_PIXELS", 100)
+    dst_filename = "tmp/out_row_groups.parquet"
+    gdal2xyz.gdal2xyz(
+        src_ds, dst_filename, skip_nodata=True, num_threads=2, progress_callback=None
+    )
+
+    f = pq.ParquetFile(dst_filename)
+    assert [
+        f.metadata.row_group(i).num_rows for i in range(f.metadata.num_row_groups)
+    ] == [100, 40, 100, 100, 100]
+    table = f.read()
+    assert np.array_equal(table["x"].to_numpy(), ref_geo_x)
+    assert np.array_equal(table["y"].to_numpy(), ref_geo_y)
+    assert np.array_equal(table["band_1"].to_numpy(), ref_data[0])
+    f = None
+
+    gdal.Unlink(dst_filename)
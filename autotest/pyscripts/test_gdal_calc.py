@@ -615,6 +615,277 @@ def test_gdal_calc_py_multiple_inputs_same_alpha():
     assert cs == cs_ref
 
 
+@pytest.mark.parametrize("extent", ["union", "intersect"])
+def test_gdal_calc_py_extent(extent):
+    """test inputs with different extents, read at their offset in the output"""
+
+    infile = test_py_scripts.get_data_path("gcore") + "byte.tif"
+
+    shifted = "/vsimem/test_gdal_calc_py_extent.tif"
+    ds = gdal.Translate(shifted, infile, noData=0)
+    gt = ds.GetGeoTransform()
+    ds.SetGeoTransform(
+        (gt[0] + 10 * gt[1], gt[1], gt[2], gt[3] + 5 * gt[5], gt[4], gt[5])
+    )
+    ds = None
+
+    ds = gdal_calc.Calc(
+        "A.astype(numpy.int16)+B",
+        A=infile,
+        B=shifted,
+        extent=extent,
+        type=gdal.GDT_Int16,
+        format="MEM",
+        quiet=True,
+    )
+
+    # compare with the inputs read through VRTs on the output extent
+    gt = ds.GetGeoTransform()
+    bounds = (
+        gt[0],
+        gt[3] + ds.RasterYSize * gt[5],
+        gt[0] + ds.RasterXSize * gt[1],
+        gt[3],
+    )
+    a = gdal.BuildVRT("", infile, outputBounds=bounds).ReadAsArray()
+    b = gdal.BuildVRT("", shifted, outputBounds=bounds).ReadAsArray()
+    expected = a.astype(np.int16) + b
+    expected[b == 0] = -32768
+    assert np.array_equal(ds.GetRasterBand(1).ReadAsArray(), expected)
+
+    gdal.Unlink(shifted)
+
+
+@pytest.mark.parametrize("num_threads", [2, "ALL_CPUS"])
+def test_gdal_calc_py_threads(num_threads):
+    """test calculating blocks in parallel threads"""
+
+    infile = get_input_file()
+
+    # mix of inputs opened from their filename, and shared datasets
+    mem_ds = gdal.Translate("", infile, format="MEM", bandList=[3], noData=0)
+    kwargs = {
+        "calc": ["A+B+C", "sum(D,axis=0)"],
+        "A": infile,
+        "A_band": 1,
+        "B": infile,
+        "B_band": 2,
+        "C": mem_ds,
+        "D": [infile, mem_ds],
+        "type": gdal.GDT_UInt16,
+        "format": "MEM",
+        "quiet": True,
+    }
+    ref_ds = gdal_calc.Calc(**kwargs)
+    ds = gdal_calc.Calc(num_threads=num_threads, **kwargs)
+    for bnd_idx in (1, 2):
+        assert (
+            ds.GetRasterBand(bnd_idx).Checksum()
+            == ref_ds.GetRasterBand(bnd_idx).Checksum()
+        )
+
+
+@pytest.mark.parametrize("calc", ["W", "W[:]", "W.T"])
+def test_gdal_calc_py_user_array_not_modified(calc):
+    """test that propagating nodata does not modify an array given by the user"""
+
+    src_ds = gdal.GetDriverByName("MEM").Create("", 10, 10)
+    src_ds.GetRasterBand(1).SetNoDataValue(0)
+    src_ds.GetRasterBand(1).Fill(1)
+    src_ds.GetRasterBand(1).WriteRaster(0, 0, 10, 1, b"\0" * 10)
+
+    W = np.arange(1, 101, dtype=np.uint8).reshape(10, 10)
+    W_ref = W.copy()
+    ds = gdal_calc.Calc(
+        calc=calc,
+        A=src_ds,
+        NoDataValue=255,
+        format="MEM",
+        user_namespace={"W": W},
+        quiet=True,
+    )
+    assert np.array_equal(W, W_ref)
+
+    expected = W.T.copy() if calc == "W.T" else W.copy()
+    expected[0] = 255
+    assert np.array_equal(ds.GetRasterBand(1).ReadAsArray(), expected)
+
+
+def test_gdal_calc_py_numexpr():
+    """test evaluating the calculations with numexpr"""
+
+    pytest.importorskip("numexpr")
+
+    infile = get_input_file()
+
+    # the second calculation is not supported by numexpr, and evaluated by numpy
+    kwargs = {
+        "calc": ["A*0.5+B", "numpy.max((A,B),axis=0)"],
+        "A": infile,
+        "A_band": 1,
+        "B": infile,
+        "B_band": 2,
+        "type": gdal.GDT_Float32,
+        "NoDataValue": -1,
+        "format": "MEM",
+        "quiet": True,
+    }
+    ref_ds = gdal_calc.Calc(**kwargs)
+    ds = gdal_calc.Calc(use_numexpr=True, **kwargs)
+    for bnd_idx in (1, 2):
+        assert (
+            ds.GetRasterBand(bnd_idx).Checksum()
+            == ref_ds.GetRasterBand(bnd_idx).Checksum()
+        )
+
+
+@pytest.mark.parametrize(
+    "chunk_options",
+    [
+        {"chunk_size": [7, 5]},
+        {"chunk_size": [1000, 1]},
+        {"chunk_memory": 0.001},
+        {"chunk_memory": 0.001, "num_threads": 2},
+    ],
+)
+def test_gdal_calc_py_chunk_size(chunk_options):
+    """test calculating chunks of different sizes"""
+
+    infile = get_input_file()
+
+    kwargs = {
+        "calc": "A*2+B",
+        "A": infile,
+        "A_band": 1,
+        "B": infile,
+        "B_band": 2,
+        "type": gdal.GDT_UInt16,
+        "format": "MEM",
+        "quiet": True,
+    }
+    ref_ds = gdal_calc.Calc(**kwargs)
+    ds = gdal_calc.Calc(**chunk_options, **kwargs)
+    assert ds.GetRasterBand(1).Checksum() == ref_ds.GetRasterBand(1).Checksum()
+
+
+def test_gdal_calc_py_compressed_output():
+    """test writing blocks to a compressed output, while the next ones are read and calculated"""
+
+    infile = get_input_file()
+    outfile = make_temp_filename(10)
+
+    kwargs = {
+        "calc": ["A*2", "A+B"],
+        "A": infile,
+        "A_band": 1,
+        "B": infile,
+        "B_band": 2,
+        "type": gdal.GDT_UInt16,
+        "chunk_size": [16, 16],
+        "quiet": True,
+    }
+    ref_ds = gdal_calc.Calc(format="MEM", **kwargs)
+    gdal_calc.Calc(
+        outfile=outfile,
+        creation_options=["COMPRESS=DEFLATE", "TILED=YES"],
+        overwrite=True,
+        **kwargs,
+    )
+    ds = gdal.Open(outfile)
+    for bnd_idx in (1, 2):
+        assert (
+            ds.GetRasterBand(bnd_idx).Checksum()
+            == ref_ds.GetRasterBand(bnd_idx).Checksum()
+        )
+    ds = None
+
+
+def test_gdal_calc_py_reductions():
+    """test computing statistics, histogram and zonal sums while calculating"""
+
+    infile = get_input_file()
+
+    kwargs = {
+        "calc": ["A*2", "A+B"],
+        "A": infile,
+        "A_band": 1,
+        "B": infile,
+        "B_band": 2,
+        "type": gdal.GDT_UInt16,
+        "NoDataValue": 0,
+        "statistics": True,
+        "histogram": (-0.5, 511.5, 512),
+        "zones": infile,
+        "zones_band": 3,
+        "chunk_size": [32, 16],
+        "quiet": True,
+    }
+    ds = gdal_calc.Calc(format="MEM", **kwargs)
+    reductions = gdal_calc.Calc(**kwargs)
+    assert len(reductions) == 2
+
+    zones = gdal.Open(infile).GetRasterBand(3).ReadAsArray()
+    for bnd_idx in (1, 2):
+        band = ds.GetRasterBand(bnd_idx)
+        stats = band.GetStatistics(False, False)
+        hist = band.GetDefaultHistogram(force=False)
+        zone_metadata = band.GetMetadata("ZONES")
+
+        ref_ds = gdal.Translate("", ds, format="MEM", bandList=[bnd_idx])
+        ref_band = ref_ds.GetRasterBand(1)
+        ref_stats = ref_band.ComputeStatistics(False)
+        assert stats == pytest.approx(ref_stats)
+        assert hist == (
+            -0.5,
+            511.5,
+            512,
+            ref_band.GetHistogram(-0.5, 511.5, 512, False, False),
+        )
+
+        values = ref_band.ReadAsArray()
+        r = reductions[bnd_idx - 1]
+        assert [r.min, r.max, r.mean, r.stddev] == pytest.approx(ref_stats)
+        assert r.count == np.count_nonzero(values)
+        for zone in np.unique(zones):
+            valid = (zones == zone) & (values != 0)
+            if not valid.any():
+                assert zone not in r.zone_counts
+                continue
+            assert r.zone_counts[zone] == np.count_nonzero(valid)
+            assert r.zone_sums[zone] == pytest.approx(values[valid].sum())
+            assert int(zone_metadata[f"ZONE_{zone}_COUNT"]) == r.zone_counts[zone]
+
+
+@pytest.mark.parametrize("num_threads", [1, 2])
+def test_gdal_calc_py_zones_partial_coverage(num_threads):
+    """test that the pixels outside of a zones raster without nodata are in no zone"""
+
+    infile = test_py_scripts.get_data_path("gcore") + "byte.tif"
+
+    # zones 0 and 1 over a window of the input
+    zones_ds = gdal.Translate("", infile, format="MEM", srcWin=[5, 4, 10, 8])
+    assert zones_ds.GetRasterBand(1).GetNoDataValue() is None
+    zones = np.zeros((8, 10), dtype=np.uint8)
+    zones[:, 6:] = 1
+    zones_ds.GetRasterBand(1).WriteArray(zones)
+
+    (r,) = gdal_calc.Calc(
+        "A",
+        A=infile,
+        zones=zones_ds,
+        type=gdal.GDT_UInt16,
+        extent="union",
+        chunk_size=[8, 8],
+        num_threads=num_threads,
+        quiet=True,
+    )
+
+    values = gdal.Open(infile).GetRasterBand(1).ReadAsArray()[4:12, 5:15]
+    assert r.zone_counts == {0: 48, 1: 32}
+    assert r.zone_sums[0] == pytest.approx(values[:, :6].sum())
+    assert r.zone_sums[1] == pytest.approx(values[:, 6:].sum())
+
+
 def test_gdal_calc_py_cleanup():
     """cleanup all temporary files that were created in this pytest"""
     global temp_counter_dict
@@ -34,7 +34,7 @@ import os
 import pytest
 import test_py_scripts
 
-from osgeo import gdal, osr
+from osgeo import gdal, ogr, osr
 
 ###############################################################################
 # Basic test
@@ -249,6 +249,201 @@ def test_gdal_merge_5():
     assert ds.GetRasterBand(4).Checksum() == cs, "Wrong checksum"
 
 
+###############################################################################
+# Test compositing the output tiles in several threads
+
+
+def test_gdal_merge_threads():
+
+    script_path = test_py_scripts.get_py_script("gdal_merge")
+    if script_path is None:
+        pytest.skip()
+
+    test_py_scripts.run_py_script(
+        script_path,
+        "gdal_merge",
+        "-q -threads 2 -co TILED=YES -co BLOCKXSIZE=16 -co BLOCKYSIZE=16"
+        " -o tmp/test_gdal_merge_threads.tif tmp/in1.tif tmp/in2.tif tmp/in3.tif tmp/in4.tif",
+    )
+
+    ds = gdal.Open("tmp/test_gdal_merge_threads.tif")
+
+    assert ds.GetRasterBand(1).Checksum() == 3508, "Wrong checksum"
+
+
+###############################################################################
+# Test compositing several output tiles in threads, from inputs of another
+# resolution than the output
+
+
+def test_gdal_merge_threads_tiles(monkeypatch):
+
+    gdal_merge = pytest.importorskip("osgeo_utils.gdal_merge")
+
+    drv = gdal.GetDriverByName("GTiff")
+    srs = osr.SpatialReference()
+    srs.SetWellKnownGeogCS("WGS84")
+    wkt = srs.ExportToWkt()
+
+    ds = drv.Create("tmp/in_threads_1.tif", 40, 40, 1)
+    ds.SetProjection(wkt)
+    ds.SetGeoTransform([2, 0.05, 0, 49, 0, -0.05])
+    ds.GetRasterBand(1).WriteRaster(
+        0, 0, 40, 40, bytes((x * 3 + y * 5) % 256 for y in range(40) for x in range(40))
+    )
+    ds = None
+
+    ds = drv.Create("tmp/in_threads_2.tif", 13, 11, 1)
+    ds.SetProjection(wkt)
+    ds.SetGeoTransform([1.93, 0.13, 0, 48.77, 0, -0.11])
+    ds.GetRasterBand(1).WriteRaster(
+        0,
+        0,
+        13,
+        11,
+        bytes((x * 17 + y * 11) % 256 for y in range(11) for x in range(13)),
+    )
+    ds = None
+
+    tile_sizes = []
+
+    def merge(filename, options):
+        gdal_merge.main(
+            ["gdal_merge", "-q", "-ps", "0.04", "0.06"]
+            + options
+            + [
+                "-co",
+                "TILED=YES",
+                "-co",
+                "BLOCKXSIZE=16",
+                "-co",
+                "BLOCKYSIZE=16",
+                "-o",
+                filename,
+                "tmp/in_threads_1.tif",
+                "tmp/in_threads_2.tif",
+            ]
+        )
+        ds = gdal.Open(filename)
+        assert (ds.RasterXSize, ds.RasterYSize) == (52, 33)
+        tile_sizes.append(gdal_merge.get_tile_size(ds))
+        data = ds.GetRasterBand(1).ReadRaster()
+        ds = None
+        gdal.Unlink(filename)
+        return data
+
+    # The output as a single tile
+    ref_data = merge("tmp/test_gdal_merge_threads_tiles_ref.tif", [])
+
+    # The output in tiles of 2x2 blocks, composited serially or in threads
+    monkeypatch.setattr(gdal_merge, "TILE_PIXELS", 32 * 32)
+    for num_threads in ("1", "2"):
+        assert (
+            merge("tmp/test_gdal_merge_threads_tiles.tif", ["-threads", num_threads])
+            == ref_data
+        )
+    assert tile_sizes == [(52, 33), (32, 32), (32, 32)]
+
+    # An invalid number of threads is reported as a usage error
+    for num_threads in ("0", "foo"):
+        assert (
+            gdal_merge.main(
+                [
+                    "gdal_merge",
+                    "-threads",
+                    num_threads,
+                    "-o",
+                    "tmp/test_gdal_merge_threads_tiles.tif",
+                    "tmp/in_threads_1.tif",
+                ]
+            )
+            == 1
+        )
+
+    gdal.Unlink("tmp/in_threads_1.tif")
+    gdal.Unlink("tmp/in_threads_2.tif")
+
+
+###############################################################################
+# Test compositing a compressed output in memory, with nodata and -init
+
+
+def test_gdal_merge_compressed_nodata():
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("osgeo.gdal_array")
+
+    script_path = test_py_scripts.get_py_script("gdal_merge")
+    if script_path is None:
+        pytest.skip()
+
+    test_py_scripts.run_py_script(
+        script_path,
+        "gdal_merge",
+        "-q -n 0 -init 7 -co COMPRESS=DEFLATE -co TILED=YES"
+        " -co BLOCKXSIZE=16 -co BLOCKYSIZE=16"
+        " -o tmp/test_gdal_merge_compressed.tif tmp/in1.tif tmp/in2.tif tmp/in3.tif tmp/in4.tif",
+    )
+
+    expected = np.empty((20, 20), np.uint8)
+    expected[:10, :10] = 7
+    expected[:10, 10:] = 63
+    expected[10:, :10] = 127
+    expected[10:, 10:] = 255
+
+    ds = gdal.Open("tmp/test_gdal_merge_compressed.tif")
+    assert np.array_equal(ds.GetRasterBand(1).ReadAsArray(), expected)
+    ds = None
+
+
+###############################################################################
+# Test merging the files of a tile index, saving their footprints
+
+
+def test_gdal_merge_tileindex():
+
+    script_path = test_py_scripts.get_py_script("gdal_merge")
+    if script_path is None:
+        pytest.skip()
+
+    srs = osr.SpatialReference()
+    srs.SetWellKnownGeogCS("WGS84")
+    ds = ogr.GetDriverByName("ESRI Shapefile").CreateDataSource(
+        "tmp/test_gdal_merge_tileindex.shp"
+    )
+    lyr = ds.CreateLayer("test_gdal_merge_tileindex", srs=srs)
+    lyr.CreateField(ogr.FieldDefn("location", ogr.OFTString))
+    for name in ("tmp/in1.tif", "tmp/in2.tif", "tmp/in3.tif", "tmp/in4.tif"):
+        gt = gdal.Open(name).GetGeoTransform()
+        minx, maxx = gt[0], gt[0] + 10 * gt[1]
+        maxy, miny = gt[3], gt[3] + 10 * gt[5]
+        feat = ogr.Feature(lyr.GetLayerDefn())
+        feat.SetField("location", name)
+        feat.SetGeometry(
+            ogr.CreateGeometryFromWkt(
+                "POLYGON((%f %f,%f %f,%f %f,%f %f,%f %f))"
+                % (minx, maxy, maxx, maxy, maxx, miny, minx, miny, minx, maxy)
+            )
+        )
+        lyr.CreateFeature(feat)
+    ds = None
+
+    for _ in range(2):
+        test_py_scripts.run_py_script(
+            script_path,
+            "gdal_merge",
+            "-q -tileindex tmp/test_gdal_merge_tileindex.shp"
+            " -footprints tmp/test_gdal_merge_tileindex.json"
+            " -o tmp/test_gdal_merge_tileindex.tif",
+        )
+
+        ds = gdal.Open("tmp/test_gdal_merge_tileindex.tif")
+        assert ds.GetRasterBand(1).Checksum() == 3508, "Wrong checksum"
+        ds = None
+        gdal.Unlink("tmp/test_gdal_merge_tileindex.tif")
+
+    assert os.path.exists("tmp/test_gdal_merge_tileindex.json")
+
+
 ###############################################################################
 # Cleanup
 
@@ -261,6 +456,9 @@ def test_gdal_merge_cleanup():
         "tmp/test_gdal_merge_3.tif",
         "tmp/test_gdal_merge_4.tif",
         "tmp/test_gdal_merge_5.tif",
+        "tmp/test_gdal_merge_threads.tif",
+        "tmp/test_gdal_merge_compressed.tif",
+        "tmp/test_gdal_merge_tileindex.json",
         "tmp/in1.tif",
         "tmp/in2.tif",
         "tmp/in3.tif",
@@ -273,3 +471,8 @@ def test_gdal_merge_cleanup():
             os.remove(filename)
         except OSError:
             pass
+
+    if os.path.exists("tmp/test_gdal_merge_tileindex.shp"):
+        ogr.GetDriverByName("ESRI Shapefile").DeleteDataSource(
+            "tmp/test_gdal_merge_tileindex.shp"
+        )
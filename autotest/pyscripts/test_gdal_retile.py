@@ -34,7 +34,7 @@ import shutil
 import pytest
 import test_py_scripts
 
-from osgeo import gdal, osr
+from osgeo import gdal, ogr, osr
 
 ###############################################################################
 # Test gdal_retile.py
@@ -338,6 +338,93 @@ def test_gdal_retile_5():
     ds = None
 
 
+###############################################################################
+# Test gdal_retile.py with a dataset cache of a single input tile
+
+
+def test_gdal_retile_cache_size():
+
+    script_path = test_py_scripts.get_py_script("gdal_retile")
+    if script_path is None:
+        pytest.skip()
+
+    try:
+        os.mkdir("tmp/outretile7")
+    except OSError:
+        pass
+
+    ret = test_py_scripts.run_py_script(
+        script_path,
+        "gdal_retile",
+        "-v -cacheSize 1 -ps 20 20 -targetDir tmp/outretile7 tmp/in1.tif tmp/in2.tif",
+    )
+    assert "Dataset cache:" in ret
+
+    # the top half comes from in2.tif, the bottom half from in1.tif
+    for filename, value in (("in1_01_01.tif", 42), ("in1_10_05.tif", 0)):
+        ds = gdal.Open("tmp/outretile7/" + filename)
+        assert ds.GetRasterBand(1).ComputeRasterMinMax() == (value, value), filename
+        ds = None
+
+    shutil.rmtree("tmp/outretile7")
+
+
+###############################################################################
+# Test gdal_retile.py -threads, -processes and -pyramidInMemory
+
+
+@pytest.mark.parametrize("option", ["-threads 2", "-processes 2", "-pyramidInMemory"])
+def test_gdal_retile_parallel(option):
+
+    script_path = test_py_scripts.get_py_script("gdal_retile")
+    if script_path is None:
+        pytest.skip()
+
+    for dirname in ("tmp/outretile6_serial", "tmp/outretile6"):
+        try:
+            os.mkdir(dirname)
+        except OSError:
+            pass
+
+    test_py_scripts.run_py_script(
+        script_path,
+        "gdal_retile",
+        "-levels 1 -ps 8 7 -tileIndex index.shp -targetDir tmp/outretile6_serial "
+        + test_py_scripts.get_data_path("gcore")
+        + "byte.tif",
+    )
+    test_py_scripts.run_py_script(
+        script_path,
+        "gdal_retile",
+        option
+        + " -levels 1 -ps 8 7 -tileIndex index.shp -targetDir tmp/outretile6 "
+        + test_py_scripts.get_data_path("gcore")
+        + "byte.tif",
+    )
+
+    for level_dir in ("", "1/"):
+        ref_ds = ogr.Open("tmp/outretile6_serial/" + level_dir + "index.shp")
+        ds = ogr.Open("tmp/outretile6/" + level_dir + "index.shp")
+        ref_lyr = ref_ds.GetLayer(0)
+        lyr = ds.GetLayer(0)
+        assert lyr.GetFeatureCount() == ref_lyr.GetFeatureCount()
+        for ref_feat, feat in zip(ref_lyr, lyr):
+            filename = feat.GetField(0)
+            assert filename == ref_feat.GetField(0)
+            assert (
+                gdal.Open("tmp/outretile6/" + level_dir + filename)
+                .GetRasterBand(1)
+                .Checksum()
+                == gdal.Open("tmp/outretile6_serial/" + level_dir + filename)
+                .GetRasterBand(1)
+                .Checksum()
+            ), filename
+        ds = None
+        ref_ds = None
+
+    shutil.rmtree("tmp/outretile6")
+
+
 ###############################################################################
 # Cleanup
 
@@ -377,6 +464,8 @@ def test_gdal_retile_cleanup():
                 pass
 
     shutil.rmtree("tmp/outretile4")
+    shutil.rmtree("tmp/outretile6_serial", ignore_errors=True)
+    shutil.rmtree("tmp/outretile6", ignore_errors=True)
 
     if os.path.exists("tmp/outretile5"):
         shutil.rmtree("tmp/outretile5")
@@ -0,0 +1,141 @@
+#!/usr/bin/env pytest
+###############################################################################
+# $Id$
+#
+# Project:  GDAL/OGR Test Suite
+# Purpose:  gdalcompare.py testing
+#
+###############################################################################
+# Copyright (c) 2022, GDAL contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+###############################################################################
+
+import pytest
+import test_py_scripts
+
+# test that osgeo_utils and numpy are available, if not skip all tests
+pytest.importorskip("osgeo_utils")
+np = pytest.importorskip("numpy")
+
+from osgeo import gdal
+from osgeo_utils import gdalcompare
+
+###############################################################################
+# Test comparing identical datasets
+
+
+def test_gdalcompare_identical():
+
+    golden_ds = gdal.Open(test_py_scripts.get_data_path("gcore") + "byte.tif")
+    new_ds = gdal.Translate("/vsimem/new.tif", golden_ds)
+
+    assert gdalcompare.compare_db(golden_ds, new_ds) == 0
+    assert gdalcompare.compare_db(golden_ds, new_ds, ["NUM_THREADS=2"]) == 0
+
+    new_ds = None
+    gdal.Unlink("/vsimem/new.tif")
+
+
+###############################################################################
+# Test the report of the differing pixels, with the tolerance, early exit and
+# threads options
+
+
+@pytest.mark.parametrize("num_threads", [1, 2])
+def test_gdalcompare_pixels(capsys, monkeypatch, num_threads):
+
+    golden_ds = gdal.Translate(
+        "/vsimem/golden.tif",
+        test_py_scripts.get_data_path("gcore") + "byte.tif",
+        creationOptions=["BLOCKYSIZE=4"],
+    )
+    new_ds = gdal.Translate("/vsimem/new.tif", golden_ds)
+    data = golden_ds.GetRasterBand(1).ReadAsArray().astype(np.int16)
+    for (y, x), diff in (((2, 3), 1), ((9, 12), -1), ((17, 5), 30)):
+        data[y, x] += diff if 0 <= data[y, x] + diff <= 255 else -diff
+    new_ds.GetRasterBand(1).WriteArray(data)
+    new_ds.FlushCache()
+
+    threads = "NUM_THREADS=%d" % num_threads
+    assert gdalcompare.compare_db(golden_ds, new_ds, [threads, "PIXEL_STATS"]) == 1
+    out = capsys.readouterr().out
+    assert "Band 1 pixel values differ:" in out
+    assert "Pixels Differing: 3" in out
+    assert "Maximum Pixel Difference: 30.0" in out
+    assert "Differing Pixels Bounding Box: (3,2) - (12,17)" in out
+    assert "(0.1, 1]: 2" in out
+    assert "(10, 100]: 1" in out
+
+    assert gdalcompare.compare_db(golden_ds, new_ds, [threads, "TOLERANCE=1"]) == 1
+    out = capsys.readouterr().out
+    assert "Pixels Differing: 1" in out
+    assert "Differing Pixels Bounding Box: (5,17) - (5,17)" in out
+
+    assert gdalcompare.compare_db(golden_ds, new_ds, [threads, "TOLERANCE=30"]) == 0
+
+    # compare the blocks of 4 lines one by one, stopping after the first difference
+    monkeypatch.setattr(gdalcompare, "CHUNK_PIXELS", 20 * 4)
+    gdalcompare.compare_db(golden_ds, new_ds, ["MAX_DIFF_PIXELS=1"])
+    out = capsys.readouterr().out
+    assert "Pixels Differing: at least 1" in out
+    assert "Differing Pixels Bounding Box: (3,2) - (3,2)" in out
+
+    golden_ds = None
+    new_ds = None
+    gdal.Unlink("/vsimem/golden.tif")
+    gdal.Unlink("/vsimem/new.tif")
+
+
+###############################################################################
+# Test comparing in threads MEM datasets, which cannot be reopened, and a
+# dataset with pending writes, with exceptions enabled
+
+
+def test_gdalcompare_threads_datasets():
+
+    golden_ds = gdal.Translate(
+        "", test_py_scripts.get_data_path("gcore") + "byte.tif", format="MEM"
+    )
+    new_ds = gdal.Translate("/vsimem/new.tif", golden_ds)
+    new_ds.FlushCache()
+    data = golden_ds.GetRasterBand(1).ReadAsArray()
+    data[5, 7] = 255 - data[5, 7]
+    # not flushed by the test
+    new_ds.GetRasterBand(1).WriteArray(data)
+
+    # reopened for the threads, after flushing the pending writes
+    golden_file_ds = gdal.Translate("/vsimem/golden.tif", golden_ds)
+    stats = gdalcompare.compare_db_pixels(golden_file_ds, new_ds, ["NUM_THREADS=2"])
+    assert stats["1"].diff_count == 1
+
+    mem_ds = gdal.Translate("", new_ds, format="MEM")
+    old_use_exceptions = gdal.GetUseExceptions()
+    gdal.UseExceptions()
+    try:
+        assert gdalcompare.compare_db(golden_ds, new_ds, ["NUM_THREADS=2"]) == 1
+        assert gdalcompare.compare_db(mem_ds, new_ds, ["NUM_THREADS=2"]) == 0
+    finally:
+        if not old_use_exceptions:
+            gdal.DontUseExceptions()
+
+    golden_file_ds = None
+    new_ds = None
+    gdal.Unlink("/vsimem/golden.tif")
+    gdal.Unlink("/vsimem/new.tif")
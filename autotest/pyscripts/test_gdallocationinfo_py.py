@@ -42,6 +42,7 @@ import test_py_scripts
 from numpy.testing import assert_allclose
 
 from osgeo import gdal, osr
+from osgeo.gdal_array import BandRasterIONumPy
 from osgeo_utils.auxiliary.osr_util import get_srs, get_transform, transform_points
 from osgeo_utils.auxiliary.raster_creation import copy_raster_and_add_overviews
 from osgeo_utils.auxiliary.util import open_ds
@@ -225,6 +226,45 @@ def test_gdallocationinfo_py_7():
             assert_allclose(expected, actual, rtol=1e-4, atol=1e-3)
 
 
+@pytest.mark.parametrize(
+    "resample_alg",
+    [gdal.GRIORA_NearestNeighbour, gdal.GRIORA_Bilinear, gdal.GRIORA_Cubic],
+)
+def test_gdallocationinfo_py_resample_alg(resample_alg):
+    """Test the block-wise sampling against RasterIO of 1x1 windows"""
+    ds = gdal.Translate(
+        "",
+        "../gcore/data/byte.tif",
+        format="MEM",
+        outputType=gdal.GDT_Float32,
+    )
+    band = ds.GetRasterBand(1)
+    np.random.seed(0)
+    pixels = np.random.uniform(2, ds.RasterXSize - 2, 100)
+    lines = np.random.uniform(2, ds.RasterYSize - 2, 100)
+
+    _, _, results = gdallocationinfo.gdallocationinfo(
+        ds, x=pixels, y=lines, resample_alg=resample_alg
+    )
+
+    buf_obj = np.empty((1, 1), dtype=np.float32)
+    for idx, (pixel, line) in enumerate(zip(pixels, lines)):
+        BandRasterIONumPy(
+            band,
+            0,
+            pixel - 0.5,
+            line - 0.5,
+            1,
+            1,
+            buf_obj,
+            gdal.GDT_Float32,
+            resample_alg,
+            None,
+            None,
+        )
+        assert results[0][idx] == pytest.approx(buf_obj[0][0], rel=1e-5)
+
+
 def test_gdallocationinfo_py_cleanup():
     for filename in temp_files:
         try:
@@ -0,0 +1,247 @@
+# SPDX-License-Identifier: MIT
+# Copyright 2022, GDAL contributors
+
+# Benchmark of gdal2tiles on a synthetic input, timing separately the metadata
+# and the tiles generation, for each resampling method, tile driver, number of
+# processes, container and number of overview block levels. Results are written
+# as JSON.
+#
+# Usage: python gdal2tiles_tiling.py [--size 4096] [--bands 3]
+#            [--nodata-fraction 0.25] [--resampling average,near]
+#            [--tiledriver PNG,WEBP] [--processes 1,2,4]
+#            [--container directory,mbtiles] [--overview-block-levels 0,2]
+#            [--output out.json]
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy
+
+from osgeo import gdal, osr
+from osgeo_utils import gdal2tiles
+
+
+def create_input(filename, size, bands, nodata_fraction):
+    """
+    Create a Byte GeoTIFF in EPSG:3857, aligned on the tiles of the mercator
+    profile, filled with gradients plus noise, and with a strip of nodata at its
+    top covering nodata_fraction of the rows
+    """
+    ds = gdal.GetDriverByName("GTiff").Create(
+        filename, size, size, bands, options=["TILED=YES"]
+    )
+    mercator = gdal2tiles.GlobalMercator()
+    res = mercator.Resolution(12)
+    ds.SetGeoTransform([0, res, 0, size * res, 0, -res])
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(3857)
+    ds.SetSpatialRef(srs)
+
+    rng = numpy.random.RandomState(0)
+    nodata_rows = int(size * nodata_fraction)
+    x = numpy.arange(size)
+    for i in range(bands):
+        band = ds.GetRasterBand(i + 1)
+        band.SetNoDataValue(0)
+        for yoff in range(0, size, 256):
+            y = numpy.arange(yoff, min(size, yoff + 256))[:, numpy.newaxis]
+            data = (x * (i + 1) + y * (bands - i)) // 16 + rng.randint(
+                0, 16, (y.shape[0], size)
+            )
+            data = (data % 255 + 1).astype(numpy.uint8)
+            data[y[:, 0] < nodata_rows] = 0
+            band.WriteRaster(0, yoff, size, y.shape[0], data.tobytes())
+    ds = None
+
+
+@contextlib.contextmanager
+def timed_tile_details(timings):
+    """
+    Record when gdal2tiles is done with opening the input and writing the
+    metadata, i.e. when worker_tile_details() returns in the main process, and
+    the job information it returns
+    """
+    worker_tile_details = gdal2tiles.worker_tile_details
+
+    def timed_worker_tile_details(*args, **kwargs):
+        conf, tile_details = worker_tile_details(*args, **kwargs)
+        timings["metadata_end"] = time.time()
+        timings["conf"] = conf
+        return conf, tile_details
+
+    gdal2tiles.worker_tile_details = timed_worker_tile_details
+    try:
+        yield
+    finally:
+        gdal2tiles.worker_tile_details = worker_tile_details
+
+
+def run(
+    input_file,
+    output,
+    resampling,
+    tiledriver,
+    nb_processes,
+    container,
+    overview_block_levels,
+):
+    """
+    Generate the tiles through the gdal2tiles entry point, as the command line
+    utility does, and return the timings of each step. With several processes,
+    the base and overview tiles are generated at the same time, so that they
+    are only timed together.
+    """
+
+    result = {
+        "resampling": resampling,
+        "tiledriver": tiledriver,
+        "processes": nb_processes,
+        "container": container,
+        "overview_block_levels": overview_block_levels,
+    }
+
+    timings = {}
+    with timed_tile_details(timings):
+        start = time.time()
+        gdal2tiles.submain(
+            [
+                "gdal2tiles",
+                "-q",
+                "--resampling=" + resampling,
+                "--tiledriver=" + tiledriver,
+                "--processes=%d" % nb_processes,
+                "--container=" + container,
+                "--overview-block-levels=%d" % overview_block_levels,
+                input_file,
+                output,
+            ]
+        )
+        end = time.time()
+
+    conf = timings["conf"]
+    result["metadata_time"] = timings["metadata_end"] - start
+    result["tiling_time"] = end - timings["metadata_end"]
+    result["total_time"] = end - start
+    result["nb_base_tiles"] = gdal2tiles.count_base_tiles(conf)
+    result["nb_overview_tiles"] = gdal2tiles.count_overview_tiles(conf)
+    return result
+
+
+def main(argv=sys.argv):
+    parser = argparse.ArgumentParser(description="Benchmark of gdal2tiles")
+    parser.add_argument("--size", type=int, default=4096, help="input size in pixels")
+    parser.add_argument("--bands", type=int, default=3, choices=(1, 2, 3, 4))
+    parser.add_argument("--nodata-fraction", type=float, default=0.25)
+    parser.add_argument(
+        "--resampling",
+        default=",".join(gdal2tiles.resampling_list),
+        help="comma separated list of resampling methods",
+    )
+    parser.add_argument(
+        "--tiledriver",
+        default="PNG,WEBP",
+        help="comma separated list of tile drivers, skipped if not available",
+    )
+    parser.add_argument(
+        "--processes", default="1,2,4", help="comma separated numbers of processes"
+    )
+    parser.add_argument(
+        "--container",
+        default="directory",
+        help="comma separated list of containers: directory, mbtiles or gpkg",
+    )
+    parser.add_argument(
+        "--overview-block-levels",
+        default="0",
+        help="comma separated numbers of overview levels built with the base tiles",
+    )
+    parser.add_argument(
+        "--tmpdir", help="directory of the input and output files (default: temporary)"
+    )
+    parser.add_argument("--output", help="JSON output file (default: stdout)")
+    args = parser.parse_args(argv[1:])
+
+    tmpdir = tempfile.mkdtemp(dir=args.tmpdir)
+    try:
+        input_file = os.path.join(tmpdir, "input.tif")
+        create_input(input_file, args.size, args.bands, args.nodata_fraction)
+
+        tiledrivers = []
+        for tiledriver in args.tiledriver.split(","):
+            if gdal.GetDriverByName(tiledriver) is None:
+                print("Skipping %s: driver not available" % tiledriver, file=sys.stderr)
+            else:
+                tiledrivers.append(tiledriver)
+
+        results = []
+        for (
+            tiledriver,
+            resampling,
+            nb_processes,
+            container,
+            overview_block_levels,
+        ) in itertools.product(
+            tiledrivers,
+            args.resampling.split(","),
+            [int(x) for x in args.processes.split(",")],
+            args.container.split(","),
+            [int(x) for x in args.overview_block_levels.split(",")],
+        ):
+            output = os.path.join(tmpdir, "tiles")
+            if container != "directory":
+                output += "." + container
+            result = run(
+                input_file,
+                output,
+                resampling,
+                tiledriver,
+                nb_processes,
+                container,
+                overview_block_levels,
+            )
+            result.update(
+                size=args.size,
+                bands=args.bands,
+                nodata_fraction=args.nodata_fraction,
+                gdal_version=gdal.__version__,
+            )
+            print(
+                "%s %s processes=%d container=%s overview-block-levels=%d: "
+                "metadata %.2f s, tiling %.2f s"
+                % (
+                    tiledriver,
+                    resampling,
+                    nb_processes,
+                    container,
+                    overview_block_levels,
+                    result["metadata_time"],
+                    result["tiling_time"],
+                ),
+                file=sys.stderr,
+            )
+            results.append(result)
+            if container == "directory":
+                shutil.rmtree(output)
+            else:
+                os.unlink(output)
+    finally:
+        shutil.rmtree(tmpdir)
+
+    if args.output:
+        with open(args.output, "wt") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -88,6 +88,7 @@ static void _StoreLastException()
 %}
 
 %{
+#include <algorithm>
 #include <vector>
 #include "gdal_priv.h"
 #include "ogr_recordbatch.h"
@@ -798,6 +799,220 @@ retStringAndCPLFree* GetArrayFilename(PyArrayObject *psArray)
   }
 %}
 
+%{
+/* Weight of the kernel of BandSamplePointsNumPy() at a distance from its center */
+static double SamplePointsKernel( int nKernelSize, double dfDist )
+{
+    dfDist = fabs(dfDist);
+    if( nKernelSize == 2 )
+        return std::max(0.0, 1.0 - dfDist);
+    /* cubic convolution kernel with a = -0.5, as for GRIORA_Cubic */
+    if( dfDist < 1.0 )
+        return (1.5 * dfDist - 2.5) * dfDist * dfDist + 1.0;
+    if( dfDist < 2.0 )
+        return ((-0.5 * dfDist + 2.5) * dfDist - 4.0) * dfDist + 2.0;
+    return 0.0;
+}
+%}
+
+%apply (PyArrayObject *psArray) { (PyArrayObject *psXArray), (PyArrayObject *psYArray) };
+%feature( "kwargs" ) BandSamplePointsNumPy;
+%inline %{
+  CPLErr BandSamplePointsNumPy( GDALRasterBandShadow* band,
+                                PyArrayObject *psXArray,
+                                PyArrayObject *psYArray,
+                                PyArrayObject *psArray,
+                                GDALRIOResampleAlg resample_alg )
+{
+    if( PyArray_NDIM(psXArray) != 1 || PyArray_NDIM(psYArray) != 1 ||
+        PyArray_NDIM(psArray) != 1 ||
+        PyArray_DIMS(psYArray)[0] != PyArray_DIMS(psXArray)[0] ||
+        PyArray_DIMS(psArray)[0] != PyArray_DIMS(psXArray)[0] )
+    {
+        CPLError( CE_Failure, CPLE_AppDefined,
+                  "Expected 1-D arrays of the same size." );
+        return CE_Failure;
+    }
+
+    if( PyArray_TYPE(psXArray) != NPY_DOUBLE ||
+        PyArray_TYPE(psYArray) != NPY_DOUBLE ||
+        PyArray_TYPE(psArray) != NPY_DOUBLE )
+    {
+        CPLError( CE_Failure, CPLE_AppDefined,
+                  "Expected arrays of type float64." );
+        return CE_Failure;
+    }
+
+    if( !(PyArray_FLAGS(psArray) & NPY_ARRAY_WRITEABLE) )
+    {
+        CPLError( CE_Failure, CPLE_AppDefined,
+                  "Cannot read in a non-writeable array." );
+        return CE_Failure;
+    }
+
+    int nKernelSize;
+    switch( resample_alg )
+    {
+        case GRIORA_NearestNeighbour: nKernelSize = 1; break;
+        case GRIORA_Bilinear: nKernelSize = 2; break;
+        case GRIORA_Cubic: nKernelSize = 4; break;
+        default:
+            CPLError( CE_Failure, CPLE_NotSupported,
+                      "Only the nearest neighbour, bilinear and cubic "
+                      "resampling algorithms are supported." );
+            return CE_Failure;
+    }
+
+    GDALRasterBand* poBand = GDALRasterBand::FromHandle(band);
+    const GDALDataType eDT = poBand->GetRasterDataType();
+    if( GDALDataTypeIsComplex(eDT) )
+    {
+        CPLError( CE_Failure, CPLE_NotSupported,
+                  "Complex data types are not supported." );
+        return CE_Failure;
+    }
+    const int nDTSize = GDALGetDataTypeSizeBytes(eDT);
+    const char* pszPixelType =
+        poBand->GetMetadataItem("PIXELTYPE", "IMAGE_STRUCTURE");
+    const bool bSignedByte = eDT == GDT_Byte && pszPixelType != nullptr &&
+                             EQUAL(pszPixelType, "SIGNEDBYTE");
+
+    const int nXSize = poBand->GetXSize();
+    const int nYSize = poBand->GetYSize();
+    int nBlockXSize = 0;
+    int nBlockYSize = 0;
+    poBand->GetBlockSize(&nBlockXSize, &nBlockYSize);
+    const int nBlocksPerRow = DIV_ROUND_UP(nXSize, nBlockXSize);
+    int bHasNoData = FALSE;
+    const double dfNoData = poBand->GetNoDataValue(&bHasNoData);
+
+    const npy_intp nPoints = PyArray_DIMS(psArray)[0];
+    const char* pabyX = static_cast<const char*>(PyArray_DATA(psXArray));
+    const char* pabyY = static_cast<const char*>(PyArray_DATA(psYArray));
+    char* pabyValues = static_cast<char*>(PyArray_DATA(psArray));
+    const npy_intp nXStride = PyArray_STRIDES(psXArray)[0];
+    const npy_intp nYStride = PyArray_STRIDES(psYArray)[0];
+    const npy_intp nValueStride = PyArray_STRIDES(psArray)[0];
+
+    /* Sort the points inside the raster by the block of their pixel, */
+    /* and fill the others with the nodata value */
+    std::vector<std::pair<GIntBig, npy_intp>> aoPoints;
+    for( npy_intp i = 0; i < nPoints; i++ )
+    {
+        const double dfX = *reinterpret_cast<const double*>(pabyX + i * nXStride);
+        const double dfY = *reinterpret_cast<const double*>(pabyY + i * nYStride);
+        *reinterpret_cast<double*>(pabyValues + i * nValueStride) =
+            bHasNoData ? dfNoData : 0.0;
+        if( !(dfX >= 0 && dfX < nXSize && dfY >= 0 && dfY < nYSize) )
+            continue;
+        const int nBlockX = static_cast<int>(dfX) / nBlockXSize;
+        const int nBlockY = static_cast<int>(dfY) / nBlockYSize;
+        aoPoints.emplace_back(
+            static_cast<GIntBig>(nBlockY) * nBlocksPerRow + nBlockX, i);
+    }
+    std::sort(aoPoints.begin(), aoPoints.end());
+
+    /* Only the block of the current pixel is kept locked */
+    GDALRasterBlock* poBlock = nullptr;
+    int nCurBlockX = -1;
+    int nCurBlockY = -1;
+    const auto GetValue = [&](int nCol, int nRow, double& dfValue)
+    {
+        const int nBlockX = nCol / nBlockXSize;
+        const int nBlockY = nRow / nBlockYSize;
+        if( poBlock == nullptr || nBlockX != nCurBlockX || nBlockY != nCurBlockY )
+        {
+            if( poBlock != nullptr )
+                poBlock->DropLock();
+            poBlock = poBand->GetLockedBlockRef(nBlockX, nBlockY);
+            if( poBlock == nullptr )
+                return false;
+            nCurBlockX = nBlockX;
+            nCurBlockY = nBlockY;
+        }
+        const GByte* pabyData =
+            static_cast<const GByte*>(poBlock->GetDataRef()) +
+            (static_cast<size_t>(nRow - nBlockY * nBlockYSize) * nBlockXSize +
+             (nCol - nBlockX * nBlockXSize)) * nDTSize;
+        if( bSignedByte )
+            dfValue = static_cast<signed char>(*pabyData);
+        else
+            GDALCopyWords(pabyData, eDT, 0, &dfValue, GDT_Float64, 0, 1);
+        return true;
+    };
+    const auto IsNoData = [&](double dfValue)
+    {
+        return bHasNoData && (dfValue == dfNoData ||
+                              (CPLIsNan(dfNoData) && CPLIsNan(dfValue)));
+    };
+
+    CPLErr eErr = CE_None;
+    for( const auto& oPoint : aoPoints )
+    {
+        const npy_intp i = oPoint.second;
+        const double dfX = *reinterpret_cast<const double*>(pabyX + i * nXStride);
+        const double dfY = *reinterpret_cast<const double*>(pabyY + i * nYStride);
+        double* pdfValue = reinterpret_cast<double*>(pabyValues + i * nValueStride);
+
+        if( nKernelSize == 1 )
+        {
+            /* same rounding as RasterIO() of a 1x1 window centered on the point */
+            const int nCol = std::min(static_cast<int>(floor(dfX + 1e-10)), nXSize - 1);
+            const int nRow = std::min(static_cast<int>(floor(dfY + 1e-10)), nYSize - 1);
+            if( !GetValue(nCol, nRow, *pdfValue) )
+            {
+                eErr = CE_Failure;
+                break;
+            }
+            continue;
+        }
+
+        /* Convolution with the kernel, leaving out the pixels outside */
+        /* the raster or at nodata */
+        const int nCol0 = static_cast<int>(floor(dfX - 0.5)) - (nKernelSize / 2 - 1);
+        const int nRow0 = static_cast<int>(floor(dfY - 0.5)) - (nKernelSize / 2 - 1);
+        double dfSum = 0.0;
+        double dfWeightSum = 0.0;
+        for( int iRow = 0; iRow < nKernelSize && eErr == CE_None; iRow++ )
+        {
+            const int nRow = nRow0 + iRow;
+            if( nRow < 0 || nRow >= nYSize )
+                continue;
+            const double dfWeightY = SamplePointsKernel(nKernelSize, nRow + 0.5 - dfY);
+            for( int iCol = 0; iCol < nKernelSize; iCol++ )
+            {
+                const int nCol = nCol0 + iCol;
+                if( nCol < 0 || nCol >= nXSize )
+                    continue;
+                const double dfWeight =
+                    dfWeightY * SamplePointsKernel(nKernelSize, nCol + 0.5 - dfX);
+                if( dfWeight == 0.0 )
+                    continue;
+                double dfValue = 0.0;
+                if( !GetValue(nCol, nRow, dfValue) )
+                {
+                    eErr = CE_Failure;
+                    break;
+                }
+                if( IsNoData(dfValue) )
+                    continue;
+                dfSum += dfWeight * dfValue;
+                dfWeightSum += dfWeight;
+            }
+        }
+        if( eErr != CE_None )
+            break;
+        if( dfWeightSum != 0.0 )
+            *pdfValue = dfSum / dfWeightSum;
+    }
+
+    if( poBlock != nullptr )
+        poBlock->DropLock();
+    return eErr;
+}
+%}
+%clear (PyArrayObject *psXArray), (PyArrayObject *psYArray);
+
 %feature( "kwargs" ) DatasetIONumPy;
 %apply (int nList, int *pList ) { (int band_list, int *pband_list ) };
 %inline %{
@@ -2388,6 +2603,66 @@ def BandWriteArray(band, array, xoff=0, yoff=0,
         _RaiseException()
     return ret
 
+def _SamplePointsPixelLine(ds, xs, ys):
+    """Convert the coordinates to float64 arrays, and from the georeferenced
+    space of ds to pixel/line space if ds is not None."""
+
+    xs = numpy.asarray(xs, dtype=numpy.float64)
+    ys = numpy.asarray(ys, dtype=numpy.float64)
+    if xs.shape != ys.shape:
+        raise ValueError("xs and ys should have the same shape")
+    if ds is None:
+        return xs, ys
+
+    gt = ds.GetGeoTransform(can_return_null=True)
+    if gt is None:
+        raise ValueError("dataset has no geotransform")
+    inv_gt = gdal.InvGeoTransform(gt)
+    if inv_gt is None:
+        raise ValueError("cannot invert the geotransform")
+    return (inv_gt[0] + inv_gt[1] * xs + inv_gt[2] * ys,
+            inv_gt[3] + inv_gt[4] * xs + inv_gt[5] * ys)
+
+def BandSamplePoints(band, xs, ys, resample_alg=gdal.GRIORA_NearestNeighbour,
+                     georeferenced=False):
+    """Sample a GDAL band at arrays of x and y coordinates into a float64
+    array.  Used by the gdal.Band.SamplePoints method."""
+
+    if georeferenced:
+        ds = band.GetDataset()
+        if ds is None:
+            raise ValueError("band has no dataset")
+    else:
+        ds = None
+    xs, ys = _SamplePointsPixelLine(ds, xs, ys)
+
+    values = numpy.empty(xs.shape, dtype=numpy.float64)
+    if BandSamplePointsNumPy(band, xs.reshape(-1), ys.reshape(-1),
+                             values.reshape(-1), resample_alg) != 0:
+        _RaiseException()
+        return None
+
+    return values
+
+def DatasetSamplePoints(ds, xs, ys, band_list=None,
+                        resample_alg=gdal.GRIORA_NearestNeighbour,
+                        georeferenced=False):
+    """Sample bands of a GDAL dataset at arrays of x and y coordinates into a
+    float64 array.  Used by the gdal.Dataset.SamplePoints method."""
+
+    if band_list is None:
+        band_list = range(1, ds.RasterCount + 1)
+    xs, ys = _SamplePointsPixelLine(ds if georeferenced else None, xs, ys)
+
+    values = numpy.empty((len(band_list),) + xs.shape, dtype=numpy.float64)
+    for i, band_num in enumerate(band_list):
+        band = ds.GetRasterBand(band_num)
+        if band is None:
+            raise ValueError("invalid band number %d" % band_num)
+        values[i] = BandSamplePoints(band, xs, ys, resample_alg=resample_alg)
+
+    return values
+
 def _ExtendedDataTypeToNumPyDataType(dt):
     klass = dt.GetClass()
 
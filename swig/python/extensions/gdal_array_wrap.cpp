@@ -3232,6 +3232,7 @@ static void _StoreLastException()
 }
 
 
+#include <algorithm>
 #include <vector>
 #include "gdal_priv.h"
 #include "ogr_recordbatch.h"
@@ -4122,6 +4123,215 @@ retStringAndCPLFree* GetArrayFilename(PyArrayObject *psArray)
   }
 
 
+/* Weight of the kernel of BandSamplePointsNumPy() at a distance from its center */
+static double SamplePointsKernel( int nKernelSize, double dfDist )
+{
+    dfDist = fabs(dfDist);
+    if( nKernelSize == 2 )
+        return std::max(0.0, 1.0 - dfDist);
+    /* cubic convolution kernel with a = -0.5, as for GRIORA_Cubic */
+    if( dfDist < 1.0 )
+        return (1.5 * dfDist - 2.5) * dfDist * dfDist + 1.0;
+    if( dfDist < 2.0 )
+        return ((-0.5 * dfDist + 2.5) * dfDist - 4.0) * dfDist + 2.0;
+    return 0.0;
+}
+
+
+  CPLErr BandSamplePointsNumPy( GDALRasterBandShadow* band,
+                                PyArrayObject *psXArray,
+                                PyArrayObject *psYArray,
+                                PyArrayObject *psArray,
+                                GDALRIOResampleAlg resample_alg )
+{
+    if( PyArray_NDIM(psXArray) != 1 || PyArray_NDIM(psYArray) != 1 ||
+        PyArray_NDIM(psArray) != 1 ||
+        PyArray_DIMS(psYArray)[0] != PyArray_DIMS(psXArray)[0] ||
+        PyArray_DIMS(psArray)[0] != PyArray_DIMS(psXArray)[0] )
+    {
+        CPLError( CE_Failure, CPLE_AppDefined,
+                  "Expected 1-D arrays of the same size." );
+        return CE_Failure;
+    }
+
+    if( PyArray_TYPE(psXArray) != NPY_DOUBLE ||
+        PyArray_TYPE(psYArray) != NPY_DOUBLE ||
+        PyArray_TYPE(psArray) != NPY_DOUBLE )
+    {
+        CPLError( CE_Failure, CPLE_AppDefined,
+                  "Expected arrays of type float64." );
+        return CE_Failure;
+    }
+
+    if( !(PyArray_FLAGS(psArray) & NPY_ARRAY_WRITEABLE) )
+    {
+        CPLError( CE_Failure, CPLE_AppDefined,
+                  "Cannot read in a non-writeable array." );
+        return CE_Failure;
+    }
+
+    int nKernelSize;
+    switch( resample_alg )
+    {
+        case GRIORA_NearestNeighbour: nKernelSize = 1; break;
+        case GRIORA_Bilinear: nKernelSize = 2; break;
+        case GRIORA_Cubic: nKernelSize = 4; break;
+        default:
+            CPLError( CE_Failure, CPLE_NotSupported,
+                      "Only the nearest neighbour, bilinear and cubic "
+                      "resampling algorithms are supported." );
+            return CE_Failure;
+    }
+
+    GDALRasterBand* poBand = GDALRasterBand::FromHandle(band);
+    const GDALDataType eDT = poBand->GetRasterDataType();
+    if( GDALDataTypeIsComplex(eDT) )
+    {
+        CPLError( CE_Failure, CPLE_NotSupported,
+                  "Complex data types are not supported." );
+        return CE_Failure;
+    }
+    const int nDTSize = GDALGetDataTypeSizeBytes(eDT);
+    const char* pszPixelType =
+        poBand->GetMetadataItem("PIXELTYPE", "IMAGE_STRUCTURE");
+    const bool bSignedByte = eDT == GDT_Byte && pszPixelType != nullptr &&
+                             EQUAL(pszPixelType, "SIGNEDBYTE");
+
+    const int nXSize = poBand->GetXSize();
+    const int nYSize = poBand->GetYSize();
+    int nBlockXSize = 0;
+    int nBlockYSize = 0;
+    poBand->GetBlockSize(&nBlockXSize, &nBlockYSize);
+    const int nBlocksPerRow = DIV_ROUND_UP(nXSize, nBlockXSize);
+    int bHasNoData = FALSE;
+    const double dfNoData = poBand->GetNoDataValue(&bHasNoData);
+
+    const npy_intp nPoints = PyArray_DIMS(psArray)[0];
+    const char* pabyX = static_cast<const char*>(PyArray_DATA(psXArray));
+    const char* pabyY = static_cast<const char*>(PyArray_DATA(psYArray));
+    char* pabyValues = static_cast<char*>(PyArray_DATA(psArray));
+    const npy_intp nXStride = PyArray_STRIDES(psXArray)[0];
+    const npy_intp nYStride = PyArray_STRIDES(psYArray)[0];
+    const npy_intp nValueStride = PyArray_STRIDES(psArray)[0];
+
+    /* Sort the points inside the raster by the block of their pixel, */
+    /* and fill the others with the nodata value */
+    std::vector<std::pair<GIntBig, npy_intp>> aoPoints;
+    for( npy_intp i = 0; i < nPoints; i++ )
+    {
+        const double dfX = *reinterpret_cast<const double*>(pabyX + i * nXStride);
+        const double dfY = *reinterpret_cast<const double*>(pabyY + i * nYStride);
+        *reinterpret_cast<double*>(pabyValues + i * nValueStride) =
+            bHasNoData ? dfNoData : 0.0;
+        if( !(dfX >= 0 && dfX < nXSize && dfY >= 0 && dfY < nYSize) )
+            continue;
+        const int nBlockX = static_cast<int>(dfX) / nBlockXSize;
+        const int nBlockY = static_cast<int>(dfY) / nBlockYSize;
+        aoPoints.emplace_back(
+            static_cast<GIntBig>(nBlockY) * nBlocksPerRow + nBlockX, i);
+    }
+    std::sort(aoPoints.begin(), aoPoints.end());
+
+    /* Only the block of the current pixel is kept locked */
+    GDALRasterBlock* poBlock = nullptr;
+    int nCurBlockX = -1;
+    int nCurBlockY = -1;
+    const auto GetValue = [&](int nCol, int nRow, double& dfValue)
+    {
+        const int nBlockX = nCol / nBlockXSize;
+        const int nBlockY = nRow / nBlockYSize;
+        if( poBlock == nullptr || nBlockX != nCurBlockX || nBlockY != nCurBlockY )
+        {
+            if( poBlock != nullptr )
+                poBlock->DropLock();
+            poBlock = poBand->GetLockedBlockRef(nBlockX, nBlockY);
+            if( poBlock == nullptr )
+                return false;
+            nCurBlockX = nBlockX;
+            nCurBlockY = nBlockY;
+        }
+        const GByte* pabyData =
+            static_cast<const GByte*>(poBlock->GetDataRef()) +
+            (static_cast<size_t>(nRow - nBlockY * nBlockYSize) * nBlockXSize +
+             (nCol - nBlockX * nBlockXSize)) * nDTSize;
+        if( bSignedByte )
+            dfValue = static_cast<signed char>(*pabyData);
+        else
+            GDALCopyWords(pabyData, eDT, 0, &dfValue, GDT_Float64, 0, 1);
+        return true;
+    };
+    const auto IsNoData = [&](double dfValue)
+    {
+        return bHasNoData && (dfValue == dfNoData ||
+                              (CPLIsNan(dfNoData) && CPLIsNan(dfValue)));
+    };
+
+    CPLErr eErr = CE_None;
+    for( const auto& oPoint : aoPoints )
+    {
+        const npy_intp i = oPoint.second;
+        const double dfX = *reinterpret_cast<const double*>(pabyX + i * nXStride);
+        const double dfY = *reinterpret_cast<const double*>(pabyY + i * nYStride);
+        double* pdfValue = reinterpret_cast<double*>(pabyValues + i * nValueStride);
+
+        if( nKernelSize == 1 )
+        {
+            /* same rounding as RasterIO() of a 1x1 window centered on the point */
+            const int nCol = std::min(static_cast<int>(floor(dfX + 1e-10)), nXSize - 1);
+            const int nRow = std::min(static_cast<int>(floor(dfY + 1e-10)), nYSize - 1);
+            if( !GetValue(nCol, nRow, *pdfValue) )
+            {
+                eErr = CE_Failure;
+                break;
+            }
+            continue;
+        }
+
+        /* Convolution with the kernel, leaving out the pixels outside */
+        /* the raster or at nodata */
+        const int nCol0 = static_cast<int>(floor(dfX - 0.5)) - (nKernelSize / 2 - 1);
+        const int nRow0 = static_cast<int>(floor(dfY - 0.5)) - (nKernelSize / 2 - 1);
+        double dfSum = 0.0;
+        double dfWeightSum = 0.0;
+        for( int iRow = 0; iRow < nKernelSize && eErr == CE_None; iRow++ )
+        {
+            const int nRow = nRow0 + iRow;
+            if( nRow < 0 || nRow >= nYSize )
+                continue;
+            const double dfWeightY = SamplePointsKernel(nKernelSize, nRow + 0.5 - dfY);
+            for( int iCol = 0; iCol < nKernelSize; iCol++ )
+            {
+                const int nCol = nCol0 + iCol;
+                if( nCol < 0 || nCol >= nXSize )
+                    continue;
+                const double dfWeight =
+                    dfWeightY * SamplePointsKernel(nKernelSize, nCol + 0.5 - dfX);
+                if( dfWeight == 0.0 )
+                    continue;
+                double dfValue = 0.0;
+                if( !GetValue(nCol, nRow, dfValue) )
+                {
+                    eErr = CE_Failure;
+                    break;
+                }
+                if( IsNoData(dfValue) )
+                    continue;
+                dfSum += dfWeight * dfValue;
+                dfWeightSum += dfWeight;
+            }
+        }
+        if( eErr != CE_None )
+            break;
+        if( dfWeightSum != 0.0 )
+            *pdfValue = dfSum / dfWeightSum;
+    }
+
+    if( poBlock != nullptr )
+        poBlock->DropLock();
+    return eErr;
+}
+
+
   CPLErr DatasetIONumPy( GDALDatasetShadow* ds, int bWrite, double xoff, double yoff, double xsize, double ysize,
                          PyArrayObject *psArray,
                          GDALDataType buf_type,
@@ -5900,6 +6110,95 @@ fail:
 }
 
 
+SWIGINTERN PyObject *_wrap_BandSamplePointsNumPy(PyObject *SWIGUNUSEDPARM(self), PyObject *args, PyObject *kwargs) {
+  PyObject *resultobj = 0;
+  GDALRasterBandShadow *arg1 = (GDALRasterBandShadow *) 0 ;
+  PyArrayObject *arg2 = (PyArrayObject *) 0 ;
+  PyArrayObject *arg3 = (PyArrayObject *) 0 ;
+  PyArrayObject *arg4 = (PyArrayObject *) 0 ;
+  GDALRIOResampleAlg arg5 ;
+  void *argp1 = 0 ;
+  int res1 = 0 ;
+  PyObject * obj0 = 0 ;
+  PyObject * obj1 = 0 ;
+  PyObject * obj2 = 0 ;
+  PyObject * obj3 = 0 ;
+  PyObject * obj4 = 0 ;
+  char * kwnames[] = {
+    (char *)"band",  (char *)"psXArray",  (char *)"psYArray",  (char *)"psArray",  (char *)"resample_alg",  NULL 
+  };
+  CPLErr result;
+  
+  if (!PyArg_ParseTupleAndKeywords(args, kwargs, "OOOOO:BandSamplePointsNumPy", kwnames, &obj0, &obj1, &obj2, &obj3, &obj4)) SWIG_fail;
+  res1 = SWIG_ConvertPtr(obj0, &argp1,SWIGTYPE_p_GDALRasterBandShadow, 0 |  0 );
+  if (!SWIG_IsOK(res1)) {
+    SWIG_exception_fail(SWIG_ArgError(res1), "in method '" "BandSamplePointsNumPy" "', argument " "1"" of type '" "GDALRasterBandShadow *""'"); 
+  }
+  arg1 = reinterpret_cast< GDALRasterBandShadow * >(argp1);
+  {
+    /* %typemap(in,numinputs=1) (PyArrayObject  *psArray) */
+    if (obj1 != NULL && PyArray_Check(obj1))
+    {
+      arg2 = (PyArrayObject*)(obj1);
+    }
+    else
+    {
+      PyErr_SetString(PyExc_TypeError, "not a numpy array");
+      SWIG_fail;
+    }
+  }
+  {
+    /* %typemap(in,numinputs=1) (PyArrayObject  *psArray) */
+    if (obj2 != NULL && PyArray_Check(obj2))
+    {
+      arg3 = (PyArrayObject*)(obj2);
+    }
+    else
+    {
+      PyErr_SetString(PyExc_TypeError, "not a numpy array");
+      SWIG_fail;
+    }
+  }
+  {
+    /* %typemap(in,numinputs=1) (PyArrayObject  *psArray) */
+    if (obj3 != NULL && PyArray_Check(obj3))
+    {
+      arg4 = (PyArrayObject*)(obj3);
+    }
+    else
+    {
+      PyErr_SetString(PyExc_TypeError, "not a numpy array");
+      SWIG_fail;
+    }
+  }
+  {
+    // %typemap(in) GDALRIOResampleAlg
+    int val = 0;
+    int ecode = SWIG_AsVal_int(obj4, &val);
+    if (!SWIG_IsOK(ecode)) {
+      SWIG_exception_fail(SWIG_ArgError(ecode), "invalid value for GDALRIOResampleAlg");
+    }
+    if( val < 0 ||
+      ( val >= static_cast<int>(GRIORA_RESERVED_START) &&
+        val <= static_cast<int>(GRIORA_RESERVED_END) ) ||
+      val > static_cast<int>(GRIORA_LAST) )
+    {
+      SWIG_exception_fail(SWIG_ValueError, "Invalid value for resample_alg");
+    }
+    arg5 = static_cast< GDALRIOResampleAlg >(val);
+  }
+  {
+    SWIG_PYTHON_THREAD_BEGIN_ALLOW;
+    result = (CPLErr)BandSamplePointsNumPy(arg1,arg2,arg3,arg4,arg5);
+    SWIG_PYTHON_THREAD_END_ALLOW;
+  }
+  resultobj = SWIG_From_int(static_cast< int >(result));
+  return resultobj;
+fail:
+  return NULL;
+}
+
+
 SWIGINTERN PyObject *_wrap_DatasetIONumPy(PyObject *SWIGUNUSEDPARM(self), PyObject *args, PyObject *kwargs) {
   PyObject *resultobj = 0;
   GDALDatasetShadow *arg1 = (GDALDatasetShadow *) 0 ;
@@ -6607,6 +6906,7 @@ static PyMethodDef SwigMethods[] = {
 	 { "OpenMultiDimensionalNumPyArray", _wrap_OpenMultiDimensionalNumPyArray, METH_O, "OpenMultiDimensionalNumPyArray(PyArrayObject * psArray) -> Dataset"},
 	 { "GetArrayFilename", _wrap_GetArrayFilename, METH_O, "GetArrayFilename(PyArrayObject * psArray) -> retStringAndCPLFree *"},
 	 { "BandRasterIONumPy", (PyCFunction)(void(*)(void))_wrap_BandRasterIONumPy, METH_VARARGS|METH_KEYWORDS, "BandRasterIONumPy(Band band, int bWrite, double xoff, double yoff, double xsize, double ysize, PyArrayObject * psArray, GDALDataType buf_type, GDALRIOResampleAlg resample_alg, GDALProgressFunc callback=0, void * callback_data=None) -> CPLErr"},
+	 { "BandSamplePointsNumPy", (PyCFunction)(void(*)(void))_wrap_BandSamplePointsNumPy, METH_VARARGS|METH_KEYWORDS, "BandSamplePointsNumPy(Band band, PyArrayObject * psXArray, PyArrayObject * psYArray, PyArrayObject * psArray, GDALRIOResampleAlg resample_alg) -> CPLErr"},
 	 { "DatasetIONumPy", (PyCFunction)(void(*)(void))_wrap_DatasetIONumPy, METH_VARARGS|METH_KEYWORDS, "DatasetIONumPy(Dataset ds, int bWrite, double xoff, double yoff, double xsize, double ysize, PyArrayObject * psArray, GDALDataType buf_type, GDALRIOResampleAlg resample_alg, GDALProgressFunc callback=0, void * callback_data=None, bool binterleave=True, int band_list=0) -> CPLErr"},
 	 { "MDArrayIONumPy", _wrap_MDArrayIONumPy, METH_VARARGS, "MDArrayIONumPy(bool bWrite, GDALMDArrayHS * mdarray, PyArrayObject * psArray, int nDims1, int nDims3, GDALExtendedDataTypeHS * buffer_datatype) -> CPLErr"},
 	 { "_RecordBatchAsNumpy", _wrap__RecordBatchAsNumpy, METH_VARARGS, "_RecordBatchAsNumpy(VoidPtrAsLong recordBatchPtr, VoidPtrAsLong schemaPtr, PyObject * pointerArrayKeeper) -> PyObject *"},
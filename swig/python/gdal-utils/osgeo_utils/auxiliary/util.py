@@ -29,6 +29,8 @@
 #  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 #  DEALINGS IN THE SOFTWARE.
 # ******************************************************************************
+import collections
+import concurrent.futures
 import os
 from numbers import Real
 from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
@@ -125,6 +127,33 @@ def open_ds(
     return ods.__enter__()
 
 
+def get_num_threads(num_threads: Optional[Union[int, str]]) -> int:
+    """Return the number of threads to use, given as a number or ALL_CPUS"""
+    if num_threads is None:
+        return 1
+    if isinstance(num_threads, str) and num_threads.upper() == "ALL_CPUS":
+        return os.cpu_count() or 1
+    num_threads = int(num_threads)
+    if num_threads < 1:
+        raise Exception(f"Error! Invalid number of threads: {num_threads}")
+    return num_threads
+
+
+def map_in_threads(func, iterable, num_threads: int):
+    """
+    Like map(), calling func in num_threads threads, with at most
+    2 * num_threads calls pending
+    """
+    with concurrent.futures.ThreadPoolExecutor(num_threads) as executor:
+        pending = collections.deque()
+        for arg in iterable:
+            pending.append(executor.submit(func, arg))
+            if len(pending) > 2 * num_threads:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
 def get_ovr_count(filename_or_ds: PathOrDS) -> int:
     with OpenDS(filename_or_ds) as ds:
         bnd = ds.GetRasterBand(1)
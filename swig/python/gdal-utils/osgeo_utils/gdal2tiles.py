@@ -40,29 +40,33 @@ from __future__ import division, print_function
 
 import contextlib
 import glob
+import hashlib
 import json
 import math
 import optparse
 import os
+import queue
 import shutil
+import sqlite3
 import stat
 import sys
 import tempfile
 import threading
-from functools import partial
-from typing import Any, List, NoReturn, Optional, Tuple
+from functools import lru_cache, partial
+from typing import Any, Dict, Iterator, List, NoReturn, Optional, Set, Tuple
+from urllib.request import pathname2url
 from uuid import uuid4
 from xml.etree import ElementTree
 
-from osgeo import gdal, osr
+from osgeo import gdal, ogr, osr
 
 Options = Any
+# (tz, tx, ty, encoded tile) of a tile to be written in a MBTiles/GPKG container.
+# The encoded tile is None for a tile file hard-linked to an identical one.
+EncodedTile = Tuple[int, int, int, Optional[bytes]]
 
 try:
     import numpy
-    from PIL import Image
-
-    import osgeo.gdal_array as gdalarray
 
     numpy_available = True
 except ImportError:
@@ -87,6 +91,7 @@ resampling_list = (
     "q3",
 )
 webviewer_list = ("all", "google", "openlayers", "leaflet", "mapml", "none")
+container_list = ("directory", "mbtiles", "gpkg")
 
 
 def makedirs(path):
@@ -862,6 +867,60 @@ def generate_kml(
     return s
 
 
+@lru_cache(maxsize=None)
+def lanczos_weights(in_size: int, out_size: int) -> Tuple[Any, Any]:
+    """
+    Indices and weights of the input pixels (taps) contributing to each output
+    pixel, as two (out_size, taps) arrays, when downsampling with a Lanczos (a=3)
+    filter stretched to the scaling factor
+    """
+    scale = in_size / float(out_size)
+    support = 3.0 * scale
+    centers = (numpy.arange(out_size) + 0.5) * scale
+    first = numpy.floor(centers - support + 0.5).astype(numpy.int64)
+    indices = first[:, numpy.newaxis] + numpy.arange(int(math.ceil(2 * support)) + 1)
+    x = (indices + 0.5 - centers[:, numpy.newaxis]) / scale
+    weights = numpy.sinc(x) * numpy.sinc(x / 3.0)
+    weights[(numpy.abs(x) >= 3.0) | (indices < 0) | (indices >= in_size)] = 0
+    weights /= weights.sum(axis=1, keepdims=True)
+
+    # Taps out of the image have a null weight, and are clamped to a valid index
+    return numpy.clip(indices, 0, in_size - 1), weights.astype(numpy.float32)
+
+
+def lanczos_downsample(array: Any, out_size: int) -> Any:
+    """
+    Downsample a (bands, size, size) Byte array whose last band is alpha, with a
+    separable Lanczos filter applied on colors premultiplied by alpha
+    """
+    indices, weights = lanczos_weights(array.shape[1], out_size)
+    data = array.astype(numpy.float32)
+    data[:-1] *= data[-1] / 255
+
+    # Vertical pass, accumulating the input rows gathered for each tap
+    rows = numpy.zeros((data.shape[0], out_size, data.shape[2]), numpy.float32)
+    buf = numpy.empty_like(rows)
+    for k in range(indices.shape[1]):
+        numpy.take(data, indices[:, k], axis=1, out=buf)
+        buf *= weights[:, k, numpy.newaxis]
+        rows += buf
+
+    # Horizontal pass, on the columns
+    out = numpy.zeros((data.shape[0], out_size, out_size), numpy.float32)
+    buf = numpy.empty_like(out)
+    for k in range(indices.shape[1]):
+        numpy.take(rows, indices[:, k], axis=2, out=buf)
+        buf *= weights[:, k]
+        out += buf
+
+    numpy.clip(out, 0, 255, out=out)
+    alpha = out[-1]
+    out[:-1] = numpy.where(
+        alpha > 0, out[:-1] * 255 / numpy.maximum(alpha, 1e-6), 0
+    ).clip(0, 255)
+    return numpy.rint(out).astype(numpy.uint8)
+
+
 def scale_query_to_tile(dsquery, dstile, options, tilefilename=""):
     """Scales down query dataset to the tile dataset"""
 
@@ -884,30 +943,31 @@ def scale_query_to_tile(dsquery, dstile, options, tilefilename=""):
 
     elif options.resampling == "antialias" and numpy_available:
 
-        if tilefilename.startswith("/vsi"):
-            raise Exception(
-                "Outputing to /vsi file systems with antialias mode is not supported"
-            )
+        array = numpy.frombuffer(dsquery.ReadRaster(), dtype=numpy.uint8).reshape(
+            tilebands, querysize, querysize
+        )
+        array = lanczos_downsample(array, tile_size)
 
-        # Scaling by PIL (Python Imaging Library) - improved Lanczos
-        array = numpy.zeros((querysize, querysize, tilebands), numpy.uint8)
-        for i in range(tilebands):
-            array[:, :, i] = gdalarray.BandReadAsArray(
-                dsquery.GetRasterBand(i + 1), 0, 0, querysize, querysize
-            )
-        im = Image.fromarray(array, "RGBA")  # Always four bands
-        im1 = im.resize((tile_size, tile_size), Image.LANCZOS)
-        if os.path.exists(tilefilename):
-            im0 = Image.open(tilefilename)
-            im1 = Image.composite(im1, im0, im1)
-
-        params = {}
-        if options.tiledriver == "WEBP":
-            if options.webp_lossless:
-                params["lossless"] = True
-            else:
-                params["quality"] = options.webp_quality
-        im1.save(tilefilename, options.tiledriver, **params)
+        # Blend over a tile of the same name already there
+        if (
+            not is_incremental(options)
+            and options.container == "directory"
+            and isfile(tilefilename)
+        ):
+            ds = gdal.Open(tilefilename, gdal.GA_ReadOnly)
+            if (ds.RasterXSize, ds.RasterYSize, ds.RasterCount) == (
+                tile_size,
+                tile_size,
+                tilebands,
+            ):
+                previous = numpy.frombuffer(ds.ReadRaster(), dtype=numpy.uint8)
+                previous = previous.reshape(tilebands, tile_size, tile_size)
+                alpha = array[-1:] / numpy.float32(255)
+                array = numpy.rint(array * alpha + previous * (1 - alpha))
+                array = array.astype(numpy.uint8)
+            ds = None
+
+        dstile.WriteRaster(0, 0, tile_size, tile_size, array.tobytes())
 
     else:
 
@@ -1059,6 +1119,129 @@ def has_georeference(dataset: gdal.Dataset) -> bool:
     )
 
 
+def extent_to_geometry(
+    minx: float, miny: float, maxx: float, maxy: float
+) -> ogr.Geometry:
+    return ogr.CreateGeometryFromWkt(
+        "POLYGON ((%.17g %.17g,%.17g %.17g,%.17g %.17g,%.17g %.17g,%.17g %.17g))"
+        % (minx, miny, minx, maxy, maxx, maxy, maxx, miny, minx, miny)
+    )
+
+
+def transform_geometry(
+    geometry: ogr.Geometry,
+    from_srs: Optional[osr.SpatialReference],
+    to_srs: Optional[osr.SpatialReference],
+) -> ogr.Geometry:
+    """Reproject a geometry, densified so that its edges follow the reprojection"""
+    if from_srs is None or to_srs is None or from_srs.IsSame(to_srs):
+        return geometry
+    minx, maxx, miny, maxy = geometry.GetEnvelope()
+    if maxx > minx or maxy > miny:
+        geometry.Segmentize(max(maxx - minx, maxy - miny) / 64)
+    geometry.Transform(osr.CoordinateTransformation(from_srs, to_srs))
+    return geometry
+
+
+def get_vrt_sources(vrt_filename: str) -> Dict[str, Tuple[float, ...]]:
+    """
+    Return the georeferenced extent of the sources of a VRT, keyed by their
+    band and XML definition, with the source filenames made absolute
+    """
+    ds = gdal.Open(vrt_filename)
+    if ds is None or ds.GetDriver().ShortName != "VRT":
+        exit_with_error("'%s' is not a VRT file" % vrt_filename)
+    gt = ds.GetGeoTransform()
+    vrt_dir = os.path.dirname(vrt_filename)
+
+    sources = {}
+    root = ElementTree.fromstring(ds.GetMetadata("xml:VRT")[0])
+    for band in root.findall("VRTRasterBand"):
+        for source in band:
+            dst_rect = source.find("DstRect")
+            if not source.tag.endswith("Source") or dst_rect is None:
+                continue
+            source_filename = source.find("SourceFilename")
+            if source_filename is not None:
+                if source_filename.get("relativeToVRT") == "1":
+                    source_filename.text = os.path.normpath(
+                        os.path.join(vrt_dir, source_filename.text)
+                    )
+                    source_filename.set("relativeToVRT", "0")
+            key = band.get("band") + ElementTree.tostring(source).decode("utf-8")
+
+            xoff, yoff, xsize, ysize = (
+                float(dst_rect.get(x)) for x in ("xOff", "yOff", "xSize", "ySize")
+            )
+            x1 = gt[0] + xoff * gt[1]
+            x2 = gt[0] + (xoff + xsize) * gt[1]
+            y1 = gt[3] + yoff * gt[5]
+            y2 = gt[3] + (yoff + ysize) * gt[5]
+            sources[key] = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+    return sources
+
+
+def setup_changed_area(
+    input_file: str,
+    input_srs: Optional[osr.SpatialReference],
+    output_srs: Optional[osr.SpatialReference],
+    options: Options,
+) -> Optional[ogr.Geometry]:
+    """
+    Returns the area where the input changed, in the output SRS, from the
+    --changed-area bounding box or vector dataset, and from the sources that
+    differ between the input VRT and the --changed-vrt one.
+    None if all the tiles are to be generated.
+    """
+    if not options.changed_area and not options.changed_vrt:
+        return None
+
+    changed_area = ogr.Geometry(ogr.wkbGeometryCollection)
+
+    if options.changed_area:
+        try:
+            extent = [float(x) for x in options.changed_area.split(",")]
+        except ValueError:
+            extent = None
+        if extent is not None:
+            if len(extent) != 4:
+                exit_with_error(
+                    "--changed-area should be minx,miny,maxx,maxy or a vector dataset"
+                )
+            changed_area.AddGeometry(extent_to_geometry(*extent))
+        else:
+            vector_ds = ogr.Open(options.changed_area)
+            if vector_ds is None:
+                exit_with_error(
+                    "Cannot open '%s' as a vector dataset" % options.changed_area
+                )
+            for layer in vector_ds:
+                layer_srs = layer.GetSpatialRef()
+                if layer_srs is not None:
+                    layer_srs = layer_srs.Clone()
+                    layer_srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+                for feature in layer:
+                    geometry = feature.GetGeometryRef()
+                    if geometry is not None:
+                        changed_area.AddGeometry(
+                            transform_geometry(geometry.Clone(), layer_srs, input_srs)
+                        )
+
+    if options.changed_vrt:
+        old_sources = get_vrt_sources(options.changed_vrt)
+        new_sources = get_vrt_sources(input_file)
+        # Sources removed from the VRT, or added to it (including modified ones)
+        for key in set(old_sources).symmetric_difference(new_sources):
+            extent = old_sources[key] if key in old_sources else new_sources[key]
+            changed_area.AddGeometry(extent_to_geometry(*extent))
+
+    if options.verbose:
+        print("Changed area (input srs):", changed_area.GetEnvelope())
+
+    return transform_geometry(changed_area, input_srs, output_srs)
+
+
 def reproject_dataset(
     from_dataset: gdal.Dataset,
     from_srs: Optional[osr.SpatialReference],
@@ -1295,7 +1478,485 @@ def _get_creation_options(options):
     return copts
 
 
-def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") -> None:
+class RawTileCache(object):
+    """
+    Raw (uncompressed, band sequential) pixel buffers of the tiles rendered by a
+    process, kept so that the overview tiles above them can be built without
+    decoding the tiles that have just been written. Buffers that do not fit in
+    the memory budget are spilled as raw files into a temporary directory.
+    """
+
+    def __init__(self, max_bytes: int, spill_dir: str) -> None:
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.buffers = {}
+        self.spilled = set()
+        self.size = 0
+
+    def _spill_filename(self, key: Tuple[int, int, int]) -> str:
+        return os.path.join(self.spill_dir, "%d_%d_%d.raw" % key)
+
+    def put(self, key: Tuple[int, int, int], data: bytes) -> None:
+        if self.size + len(data) <= self.max_bytes:
+            self.buffers[key] = data
+            self.size += len(data)
+        else:
+            with open(self._spill_filename(key), "wb") as f:
+                f.write(data)
+            self.spilled.add(key)
+
+    def pop(self, key: Tuple[int, int, int]) -> Optional[bytes]:
+        """Return and forget the buffer of a tile, or None if it is not cached"""
+        data = self.buffers.pop(key, None)
+        if data is not None:
+            self.size -= len(data)
+        elif key in self.spilled:
+            self.spilled.remove(key)
+            filename = self._spill_filename(key)
+            with open(filename, "rb") as f:
+                data = f.read()
+            os.unlink(filename)
+        return data
+
+    def clear(self) -> None:
+        for key in self.spilled:
+            os.unlink(self._spill_filename(key))
+        self.spilled = set()
+        self.buffers = {}
+        self.size = 0
+
+
+def keep_raw_tile(
+    tile_job_info: "TileJobInfo", key: Tuple[int, int, int], dstile: gdal.Dataset
+) -> None:
+    """Store the raw buffer of a rendered tile if in-memory overviews are enabled"""
+    raw_tile_cache = getattr(threadLocal, "raw_tile_cache", None)
+    if raw_tile_cache is None:
+        return
+    raw_tile_cache.put(
+        key, dstile.ReadRaster(0, 0, tile_job_info.tile_size, tile_job_info.tile_size)
+    )
+
+
+class TileContainer(object):
+    """
+    MBTiles or GeoPackage file receiving the encoded tiles, instead of a z/x/y
+    directory tree. Tiles are written by a single process in large transactions,
+    and read back by the worker processes to build the overview tiles.
+
+    Tiles are identified by the same (tz, tx, ty) as the tile files would be.
+    """
+
+    batch_size = 10000
+
+    def __init__(self, filename: str, options: Options, readonly: bool = False):
+        self.filename = filename
+        self.options = options
+        if readonly:
+            self.conn = sqlite3.connect(
+                "file:%s?mode=ro" % pathname2url(os.path.abspath(filename)),
+                uri=True,
+                timeout=60,
+            )
+        else:
+            self.conn = sqlite3.connect(filename, timeout=60)
+        if options.container == "mbtiles":
+            self.table_name = "tiles"
+        else:
+            self.table_name = os.path.splitext(os.path.basename(filename))[0]
+        self.quoted_table_name = '"%s"' % self.table_name.replace('"', '""')
+        self.pending_tiles = []
+        self.nb_deduplicated = 0
+        self.shared_tile_data = self._has_shared_tile_data()
+
+    def _has_shared_tile_data(self) -> bool:
+        """Whether identical tiles share their data (MBTiles 'map' and 'images')"""
+        c = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = 'tiles'"
+        )
+        return self.options.container == "mbtiles" and c.fetchone() is not None
+
+    def _tile_row(self, tz: int, ty: int) -> int:
+        tms_ty = GDAL2Tiles.getYTile(ty, tz, self.options)
+        if self.options.container == "mbtiles":
+            return tms_ty
+        # GeoPackage tile rows start from the top of the tile matrix
+        return 2**tz - 1 - tms_ty
+
+    def create(
+        self,
+        tminmax: List[Tuple[int, int, int, int]],
+        tminz: int,
+        tmaxz: int,
+        tile_size: int,
+        bounds: Tuple[float, float, float, float],
+        swne: Tuple[float, float, float, float],
+    ) -> None:
+        """Create the tables of the container and fill its metadata"""
+
+        c = self.conn.cursor()
+        if self.options.container == "mbtiles":
+            c.execute("CREATE TABLE IF NOT EXISTS metadata (name TEXT, value TEXT)")
+            tiles_exists = c.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'tiles'"
+            ).fetchone()
+            if self.options.deduplicate and not tiles_exists:
+                # Identical tiles reference the same row of 'images'
+                c.execute(
+                    "CREATE TABLE map (zoom_level INTEGER, tile_column INTEGER, "
+                    "tile_row INTEGER, tile_id TEXT)"
+                )
+                c.execute(
+                    "CREATE UNIQUE INDEX map_index ON map "
+                    "(zoom_level, tile_column, tile_row)"
+                )
+                c.execute("CREATE TABLE images (tile_data BLOB, tile_id TEXT)")
+                c.execute("CREATE UNIQUE INDEX images_id ON images (tile_id)")
+                c.execute(
+                    "CREATE VIEW tiles AS SELECT map.zoom_level AS zoom_level, "
+                    "map.tile_column AS tile_column, map.tile_row AS tile_row, "
+                    "images.tile_data AS tile_data FROM map "
+                    "JOIN images ON images.tile_id = map.tile_id"
+                )
+            elif not tiles_exists:
+                c.execute(
+                    "CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, "
+                    "tile_row INTEGER, tile_data BLOB)"
+                )
+                c.execute(
+                    "CREATE UNIQUE INDEX tile_index ON tiles "
+                    "(zoom_level, tile_column, tile_row)"
+                )
+            south, west, north, east = swne
+            metadata = {
+                "name": self.options.title,
+                "description": self.options.title,
+                "type": "overlay",
+                "version": "1.1",
+                "format": self.options.tiledriver.lower(),
+                "bounds": "%.14f,%.14f,%.14f,%.14f" % (west, south, east, north),
+                "minzoom": str(tminz),
+                "maxzoom": str(tmaxz),
+            }
+            c.execute("DELETE FROM metadata")
+            c.executemany("INSERT INTO metadata VALUES (?, ?)", metadata.items())
+            self.conn.commit()
+            self.shared_tile_data = self._has_shared_tile_data()
+            return
+
+        if self.options.profile == "mercator":
+            srs_id = 3857
+            origin_shift = GlobalMercator(tile_size).originShift
+            extent = (-origin_shift, -origin_shift, origin_shift, origin_shift)
+        else:
+            srs_id = 4326
+            extent = (-180.0, -90.0, 180.0, 90.0)
+
+        c.execute("PRAGMA application_id = 1196444487")  # 'GPKG'
+        c.execute("PRAGMA user_version = 10200")
+        c.execute(
+            "CREATE TABLE IF NOT EXISTS gpkg_spatial_ref_sys (srs_name TEXT NOT NULL, "
+            "srs_id INTEGER NOT NULL PRIMARY KEY, organization TEXT NOT NULL, "
+            "organization_coordsys_id INTEGER NOT NULL, definition TEXT NOT NULL, "
+            "description TEXT)"
+        )
+        c.execute(
+            "CREATE TABLE IF NOT EXISTS gpkg_contents (table_name TEXT NOT NULL "
+            "PRIMARY KEY, data_type TEXT NOT NULL, identifier TEXT UNIQUE, "
+            "description TEXT DEFAULT '', last_change DATETIME NOT NULL DEFAULT "
+            "(strftime('%Y-%m-%dT%H:%M:%fZ','now')), min_x DOUBLE, min_y DOUBLE, "
+            "max_x DOUBLE, max_y DOUBLE, srs_id INTEGER, "
+            "CONSTRAINT fk_gc_r_srs_id FOREIGN KEY (srs_id) "
+            "REFERENCES gpkg_spatial_ref_sys(srs_id))"
+        )
+        c.execute(
+            "CREATE TABLE IF NOT EXISTS gpkg_tile_matrix_set (table_name TEXT NOT "
+            "NULL PRIMARY KEY, srs_id INTEGER NOT NULL, min_x DOUBLE NOT NULL, "
+            "min_y DOUBLE NOT NULL, max_x DOUBLE NOT NULL, max_y DOUBLE NOT NULL, "
+            "CONSTRAINT fk_gtms_table_name FOREIGN KEY (table_name) "
+            "REFERENCES gpkg_contents(table_name), CONSTRAINT fk_gtms_srs "
+            "FOREIGN KEY (srs_id) REFERENCES gpkg_spatial_ref_sys (srs_id))"
+        )
+        c.execute(
+            "CREATE TABLE IF NOT EXISTS gpkg_tile_matrix (table_name TEXT NOT NULL, "
+            "zoom_level INTEGER NOT NULL, matrix_width INTEGER NOT NULL, "
+            "matrix_height INTEGER NOT NULL, tile_width INTEGER NOT NULL, "
+            "tile_height INTEGER NOT NULL, pixel_x_size DOUBLE NOT NULL, "
+            "pixel_y_size DOUBLE NOT NULL, CONSTRAINT pk_ttm PRIMARY KEY "
+            "(table_name, zoom_level), CONSTRAINT fk_tmm_table_name FOREIGN KEY "
+            "(table_name) REFERENCES gpkg_contents(table_name))"
+        )
+        c.execute(
+            "CREATE TABLE IF NOT EXISTS gpkg_extensions (table_name TEXT, "
+            "column_name TEXT, extension_name TEXT NOT NULL, definition TEXT NOT "
+            "NULL, scope TEXT NOT NULL, CONSTRAINT ge_tce UNIQUE "
+            "(table_name, column_name, extension_name))"
+        )
+        c.execute(
+            "CREATE TABLE IF NOT EXISTS %s (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "zoom_level INTEGER NOT NULL, tile_column INTEGER NOT NULL, "
+            "tile_row INTEGER NOT NULL, tile_data BLOB NOT NULL, "
+            "UNIQUE (zoom_level, tile_column, tile_row))" % self.quoted_table_name
+        )
+
+        srs_rows = [
+            ("Undefined cartesian SRS", -1, "NONE", -1, "undefined", None),
+            ("Undefined geographic SRS", 0, "NONE", 0, "undefined", None),
+        ]
+        for epsg in sorted(set((4326, srs_id))):
+            srs = osr.SpatialReference()
+            srs.ImportFromEPSG(epsg)
+            srs_rows.append(
+                (srs.GetName(), epsg, "EPSG", epsg, srs.ExportToWkt(), None)
+            )
+        c.executemany(
+            "INSERT OR REPLACE INTO gpkg_spatial_ref_sys VALUES (?, ?, ?, ?, ?, ?)",
+            srs_rows,
+        )
+        c.execute(
+            "INSERT OR REPLACE INTO gpkg_contents (table_name, data_type, "
+            "identifier, description, min_x, min_y, max_x, max_y, srs_id) "
+            "VALUES (?, 'tiles', ?, '', ?, ?, ?, ?, ?)",
+            (self.table_name, self.options.title) + tuple(bounds) + (srs_id,),
+        )
+        c.execute(
+            "INSERT OR REPLACE INTO gpkg_tile_matrix_set VALUES (?, ?, ?, ?, ?, ?)",
+            (self.table_name, srs_id) + extent,
+        )
+        c.execute(
+            "DELETE FROM gpkg_tile_matrix WHERE table_name = ?", (self.table_name,)
+        )
+        for tz in range(tminz, tmaxz + 1):
+            matrix_width = (2 if srs_id == 4326 else 1) * 2**tz
+            matrix_height = 2**tz
+            pixel_size = (extent[2] - extent[0]) / (matrix_width * tile_size)
+            c.execute(
+                "INSERT INTO gpkg_tile_matrix VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.table_name,
+                    tz,
+                    matrix_width,
+                    matrix_height,
+                    tile_size,
+                    tile_size,
+                    pixel_size,
+                    pixel_size,
+                ),
+            )
+        if self.options.tiledriver == "WEBP":
+            c.execute(
+                "INSERT OR REPLACE INTO gpkg_extensions VALUES (?, 'tile_data', "
+                "'gpkg_webp', 'GeoPackage 1.0 Specification Annex P', 'read-write')",
+                (self.table_name,),
+            )
+        self.conn.commit()
+
+    def has_tile(self, tz: int, tx: int, ty: int) -> bool:
+        c = self.conn.execute(
+            "SELECT 1 FROM %s WHERE zoom_level = ? AND tile_column = ? AND "
+            "tile_row = ?" % self.quoted_table_name,
+            (tz, tx, self._tile_row(tz, ty)),
+        )
+        return c.fetchone() is not None
+
+    def read_tile(self, tz: int, tx: int, ty: int) -> Optional[bytes]:
+        c = self.conn.execute(
+            "SELECT tile_data FROM %s WHERE zoom_level = ? AND tile_column = ? AND "
+            "tile_row = ?" % self.quoted_table_name,
+            (tz, tx, self._tile_row(tz, ty)),
+        )
+        row = c.fetchone()
+        return row[0] if row else None
+
+    def write_tile(self, encoded_tile: EncodedTile) -> None:
+        tz, tx, ty, data = encoded_tile
+        self.pending_tiles.append((tz, tx, self._tile_row(tz, ty), data))
+        if len(self.pending_tiles) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Commit the pending tiles, so that they are visible to other processes"""
+        if not self.pending_tiles:
+            return
+        if self.shared_tile_data:
+            tile_ids = [hashlib.md5(t[3]).hexdigest() for t in self.pending_tiles]
+            c = self.conn.executemany(
+                "INSERT OR IGNORE INTO images (tile_data, tile_id) VALUES (?, ?)",
+                [(t[3], tile_id) for t, tile_id in zip(self.pending_tiles, tile_ids)],
+            )
+            self.nb_deduplicated += len(self.pending_tiles) - c.rowcount
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO map (zoom_level, tile_column, tile_row, "
+                "tile_id) VALUES (?, ?, ?, ?)",
+                [
+                    t[:3] + (tile_id,)
+                    for t, tile_id in zip(self.pending_tiles, tile_ids)
+                ],
+            )
+        else:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO %s (zoom_level, tile_column, tile_row, "
+                "tile_data) VALUES (?, ?, ?, ?)" % self.quoted_table_name,
+                self.pending_tiles,
+            )
+        self.conn.commit()
+        self.pending_tiles = []
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+
+def get_tile_container(tile_job_info: "TileJobInfo") -> TileContainer:
+    """Return a read-only connection to the tile container, cached per process"""
+    tile_container = getattr(threadLocal, "tile_container", None)
+    if (
+        tile_container is None
+        or tile_container.filename != tile_job_info.output_file_path
+    ):
+        tile_container = TileContainer(
+            tile_job_info.output_file_path, tile_job_info.options, readonly=True
+        )
+        threadLocal.tile_container = tile_container
+    return tile_container
+
+
+def tile_exists(
+    tile_job_info: "TileJobInfo", tilefilename: str, key: Tuple[int, int, int]
+) -> bool:
+    """Whether a tile has already been written, as a file or in the container"""
+    if tile_job_info.options.container == "directory":
+        return isfile(tilefilename)
+    return get_tile_container(tile_job_info).has_tile(*key)
+
+
+def open_tile(
+    tile_job_info: "TileJobInfo", tilefilename: str, key: Tuple[int, int, int]
+) -> Optional[gdal.Dataset]:
+    """Open a tile previously written, as a file or in the container"""
+    if tile_job_info.options.container == "directory":
+        if not isfile(tilefilename):
+            return None
+        return gdal.Open(tilefilename, gdal.GA_ReadOnly)
+
+    data = get_tile_container(tile_job_info).read_tile(*key)
+    if data is None:
+        return None
+    vsimem_filename = "/vsimem/%s.%s" % (uuid4(), tile_job_info.tile_extension)
+    gdal.FileFromMemBuffer(vsimem_filename, data)
+    try:
+        ds = gdal.Open(vsimem_filename, gdal.GA_ReadOnly)
+        return gdal.GetDriverByName("MEM").CreateCopy("", ds, 0)
+    finally:
+        ds = None
+        gdal.Unlink(vsimem_filename)
+
+
+def get_uniform_color(data: bytes, nb_bands: int) -> Optional[Tuple[int, ...]]:
+    """
+    Return the value of each band if all the pixels of a band sequential Byte
+    buffer have the same color, None otherwise
+    """
+    band_size = len(data) // nb_bands
+    if numpy_available:
+        array = numpy.frombuffer(data, dtype=numpy.uint8).reshape(nb_bands, band_size)
+        if not (array == array[:, :1]).all():
+            return None
+        return tuple(int(v) for v in array[:, 0])
+
+    color = []
+    for i in range(nb_bands):
+        band_data = data[i * band_size : (i + 1) * band_size]
+        if band_data != band_data[:1] * band_size:
+            return None
+        color.append(band_data[0])
+    return tuple(color)
+
+
+def link_tile(src_filename: str, dst_filename: str) -> bool:
+    """Make a tile file a hard link to another one, if the file system allows it"""
+    if dst_filename.startswith("/vsi"):
+        return False
+    try:
+        os.link(src_filename, dst_filename)
+    except OSError:
+        return False
+    return True
+
+
+def write_tile(
+    tile_job_info: "TileJobInfo",
+    tilefilename: str,
+    key: Tuple[int, int, int],
+    dstile: gdal.Dataset,
+) -> Optional[EncodedTile]:
+    """
+    Encode a tile into its file, or in memory when writing to a container, in
+    which case the encoded tile is returned for the writer process.
+
+    With --deduplicate, single color tiles are encoded only once per process:
+    the other tile files of the same color are hard links to the first one, and
+    the other tiles sent to a container reuse its encoded data.
+    """
+    options = tile_job_info.options
+    out_drv = gdal.GetDriverByName(tile_job_info.tile_driver)
+
+    uniform_color = None
+    if options.deduplicate:
+        uniform_color = get_uniform_color(
+            dstile.ReadRaster(0, 0, tile_job_info.tile_size, tile_job_info.tile_size),
+            dstile.RasterCount,
+        )
+        if getattr(threadLocal, "uniform_tiles", None) is None:
+            threadLocal.uniform_tiles = {}
+        uniform_tiles = threadLocal.uniform_tiles
+
+    if options.container == "directory":
+        same_tilefilename = None
+        if uniform_color is not None:
+            same_tilefilename = uniform_tiles.get(uniform_color)
+
+        # Do not overwrite in place a file hard-linked to other tiles
+        if not tilefilename.startswith("/vsi") and os.path.isfile(tilefilename):
+            if same_tilefilename or os.stat(tilefilename).st_nlink > 1:
+                os.unlink(tilefilename)
+
+        if same_tilefilename:
+            if link_tile(same_tilefilename, tilefilename):
+                return key + (None,)
+
+        out_drv.CreateCopy(
+            tilefilename, dstile, strict=0, options=_get_creation_options(options)
+        )
+        if uniform_color is not None:
+            uniform_tiles[uniform_color] = tilefilename
+        return None
+
+    if uniform_color is not None and uniform_color in uniform_tiles:
+        return key + (uniform_tiles[uniform_color],)
+
+    vsimem_filename = "/vsimem/%s.%s" % (uuid4(), tile_job_info.tile_extension)
+    out_drv.CreateCopy(
+        vsimem_filename, dstile, strict=0, options=_get_creation_options(options)
+    )
+    f = gdal.VSIFOpenL(vsimem_filename, "rb")
+    gdal.VSIFSeekL(f, 0, 2)
+    size = gdal.VSIFTellL(f)
+    gdal.VSIFSeekL(f, 0, 0)
+    data = gdal.VSIFReadL(1, size, f)
+    gdal.VSIFCloseL(f)
+    gdal.Unlink(vsimem_filename)
+    if gdal.VSIStatL(vsimem_filename + ".aux.xml") is not None:
+        gdal.Unlink(vsimem_filename + ".aux.xml")
+
+    if uniform_color is not None:
+        uniform_tiles[uniform_color] = data
+    return key + (data,)
+
+
+def create_base_tile(
+    tile_job_info: "TileJobInfo", tile_detail: "TileDetail"
+) -> Optional[EncodedTile]:
 
     dataBandsCount = tile_job_info.nb_data_bands
     output = tile_job_info.output_file_path
@@ -1313,7 +1974,6 @@ def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") ->
         threadLocal.cached_ds = ds
 
     mem_drv = gdal.GetDriverByName("MEM")
-    out_drv = gdal.GetDriverByName(tile_job_info.tile_driver)
     alphaband = ds.GetRasterBand(1).GetMaskBand()
 
     tx = tile_detail.tx
@@ -1347,10 +2007,15 @@ def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") ->
         alpha = alphaband.ReadRaster(rx, ry, rxsize, rysize, wxsize, wysize)
 
         # Detect totally transparent tile and skip its creation
-        if tile_job_info.exclude_transparent and len(alpha) == alpha.count(
-            "\x00".encode("ascii")
-        ):
-            return
+        if tile_job_info.exclude_transparent and get_uniform_color(alpha, 1) == (0,):
+            # Remove the tile generated before the area became transparent
+            if (
+                is_incremental(options)
+                and options.container == "directory"
+                and isfile(tilefilename)
+            ):
+                gdal.Unlink(tilefilename)
+            return None
 
         data = ds.ReadRaster(
             rx,
@@ -1362,9 +2027,25 @@ def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") ->
             band_list=list(range(1, dataBandsCount + 1)),
         )
 
+    # A query fully covered by a single color gives a single color tile whatever
+    # the resampling: fill the tile directly
+    uniform_color = None
+    if (
+        data
+        and options.deduplicate
+        and options.resampling != "antialias"
+        and (wx, wy, wxsize, wysize) == (0, 0, querysize, querysize)
+    ):
+        alpha_color = get_uniform_color(alpha, 1)
+        if alpha_color is not None:
+            uniform_color = get_uniform_color(data, dataBandsCount)
+        if uniform_color is not None:
+            for i, value in enumerate(uniform_color + alpha_color):
+                dstile.GetRasterBand(i + 1).Fill(value)
+
     # The tile in memory is a transparent file by default. Write pixel values into it if
     # any
-    if data:
+    if data and uniform_color is None:
         if tile_size == querysize:
             # Use the ReadRaster result directly in tiles ('nearest neighbour' query)
             dstile.WriteRaster(
@@ -1402,11 +2083,10 @@ def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") ->
 
     del data
 
-    if options.resampling != "antialias":
-        # Write a copy of tile to png/jpg
-        out_drv.CreateCopy(
-            tilefilename, dstile, strict=0, options=_get_creation_options(options)
-        )
+    # Write a copy of tile to png/jpg
+    encoded_tile = write_tile(tile_job_info, tilefilename, (tz, tx, ty), dstile)
+
+    keep_raw_tile(tile_job_info, (tz, tx, ty), dstile)
 
     del dstile
 
@@ -1434,6 +2114,8 @@ def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") ->
                         ).encode("utf-8")
                     )
 
+    return encoded_tile
+
 
 def create_overview_tile(
     base_tz: int,
@@ -1441,7 +2123,7 @@ def create_overview_tile(
     output_folder: str,
     tile_job_info: "TileJobInfo",
     options: Options,
-):
+) -> Optional[EncodedTile]:
     """Generating an overview tile from no more than 4 underlying tiles(base tiles)"""
 
     overview_tz = base_tz - 1
@@ -1457,14 +2139,14 @@ def create_overview_tile(
     )
     if options.verbose:
         print(tilefilename)
-    if options.resume and isfile(tilefilename):
+    if options.resume and tile_exists(
+        tile_job_info, tilefilename, (overview_tz, overview_tx, overview_ty_real)
+    ):
         if options.verbose:
             print("Tile generation skipped because of --resume")
-        return
+        return None
 
     mem_driver = gdal.GetDriverByName("MEM")
-    tile_driver = tile_job_info.tile_driver
-    out_driver = gdal.GetDriverByName(tile_driver)
 
     tilebands = tile_job_info.nb_data_bands + 1
 
@@ -1477,23 +2159,13 @@ def create_overview_tile(
     )
 
     usable_base_tiles = []
+    raw_tile_cache = getattr(threadLocal, "raw_tile_cache", None)
 
     for base_tile in base_tiles:
         base_tx = base_tile[0]
         base_ty = base_tile[1]
         base_ty_real = GDAL2Tiles.getYTile(base_ty, base_tz, options)
 
-        base_tile_path = os.path.join(
-            output_folder,
-            str(base_tz),
-            str(base_tx),
-            "%s.%s" % (base_ty_real, tile_job_info.tile_extension),
-        )
-        if not isfile(base_tile_path):
-            continue
-
-        dsquerytile = gdal.Open(base_tile_path, gdal.GA_ReadOnly)
-
         if base_tx % 2 == 0:
             tileposx = 0
         else:
@@ -1510,28 +2182,45 @@ def create_overview_tile(
             else:
                 tileposy = 0
 
-        if dsquerytile.RasterCount == tilebands - 1:
-            # assume that the alpha band is missing and add it
-            tmp_ds = mem_driver.CreateCopy("", dsquerytile, 0)
-            tmp_ds.AddBand()
-            mask = bytearray(
-                [255] * (tile_job_info.tile_size * tile_job_info.tile_size)
+        base_data = None
+        if raw_tile_cache is not None:
+            base_data = raw_tile_cache.pop((base_tz, base_tx, base_ty_real))
+
+        if base_data is None:
+            base_tile_path = os.path.join(
+                output_folder,
+                str(base_tz),
+                str(base_tx),
+                "%s.%s" % (base_ty_real, tile_job_info.tile_extension),
             )
-            tmp_ds.WriteRaster(
-                0,
-                0,
-                tile_job_info.tile_size,
-                tile_job_info.tile_size,
-                mask,
-                band_list=[tilebands],
+            dsquerytile = open_tile(
+                tile_job_info, base_tile_path, (base_tz, base_tx, base_ty_real)
             )
-            dsquerytile = tmp_ds
-        elif dsquerytile.RasterCount != tilebands:
-            raise Exception("Unexpected number of bands in base tile")
+            if dsquerytile is None:
+                continue
+
+            if dsquerytile.RasterCount == tilebands - 1:
+                # assume that the alpha band is missing and add it
+                tmp_ds = mem_driver.CreateCopy("", dsquerytile, 0)
+                tmp_ds.AddBand()
+                mask = bytearray(
+                    [255] * (tile_job_info.tile_size * tile_job_info.tile_size)
+                )
+                tmp_ds.WriteRaster(
+                    0,
+                    0,
+                    tile_job_info.tile_size,
+                    tile_job_info.tile_size,
+                    mask,
+                    band_list=[tilebands],
+                )
+                dsquerytile = tmp_ds
+            elif dsquerytile.RasterCount != tilebands:
+                raise Exception("Unexpected number of bands in base tile")
 
-        base_data = dsquerytile.ReadRaster(
-            0, 0, tile_job_info.tile_size, tile_job_info.tile_size
-        )
+            base_data = dsquerytile.ReadRaster(
+                0, 0, tile_job_info.tile_size, tile_job_info.tile_size
+            )
 
         dsquery.WriteRaster(
             tileposx,
@@ -1545,19 +2234,22 @@ def create_overview_tile(
         usable_base_tiles.append(base_tile)
 
     if not usable_base_tiles:
-        return
+        return None
 
     scale_query_to_tile(dsquery, dstile, options, tilefilename=tilefilename)
     # Write a copy of tile to png/jpg
-    if options.resampling != "antialias":
-        # Write a copy of tile to png/jpg
-        out_driver.CreateCopy(
-            tilefilename, dstile, strict=0, options=_get_creation_options(options)
-        )
-        # Remove useless side car file
-        aux_xml = tilefilename + ".aux.xml"
-        if gdal.VSIStatL(aux_xml) is not None:
-            gdal.Unlink(aux_xml)
+    encoded_tile = write_tile(
+        tile_job_info,
+        tilefilename,
+        (overview_tz, overview_tx, overview_ty_real),
+        dstile,
+    )
+    # Remove useless side car file
+    aux_xml = tilefilename + ".aux.xml"
+    if gdal.VSIStatL(aux_xml) is not None:
+        gdal.Unlink(aux_xml)
+
+    keep_raw_tile(tile_job_info, (overview_tz, overview_tx, overview_ty_real), dstile)
 
     if options.verbose:
         print("\tbuild from zoom", base_tz, " tiles:", *base_tiles)
@@ -1586,11 +2278,46 @@ def create_overview_tile(
                     ).encode("utf-8")
                 )
 
+    return encoded_tile
+
+
+def is_incremental(options: Options) -> bool:
+    """Whether only the tiles covering a changed area of the input are regenerated"""
+    return bool(options.changed_area or options.changed_vrt)
+
+
+def get_changed_tiles(
+    tile_job_info: "TileJobInfo", tile_details: List["TileDetail"]
+) -> Set[Tuple[int, int, int]]:
+    """
+    Return the (tz, tx, ty) coordinates of the overview tiles above the base
+    tiles to regenerate, that need to be regenerated too
+    """
+    changed_tiles = set()
+    for tile_detail in tile_details:
+        tx = tile_detail.tx
+        ty = GDAL2Tiles.getYTile(tile_detail.ty, tile_detail.tz, tile_job_info.options)
+        for tz in range(tile_detail.tz - 1, tile_job_info.tminz - 1, -1):
+            tx >>= 1
+            ty >>= 1
+            if (tz, tx, ty) in changed_tiles:
+                # And so are the tiles above it
+                break
+            changed_tiles.add((tz, tx, ty))
+
+    return changed_tiles
+
 
 def group_overview_base_tiles(
-    base_tz: int, output_folder: str, tile_job_info: "TileJobInfo"
+    base_tz: int,
+    output_folder: str,
+    tile_job_info: "TileJobInfo",
+    changed_tiles: Optional[Set[Tuple[int, int, int]]] = None,
 ) -> List[List[Tuple[int, int]]]:
-    """Group base tiles that belong to the same overview tile"""
+    """
+    Group base tiles that belong to the same overview tile, restricted to the
+    changed overview tiles if specified
+    """
 
     overview_to_bases = {}
     tminx, tminy, tmaxx, tmaxy = tile_job_info.tminmax[base_tz]
@@ -1601,24 +2328,231 @@ def group_overview_base_tiles(
             base_tile = (tx, ty)
             overview_tile = (overview_tx, overview_ty)
 
+            if (
+                changed_tiles is not None
+                and (base_tz - 1, overview_tx, overview_ty) not in changed_tiles
+            ):
+                continue
+
             if overview_tile not in overview_to_bases:
                 overview_to_bases[overview_tile] = []
 
             overview_to_bases[overview_tile].append(base_tile)
 
     # Create directories for the tiles
-    overview_tz = base_tz - 1
-    for tx in range(tminx, tmaxx + 1):
-        overview_tx = tx >> 1
-        tiledirname = os.path.join(output_folder, str(overview_tz), str(overview_tx))
-        makedirs(tiledirname)
+    if tile_job_info.options.container == "directory":
+        overview_tz = base_tz - 1
+        for tx in range(tminx, tmaxx + 1):
+            overview_tx = tx >> 1
+            tiledirname = os.path.join(
+                output_folder, str(overview_tz), str(overview_tx)
+            )
+            makedirs(tiledirname)
 
     return list(overview_to_bases.values())
 
 
-def count_overview_tiles(tile_job_info: "TileJobInfo") -> int:
+def group_base_tile_blocks(
+    output_folder: str, tile_job_info: "TileJobInfo", tile_details: List["TileDetail"]
+) -> List[Tuple[int, int, List["TileDetail"]]]:
+    """
+    Group base tiles by blocks of 2^N x 2^N tiles (N being the number of overview
+    levels built in memory), identified by the overview tile at their root
+    """
+
+    levels = tile_job_info.overview_block_levels
+    root_tz = tile_job_info.tmaxz - levels
+
+    blocks = {}
+    # Blocks without base tile to regenerate are left as they are
+    if not is_incremental(tile_job_info.options):
+        tminx, tminy, tmaxx, tmaxy = tile_job_info.tminmax[root_tz]
+        for ty in range(tmaxy, tminy - 1, -1):
+            for tx in range(tminx, tmaxx + 1):
+                blocks[(tx, ty)] = []
+
+    for tile_detail in tile_details:
+        ty = GDAL2Tiles.getYTile(tile_detail.ty, tile_detail.tz, tile_job_info.options)
+        blocks.setdefault((tile_detail.tx >> levels, ty >> levels), []).append(
+            tile_detail
+        )
+
+    # Create directories for the overview tiles built within the blocks
+    if tile_job_info.options.container == "directory":
+        for tz in range(root_tz, tile_job_info.tmaxz):
+            tminx, _, tmaxx, _ = tile_job_info.tminmax[tz]
+            for tx in range(tminx, tmaxx + 1):
+                makedirs(os.path.join(output_folder, str(tz), str(tx)))
+
+    return [(tx, ty, block_details) for (tx, ty), block_details in blocks.items()]
+
+
+def group_base_tiles_by_overview(
+    tile_job_info: "TileJobInfo", tile_details: Iterator["TileDetail"]
+) -> Iterator[Tuple[Tuple[int, int, int], List["TileDetail"]]]:
+    """
+    Group base tiles that belong to the same overview tile while they are
+    enumerated, row by row from the top. Each overview tile is yielded once
+    its two rows of base tiles are enumerated, with an empty group when none of
+    them is to be generated.
+    """
+
+    tz = tile_job_info.tmaxz
+    tminx, tminy, tmaxx, tmaxy = tile_job_info.tminmax[tz]
+    overview_txs = range(tminx >> 1, (tmaxx >> 1) + 1)
+
+    overview_ty = tmaxy >> 1
+    groups = {}
+    for tile_detail in tile_details:
+        ty = GDAL2Tiles.getYTile(tile_detail.ty, tz, tile_job_info.options)
+        while overview_ty > ty >> 1:
+            for overview_tx in overview_txs:
+                yield (tz - 1, overview_tx, overview_ty), groups.pop(overview_tx, [])
+            overview_ty -= 1
+        groups.setdefault(tile_detail.tx >> 1, []).append(tile_detail)
+
+    while overview_ty >= tminy >> 1:
+        for overview_tx in overview_txs:
+            yield (tz - 1, overview_tx, overview_ty), groups.pop(overview_tx, [])
+        overview_ty -= 1
+
+
+def get_overview_children(
+    tile_job_info: "TileJobInfo", tz: int, tx: int, ty: int
+) -> List[Tuple[int, int]]:
+    """
+    Return the tiles of the zoom level tz + 1 below an overview tile, within the
+    extent of that level, from the top
+    """
+    tminx, tminy, tmaxx, tmaxy = tile_job_info.tminmax[tz + 1]
+    return [
+        (cx, cy)
+        for cy in (2 * ty + 1, 2 * ty)
+        for cx in (2 * tx, 2 * tx + 1)
+        if tminx <= cx <= tmaxx and tminy <= cy <= tmaxy
+    ]
+
+
+def create_tile_subtree(
+    tz: int,
+    tx: int,
+    ty: int,
+    base_details: dict,
+    tile_job_info: "TileJobInfo",
+    encoded_tiles: List[EncodedTile],
+    changed_tiles: Optional[Set[Tuple[int, int, int]]] = None,
+) -> None:
+    """
+    Generate a tile after all the tiles below it, depth first. Unchanged
+    overview tiles, if changed tiles are specified, are kept as they are.
+    """
+
+    options = tile_job_info.options
+    if tz == tile_job_info.tmaxz:
+        tile_detail = base_details.get((tx, GDAL2Tiles.getYTile(ty, tz, options)))
+        # Base tiles skipped because of --resume are not in base_details
+        if tile_detail is not None:
+            encoded_tile = create_base_tile(tile_job_info, tile_detail)
+            if encoded_tile is not None:
+                encoded_tiles.append(encoded_tile)
+        return
+
+    base_tiles = get_overview_children(tile_job_info, tz, tx, ty)
+    for cx, cy in base_tiles:
+        if (
+            changed_tiles is not None
+            and tz + 1 < tile_job_info.tmaxz
+            and (tz + 1, cx, cy) not in changed_tiles
+        ):
+            continue
+        create_tile_subtree(
+            tz + 1,
+            cx,
+            cy,
+            base_details,
+            tile_job_info,
+            encoded_tiles,
+            changed_tiles,
+        )
+
+    encoded_tile = create_overview_tile(
+        tz + 1, base_tiles, tile_job_info.output_file_path, tile_job_info, options
+    )
+    if encoded_tile is not None:
+        encoded_tiles.append(encoded_tile)
+
+
+def create_base_tiles(
+    tile_job_info: "TileJobInfo", tile_details: List["TileDetail"]
+) -> Tuple[int, List[EncodedTile]]:
+    """
+    Generate a group of base tiles. Returns their number, and the encoded tiles
+    when writing to a container.
+    """
+
+    encoded_tiles = []
+    for tile_detail in tile_details:
+        encoded_tile = create_base_tile(tile_job_info, tile_detail)
+        if encoded_tile is not None:
+            encoded_tiles.append(encoded_tile)
+
+    return len(tile_details), encoded_tiles
+
+
+def create_tile_block(
+    tile_job_info: "TileJobInfo", tile_block: Tuple[int, int, List["TileDetail"]]
+) -> Tuple[int, List[EncodedTile]]:
+    """
+    Generate the base tiles of a block and the overview tiles up to the block
+    root from the raw buffers kept in memory. Returns the number of base tiles,
+    and the encoded tiles when writing to a container.
+    """
+
+    root_tx, root_ty, tile_details = tile_block
+    base_details = {(t.tx, t.ty): t for t in tile_details}
+    encoded_tiles = []
+
+    changed_tiles = None
+    if is_incremental(tile_job_info.options):
+        changed_tiles = get_changed_tiles(tile_job_info, tile_details)
+
+    threadLocal.raw_tile_cache = RawTileCache(
+        tile_job_info.options.overview_memory_limit * 1024 * 1024,
+        os.path.dirname(tile_job_info.src_file),
+    )
+    try:
+        create_tile_subtree(
+            tile_job_info.tmaxz - tile_job_info.overview_block_levels,
+            root_tx,
+            root_ty,
+            base_details,
+            tile_job_info,
+            encoded_tiles,
+            changed_tiles,
+        )
+    finally:
+        threadLocal.raw_tile_cache.clear()
+        del threadLocal.raw_tile_cache
+
+    return len(tile_details), encoded_tiles
+
+
+def count_base_tiles(tile_job_info: "TileJobInfo") -> int:
+    """Count the base tiles, including the ones skipped because of --resume"""
+    tminx, tminy, tmaxx, tmaxy = tile_job_info.tminmax[tile_job_info.tmaxz]
+    return (1 + abs(tmaxx - tminx)) * (1 + abs(tmaxy - tminy))
+
+
+def count_overview_tiles(
+    tile_job_info: "TileJobInfo",
+    changed_tiles: Optional[Set[Tuple[int, int, int]]] = None,
+) -> int:
+    """Count the overview tiles that are not built within base tile blocks"""
     tile_number = 0
-    for tz in range(tile_job_info.tmaxz - 1, tile_job_info.tminz - 1, -1):
+    first_tz = tile_job_info.tmaxz - tile_job_info.overview_block_levels - 1
+    if changed_tiles is not None:
+        return len([t for t in changed_tiles if t[0] <= first_tz])
+    for tz in range(first_tz, tile_job_info.tminz - 1, -1):
         tminx, tminy, tmaxx, tmaxy = tile_job_info.tminmax[tz]
         tile_number += (1 + abs(tmaxx - tminx)) * (1 + abs(tmaxy - tminy))
 
@@ -1726,6 +2660,58 @@ def optparse_init() -> optparse.OptionParser:
         help="Assume launched by mpiexec and ignore --processes. "
         "User should set GDAL_CACHEMAX to size per process.",
     )
+    p.add_option(
+        "--container",
+        dest="container",
+        type="choice",
+        choices=container_list,
+        help="Write the tiles in a z/x/y directory tree, or in a single MBTiles "
+        "or GeoPackage file (%s) - default 'directory'" % ",".join(container_list),
+    )
+    p.add_option(
+        "--changed-area",
+        dest="changed_area",
+        metavar="AREA",
+        help="Only regenerate the tiles intersecting AREA, and the overview tiles "
+        "above them, keeping the other ones: either minx,miny,maxx,maxy in the "
+        "georeferenced coordinates of the input, or a vector dataset outlining "
+        "the changed areas",
+    )
+    p.add_option(
+        "--changed-vrt",
+        dest="changed_vrt",
+        metavar="OLD_VRT",
+        help="Only regenerate the tiles covered by the sources of the input VRT "
+        "added, removed or modified since OLD_VRT, and the overview tiles above "
+        "them, keeping the other ones",
+    )
+    p.add_option(
+        "--deduplicate",
+        dest="deduplicate",
+        action="store_true",
+        help="Encode single color tiles only once, and store the duplicates as "
+        "hard links to the first one, or as references to the same data in "
+        "MBTiles containers",
+    )
+    p.add_option(
+        "--overview-block-levels",
+        dest="overview_block_levels",
+        metavar="LEVELS",
+        default=0,
+        type="int",
+        help="Number of overview levels built in memory by each process, from the "
+        "base tiles of blocks of 2^LEVELS x 2^LEVELS tiles it renders, instead of "
+        "re-reading the written tiles. Default is 0 (disabled).",
+    )
+    p.add_option(
+        "--overview-memory-limit",
+        dest="overview_memory_limit",
+        metavar="MB",
+        default=256,
+        type="int",
+        help="Maximum memory per process for the raw tile buffers kept by "
+        "--overview-block-levels. Buffers beyond it are spilled to a temporary file.",
+    )
     p.add_option(
         "--tilesize",
         dest="tilesize",
@@ -1844,6 +2830,10 @@ def optparse_init() -> optparse.OptionParser:
         copyright="",
         resampling="average",
         resume=False,
+        container="directory",
+        deduplicate=False,
+        changed_area=None,
+        changed_vrt=None,
         googlekey="INSERT_YOUR_KEY_HERE",
         bingkey="INSERT_YOUR_KEY_HERE",
         processes=1,
@@ -1879,6 +2869,8 @@ def process_args(argv: List[str]) -> Tuple[str, str, Options]:
     else:
         # Directory with input filename without extension in actual directory
         output_folder = os.path.splitext(os.path.basename(input_file))[0]
+        if options.container != "directory":
+            output_folder += "." + options.container
 
     if options.webviewer == "mapml":
         options.xyz = True
@@ -1931,7 +2923,7 @@ def options_post_processing(
     if options.resampling == "antialias" and not numpy_available:
         exit_with_error(
             "'antialias' resampling algorithm is not available.",
-            "Install PIL (Python Imaging Library) and numpy.",
+            "Install numpy.",
         )
 
     try:
@@ -1952,6 +2944,28 @@ def options_post_processing(
                 "leaflet files might contain some invalid characters as a result\n"
             )
 
+    if getattr(options, "overview_block_levels", 0) < 0:
+        exit_with_error("--overview-block-levels should be a positive integer")
+
+    container = getattr(options, "container", "directory")
+    if container != "directory":
+        if container == "mbtiles" and options.profile != "mercator":
+            exit_with_error("MBTiles output is only supported with --profile=mercator")
+        if container == "gpkg" and not (
+            options.profile == "mercator"
+            or (options.profile == "geodetic" and options.tmscompatible)
+        ):
+            exit_with_error(
+                "GeoPackage output is only supported with --profile=mercator, "
+                "or --profile=geodetic with --tmscompatible"
+            )
+        if output_folder.startswith("/vsi"):
+            exit_with_error("Tile containers cannot be written to /vsi file systems")
+        if options.kml:
+            exit_with_error("KML generation is not supported with tile containers")
+        options.kml = False
+        options.webviewer = "none"
+
     if options.tiledriver == "WEBP":
         if gdal.GetDriverByName(options.tiledriver) is None:
             exit_with_error("WEBP driver is not available")
@@ -1973,23 +2987,25 @@ def options_post_processing(
 
 
 class TileDetail(object):
-    tx = 0
-    ty = 0
-    tz = 0
-    rx = 0
-    ry = 0
-    rxsize = 0
-    rysize = 0
-    wx = 0
-    wy = 0
-    wxsize = 0
-    wysize = 0
-    querysize = 0
+    # One instance per base tile: no per-instance __dict__
+    __slots__ = (
+        "tx",
+        "ty",
+        "tz",
+        "rx",
+        "ry",
+        "rxsize",
+        "rysize",
+        "wx",
+        "wy",
+        "wxsize",
+        "wysize",
+        "querysize",
+    )
 
     def __init__(self, **kwargs):
-        for key in kwargs:
-            if hasattr(self, key):
-                setattr(self, key, kwargs[key])
+        for key in self.__slots__:
+            setattr(self, key, kwargs.get(key, 0))
 
     def __unicode__(self):
         return "TileDetail %s\n%s\n%s\n" % (self.tx, self.ty, self.tz)
@@ -2022,6 +3038,7 @@ class TileJobInfo(object):
     is_epsg_4326 = False
     options = None
     exclude_transparent = False
+    overview_block_levels = 0
 
     def __init__(self, **kwargs):
         for key in kwargs:
@@ -2069,6 +3086,7 @@ class GDAL2Tiles(object):
         self.isepsg4326 = None
         self.in_srs = None
         self.in_srs_wkt = None
+        self.changed_area = None
 
         # Tile format
         self.tile_size = 256
@@ -2080,7 +3098,11 @@ class GDAL2Tiles(object):
             self.tileext = "png"
         else:
             self.tileext = "webp"
-        if options.mpi:
+        if options.mpi and options.container != "directory":
+            self.tmp_dir = tempfile.mkdtemp(
+                dir=os.path.dirname(os.path.abspath(output_folder))
+            )
+        elif options.mpi:
             makedirs(output_folder)
             self.tmp_dir = tempfile.mkdtemp(dir=output_folder)
         else:
@@ -2198,6 +3220,10 @@ class GDAL2Tiles(object):
 
         self.out_srs = setup_output_srs(self.in_srs, self.options)
 
+        self.changed_area = setup_changed_area(
+            self.input_file, self.in_srs, self.out_srs, self.options
+        )
+
         # If input and output reference systems are different, we reproject the input dataset into
         # the output reference system for easier manipulation
 
@@ -2566,6 +3592,10 @@ class GDAL2Tiles(object):
         tiles are generated during the tile processing).
         """
 
+        if self.options.container != "directory":
+            self.generate_container()
+            return
+
         makedirs(self.output_folder)
 
         if self.options.profile == "mercator":
@@ -2684,11 +3714,60 @@ class GDAL2Tiles(object):
                             ).encode("utf-8")
                         )
 
+    def generate_container(self) -> None:
+        """
+        Creation of the MBTiles or GeoPackage file receiving the tiles, with its
+        metadata
+        """
+
+        if self.options.profile == "mercator":
+            south, west = self.mercator.MetersToLatLon(self.ominx, self.ominy)
+            north, east = self.mercator.MetersToLatLon(self.omaxx, self.omaxy)
+            south, west = max(-85.05112878, south), max(-180.0, west)
+            north, east = min(85.05112878, north), min(180.0, east)
+        else:
+            west, south = max(-180.0, self.ominx), max(-90.0, self.ominy)
+            east, north = min(180.0, self.omaxx), min(90.0, self.omaxy)
+        self.swne = (south, west, north, east)
+
+        if os.path.isdir(self.output_folder):
+            exit_with_error(
+                "Output %s is a directory, and cannot be used as a %s container"
+                % (self.output_folder, self.options.container)
+            )
+        if (
+            not self.options.resume
+            and self.changed_area is None
+            and os.path.isfile(self.output_folder)
+        ):
+            # An existing container is replaced, unless resuming or updating it
+            os.unlink(self.output_folder)
+
+        tile_container = TileContainer(self.output_folder, self.options)
+        tile_container.create(
+            self.tminmax,
+            self.tminz,
+            self.tmaxz,
+            self.tile_size,
+            (self.ominx, self.ominy, self.omaxx, self.omaxy),
+            self.swne,
+        )
+        tile_container.close()
+
     def generate_base_tiles(self) -> Tuple[TileJobInfo, List[TileDetail]]:
         """
         Generation of the base tiles (the lowest in the pyramid) directly from the input raster
         """
 
+        tile_job_info, tile_details = self.iter_base_tiles()
+        return tile_job_info, list(tile_details)
+
+    def iter_base_tiles(self) -> Tuple[TileJobInfo, Iterator[TileDetail]]:
+        """
+        Same as generate_base_tiles(), with the details of the base tiles generated
+        on demand, row by row, so that tiles can be rendered in the meantime
+        """
+
         if not self.options.quiet:
             print("Generating Base Tiles:")
 
@@ -2698,115 +3777,170 @@ class GDAL2Tiles(object):
             print("----------------------------------------")
             print("")
 
+        if self.options.verbose:
+            print("dataBandsCount: ", self.dataBandsCount)
+            print("tilebands: ", self.dataBandsCount + 1)
+
+        # Create directories for the tiles
+        if self.options.container == "directory":
+            tminx, _, tmaxx, _ = self.tminmax[self.tmaxz]
+            for tx in range(tminx, tmaxx + 1):
+                tiledirname = os.path.join(self.output_folder, str(self.tmaxz), str(tx))
+                makedirs(tiledirname)
+
+        conf = TileJobInfo(
+            src_file=self.tmp_vrt_filename,
+            nb_data_bands=self.dataBandsCount,
+            output_file_path=self.output_folder,
+            tile_extension=self.tileext,
+            tile_driver=self.tiledriver,
+            tile_size=self.tile_size,
+            kml=self.kml,
+            tminmax=self.tminmax,
+            tminz=self.tminz,
+            tmaxz=self.tmaxz,
+            in_srs_wkt=self.in_srs_wkt,
+            out_geo_trans=self.out_gt,
+            ominy=self.ominy,
+            is_epsg_4326=self.isepsg4326,
+            options=self.options,
+            exclude_transparent=self.options.exclude_transparent,
+            overview_block_levels=min(
+                self.options.overview_block_levels, self.tmaxz - self.tminz
+            ),
+        )
+
+        return conf, self.generate_base_tile_details()
+
+    def generate_base_tile_details(self) -> Iterator[TileDetail]:
+        """Generate the details of the base tiles to render, row by row from the top"""
+
         # Set the bounds
         tminx, tminy, tmaxx, tmaxy = self.tminmax[self.tmaxz]
 
         ds = self.warped_input_dataset
-        tilebands = self.dataBandsCount + 1
         querysize = self.querysize
 
-        if self.options.verbose:
-            print("dataBandsCount: ", self.dataBandsCount)
-            print("tilebands: ", tilebands)
-
         tcount = (1 + abs(tmaxx - tminx)) * (1 + abs(tmaxy - tminy))
         ti = 0
 
-        tile_details = []
-
         tz = self.tmaxz
 
-        # Create directories for the tiles
-        for tx in range(tminx, tmaxx + 1):
-            tiledirname = os.path.join(self.output_folder, str(tz), str(tx))
-            makedirs(tiledirname)
-
-        for ty in range(tmaxy, tminy - 1, -1):
-            for tx in range(tminx, tmaxx + 1):
-
-                ti += 1
-                ytile = GDAL2Tiles.getYTile(ty, tz, self.options)
-                tilefilename = os.path.join(
-                    self.output_folder,
-                    str(tz),
-                    str(tx),
-                    "%s.%s" % (ytile, self.tileext),
-                )
-                if self.options.verbose:
-                    print(ti, "/", tcount, tilefilename)
+        # Pixels around the changed area are affected through the resampling
+        changed_area = None
+        if self.changed_area is not None:
+            changed_area = self.changed_area.Buffer(3 * abs(self.out_gt[1]))
 
-                if self.options.resume and isfile(tilefilename):
-                    if self.options.verbose:
-                        print("Tile generation skipped because of --resume")
-                    continue
+        tile_container = None
+        if self.options.container != "directory":
+            tile_container = TileContainer(
+                self.output_folder, self.options, readonly=True
+            )
 
-                if self.options.profile == "mercator":
-                    # Tile bounds in EPSG:3857
-                    b = self.mercator.TileBounds(tx, ty, tz)
-                elif self.options.profile == "geodetic":
-                    b = self.geodetic.TileBounds(tx, ty, tz)
-                elif self.options.profile != "raster":
-                    b = tmsMap[self.options.profile].TileBounds(
-                        tx, ty, tz, self.tile_size
+        try:
+            for ty in range(tmaxy, tminy - 1, -1):
+                for tx in range(tminx, tmaxx + 1):
+
+                    ti += 1
+                    ytile = GDAL2Tiles.getYTile(ty, tz, self.options)
+                    tilefilename = os.path.join(
+                        self.output_folder,
+                        str(tz),
+                        str(tx),
+                        "%s.%s" % (ytile, self.tileext),
                     )
+                    if self.options.verbose:
+                        print(ti, "/", tcount, tilefilename)
+
+                    if self.options.resume and (
+                        tile_container.has_tile(tz, tx, ytile)
+                        if tile_container is not None
+                        else isfile(tilefilename)
+                    ):
+                        if self.options.verbose:
+                            print("Tile generation skipped because of --resume")
+                        continue
+
+                    if self.options.profile == "mercator":
+                        # Tile bounds in EPSG:3857
+                        b = self.mercator.TileBounds(tx, ty, tz)
+                    elif self.options.profile == "geodetic":
+                        b = self.geodetic.TileBounds(tx, ty, tz)
+                    elif self.options.profile != "raster":
+                        b = tmsMap[self.options.profile].TileBounds(
+                            tx, ty, tz, self.tile_size
+                        )
 
-                # Don't scale up by nearest neighbour, better change the querysize
-                # to the native resolution (and return smaller query tile) for scaling
+                    # Don't scale up by nearest neighbour, better change the querysize
+                    # to the native resolution (and return smaller query tile) for scaling
 
-                if self.options.profile != "raster":
-                    rb, wb = self.geo_query(ds, b[0], b[3], b[2], b[1])
+                    if self.options.profile != "raster":
+                        rb, wb = self.geo_query(ds, b[0], b[3], b[2], b[1])
 
-                    # Pixel size in the raster covering query geo extent
-                    nativesize = wb[0] + wb[2]
-                    if self.options.verbose:
-                        print("\tNative Extent (querysize", nativesize, "): ", rb, wb)
+                        # Pixel size in the raster covering query geo extent
+                        nativesize = wb[0] + wb[2]
+                        if self.options.verbose:
+                            print(
+                                "\tNative Extent (querysize", nativesize, "): ", rb, wb
+                            )
 
-                    # Tile bounds in raster coordinates for ReadRaster query
-                    rb, wb = self.geo_query(
-                        ds, b[0], b[3], b[2], b[1], querysize=querysize
-                    )
+                        # Tile bounds in raster coordinates for ReadRaster query
+                        rb, wb = self.geo_query(
+                            ds, b[0], b[3], b[2], b[1], querysize=querysize
+                        )
 
-                    rx, ry, rxsize, rysize = rb
-                    wx, wy, wxsize, wysize = wb
-
-                else:  # 'raster' profile:
-
-                    tsize = int(
-                        self.tsize[tz]
-                    )  # tile_size in raster coordinates for actual zoom
-                    xsize = (
-                        self.warped_input_dataset.RasterXSize
-                    )  # size of the raster in pixels
-                    ysize = self.warped_input_dataset.RasterYSize
-                    querysize = self.tile_size
-
-                    rx = tx * tsize
-                    rxsize = 0
-                    if tx == tmaxx:
-                        rxsize = xsize % tsize
-                    if rxsize == 0:
-                        rxsize = tsize
-
-                    ry = ty * tsize
-                    rysize = 0
-                    if ty == tmaxy:
-                        rysize = ysize % tsize
-                    if rysize == 0:
-                        rysize = tsize
-
-                    wx, wy = 0, 0
-                    wxsize = int(rxsize / float(tsize) * self.tile_size)
-                    wysize = int(rysize / float(tsize) * self.tile_size)
-
-                    if not self.options.xyz:
-                        ry = ysize - (ty * tsize) - rysize
-                        if wysize != self.tile_size:
-                            wy = self.tile_size - wysize
-
-                # Read the source raster if anything is going inside the tile as per the computed
-                # geo_query
-                tile_details.append(
-                    TileDetail(
+                        rx, ry, rxsize, rysize = rb
+                        wx, wy, wxsize, wysize = wb
+
+                    else:  # 'raster' profile:
+
+                        tsize = int(
+                            self.tsize[tz]
+                        )  # tile_size in raster coordinates for actual zoom
+                        xsize = (
+                            self.warped_input_dataset.RasterXSize
+                        )  # size of the raster in pixels
+                        ysize = self.warped_input_dataset.RasterYSize
+                        querysize = self.tile_size
+
+                        rx = tx * tsize
+                        rxsize = 0
+                        if tx == tmaxx:
+                            rxsize = xsize % tsize
+                        if rxsize == 0:
+                            rxsize = tsize
+
+                        ry = ty * tsize
+                        rysize = 0
+                        if ty == tmaxy:
+                            rysize = ysize % tsize
+                        if rysize == 0:
+                            rysize = tsize
+
+                        wx, wy = 0, 0
+                        wxsize = int(rxsize / float(tsize) * self.tile_size)
+                        wysize = int(rysize / float(tsize) * self.tile_size)
+
+                        if not self.options.xyz:
+                            ry = ysize - (ty * tsize) - rysize
+                            if wysize != self.tile_size:
+                                wy = self.tile_size - wysize
+
+                        # Tile bounds in the georeferenced coordinates of the raster
+                        x1 = self.out_gt[0] + rx * self.out_gt[1]
+                        x2 = self.out_gt[0] + (rx + rxsize) * self.out_gt[1]
+                        y1 = self.out_gt[3] + ry * self.out_gt[5]
+                        y2 = self.out_gt[3] + (ry + rysize) * self.out_gt[5]
+                        b = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+                    if changed_area is not None and not changed_area.Intersects(
+                        extent_to_geometry(*b)
+                    ):
+                        continue
+
+                    # Read the source raster if anything is going inside the tile as per the computed
+                    # geo_query
+                    yield TileDetail(
                         tx=tx,
                         ty=ytile,
                         tz=tz,
@@ -2820,28 +3954,10 @@ class GDAL2Tiles(object):
                         wysize=wysize,
                         querysize=querysize,
                     )
-                )
-
-        conf = TileJobInfo(
-            src_file=self.tmp_vrt_filename,
-            nb_data_bands=self.dataBandsCount,
-            output_file_path=self.output_folder,
-            tile_extension=self.tileext,
-            tile_driver=self.tiledriver,
-            tile_size=self.tile_size,
-            kml=self.kml,
-            tminmax=self.tminmax,
-            tminz=self.tminz,
-            tmaxz=self.tmaxz,
-            in_srs_wkt=self.in_srs_wkt,
-            out_geo_trans=self.out_gt,
-            ominy=self.ominy,
-            is_epsg_4326=self.isepsg4326,
-            options=self.options,
-            exclude_transparent=self.options.exclude_transparent,
-        )
 
-        return conf, tile_details
+        finally:
+            if tile_container is not None:
+                tile_container.close()
 
     def geo_query(self, ds, ulx, uly, lrx, lry, querysize=0):
         """
@@ -3817,15 +4933,29 @@ class GDAL2Tiles(object):
 
 
 def worker_tile_details(
-    input_file: str, output_folder: str, options: Options
-) -> Tuple[TileJobInfo, List[TileDetail]]:
+    input_file: str, output_folder: str, options: Options, lazy: bool = False
+) -> Tuple[TileJobInfo, Iterator[TileDetail]]:
+    """
+    Return the details of the base tiles, as a list or, if lazy, as a generator
+    enumerating them on demand
+    """
     gdal2tiles = GDAL2Tiles(input_file, output_folder, options)
     gdal2tiles.open_input()
     gdal2tiles.generate_metadata()
+    if lazy:
+        return gdal2tiles.iter_base_tiles()
     tile_job_info, tile_details = gdal2tiles.generate_base_tiles()
     return tile_job_info, tile_details
 
 
+def can_stream_tile_details(options: Options) -> bool:
+    """
+    Whether base tiles can be generated while they are enumerated, rather than
+    once all of them are known
+    """
+    return not options.overview_block_levels and not is_incremental(options)
+
+
 class ProgressBar(object):
     def __init__(self, total_items: int) -> None:
         self.total_items = total_items
@@ -3907,6 +5037,29 @@ def get_tile_swne(tile_job_info, options):
     return tile_swne
 
 
+def store_encoded_tile(
+    tile_container: Optional[TileContainer], encoded_tile: EncodedTile
+) -> int:
+    """
+    Write a tile returned by a worker into the container, and return 1 if the
+    tile was deduplicated into a hard link instead, 0 otherwise
+    """
+    if encoded_tile[3] is None:
+        return 1
+    if tile_container is not None:
+        tile_container.write_tile(encoded_tile)
+    return 0
+
+
+def print_deduplicated_tiles(
+    options: Options, nb_deduplicated: int, tile_container: Optional[TileContainer]
+) -> None:
+    if options.deduplicate and not options.quiet:
+        if tile_container is not None:
+            nb_deduplicated += tile_container.nb_deduplicated
+        print("%d duplicated tiles stored only once." % nb_deduplicated)
+
+
 def single_threaded_tiling(
     input_file: str, output_folder: str, options: Options
 ) -> None:
@@ -3914,28 +5067,61 @@ def single_threaded_tiling(
     Keep a single threaded version that stays clear of multiprocessing, for platforms that would not
     support it
     """
+    lazy = can_stream_tile_details(options)
     if options.verbose:
         print("Begin tiles details calc")
-    conf, tile_details = worker_tile_details(input_file, output_folder, options)
+    conf, tile_details = worker_tile_details(
+        input_file, output_folder, options, lazy=lazy
+    )
 
     if options.verbose:
         print("Tiles details calc complete.")
 
+    changed_tiles = None
+    if is_incremental(options):
+        changed_tiles = get_changed_tiles(conf, tile_details)
+
+    tile_container = None
+    if options.container != "directory":
+        tile_container = TileContainer(output_folder, options)
+    nb_deduplicated = 0
+
     if not options.verbose and not options.quiet:
-        base_progress_bar = ProgressBar(len(tile_details))
+        base_progress_bar = ProgressBar(
+            count_base_tiles(conf) if lazy else len(tile_details)
+        )
         base_progress_bar.start()
 
-    for tile_detail in tile_details:
-        create_base_tile(conf, tile_detail)
+    if conf.overview_block_levels:
+        for tile_block in group_base_tile_blocks(output_folder, conf, tile_details):
+            nb_base_tiles, encoded_tiles = create_tile_block(conf, tile_block)
+            for encoded_tile in encoded_tiles:
+                nb_deduplicated += store_encoded_tile(tile_container, encoded_tile)
+
+            if nb_base_tiles and not options.verbose and not options.quiet:
+                base_progress_bar.log_progress(nb_base_tiles)
+    else:
+        nb_base_tiles = 0
+        for tile_detail in tile_details:
+            encoded_tile = create_base_tile(conf, tile_detail)
+            if encoded_tile is not None:
+                nb_deduplicated += store_encoded_tile(tile_container, encoded_tile)
+
+            nb_base_tiles += 1
+            if not options.verbose and not options.quiet:
+                base_progress_bar.log_progress()
 
-        if not options.verbose and not options.quiet:
-            base_progress_bar.log_progress()
+        # Tiles skipped because of --resume are not enumerated
+        if lazy and not options.verbose and not options.quiet:
+            nb_skipped_tiles = base_progress_bar.total_items - nb_base_tiles
+            if nb_skipped_tiles:
+                base_progress_bar.log_progress(nb_skipped_tiles)
 
     if getattr(threadLocal, "cached_ds", None):
         del threadLocal.cached_ds
 
     if not options.quiet:
-        count = count_overview_tiles(conf)
+        count = count_overview_tiles(conf, changed_tiles)
         if count:
             print("Generating Overview Tiles:")
 
@@ -3943,13 +5129,32 @@ def single_threaded_tiling(
                 overview_progress_bar = ProgressBar(count)
                 overview_progress_bar.start()
 
-    for base_tz in range(conf.tmaxz, conf.tminz, -1):
-        base_tile_groups = group_overview_base_tiles(base_tz, output_folder, conf)
+    for base_tz in range(conf.tmaxz - conf.overview_block_levels, conf.tminz, -1):
+        if tile_container is not None:
+            tile_container.flush()
+        base_tile_groups = group_overview_base_tiles(
+            base_tz, output_folder, conf, changed_tiles
+        )
         for base_tiles in base_tile_groups:
-            create_overview_tile(base_tz, base_tiles, output_folder, conf, options)
+            encoded_tile = create_overview_tile(
+                base_tz, base_tiles, output_folder, conf, options
+            )
+            if encoded_tile is not None:
+                nb_deduplicated += store_encoded_tile(tile_container, encoded_tile)
             if not options.verbose and not options.quiet:
                 overview_progress_bar.log_progress()
 
+    if tile_container is not None:
+        tile_container.flush()
+    print_deduplicated_tiles(options, nb_deduplicated, tile_container)
+    if tile_container is not None:
+        tile_container.close()
+    if getattr(threadLocal, "tile_container", None):
+        threadLocal.tile_container.close()
+        del threadLocal.tile_container
+    if getattr(threadLocal, "uniform_tiles", None) is not None:
+        del threadLocal.uniform_tiles
+
     shutil.rmtree(os.path.dirname(conf.src_file))
 
 
@@ -3957,57 +5162,277 @@ def multi_threaded_tiling(
     input_file: str, output_folder: str, options: Options, pool
 ) -> None:
     nb_processes = options.nb_processes or 1
+    lazy = can_stream_tile_details(options)
 
     if options.verbose:
         print("Begin tiles details calc")
 
-    conf, tile_details = worker_tile_details(input_file, output_folder, options)
+    conf, tile_details = worker_tile_details(
+        input_file, output_folder, options, lazy=lazy
+    )
 
     if options.verbose:
         print("Tiles details calc complete.")
 
+    changed_tiles = None
+    if is_incremental(options):
+        changed_tiles = get_changed_tiles(conf, tile_details)
+
+    # Tiles encoded by the workers are sent back to this process, which is the
+    # only one writing into the container
+    tile_container = None
+    if options.container != "directory":
+        tile_container = TileContainer(output_folder, options)
+    nb_deduplicated = 0
+
     if not options.verbose and not options.quiet:
-        base_progress_bar = ProgressBar(len(tile_details))
+        base_progress_bar = ProgressBar(
+            count_base_tiles(conf) if lazy else len(tile_details)
+        )
         base_progress_bar.start()
 
-    # TODO: gbataille - check the confs for which each element is an array... one useless level?
-    # TODO: gbataille - assign an ID to each job for print in verbose mode "ReadRaster Extent ..."
-    chunksize = max(1, min(128, len(tile_details) // nb_processes))
-    for _ in pool.imap_unordered(
-        partial(create_base_tile, conf), tile_details, chunksize=chunksize
-    ):
-        if not options.verbose and not options.quiet:
-            base_progress_bar.log_progress()
-
-    if not options.quiet:
-        count = count_overview_tiles(conf)
-        if count:
-            print("Generating Overview Tiles:")
+    # Tasks generating the lowest tiles: blocks of base tiles and the overview
+    # tiles built in memory above them, or the base tiles below an overview tile,
+    # with the overview tile waiting for them. When streamed, the base tiles are
+    # enumerated while the first ones are generated, and the overview tiles
+    # without any base tile to generate below them come with no task.
+    bottom_tz = conf.tmaxz - conf.overview_block_levels
+    bottom_tasks = []
+    if lazy:
+        bottom_tasks = (
+            (
+                parent,
+                partial(create_base_tiles, conf) if base_tile_group else None,
+                base_tile_group,
+            )
+            for parent, base_tile_group in group_base_tiles_by_overview(
+                conf, tile_details
+            )
+        )
+    elif conf.overview_block_levels:
+        for tile_block in group_base_tile_blocks(output_folder, conf, tile_details):
+            parent = (bottom_tz - 1, tile_block[0] >> 1, tile_block[1] >> 1)
+            bottom_tasks.append((parent, partial(create_tile_block, conf), tile_block))
+    else:
+        base_tile_groups = {}
+        for tile_detail in tile_details:
+            ty = GDAL2Tiles.getYTile(tile_detail.ty, tile_detail.tz, options)
+            base_tile_groups.setdefault((tile_detail.tx >> 1, ty >> 1), []).append(
+                tile_detail
+            )
+        for (tx, ty), base_tile_group in base_tile_groups.items():
+            parent = (bottom_tz - 1, tx, ty)
+            bottom_tasks.append(
+                (parent, partial(create_base_tiles, conf), base_tile_group)
+            )
+        del base_tile_groups
+
+    # Overview tiles, with the number of tasks generating their children. When
+    # streamed, the children of an overview tile are found from the extent of
+    # the zoom level below, and its counter is only created once the first of
+    # them is generated, for the memory not to depend on the number of tiles.
+    overview_tasks = {}
+    nb_pending_children = {}
+    if lazy:
+        nb_overview_tiles = count_overview_tiles(conf)
+        if options.container == "directory":
+            for tz in range(conf.tminz, conf.tmaxz):
+                tminx, _, tmaxx, _ = conf.tminmax[tz]
+                for tx in range(tminx, tmaxx + 1):
+                    makedirs(os.path.join(output_folder, str(tz), str(tx)))
+    else:
+        for base_tz in range(bottom_tz, conf.tminz, -1):
+            for base_tiles in group_overview_base_tiles(
+                base_tz, output_folder, conf, changed_tiles
+            ):
+                overview_tile = (
+                    base_tz - 1,
+                    base_tiles[0][0] >> 1,
+                    base_tiles[0][1] >> 1,
+                )
+                overview_tasks[overview_tile] = (base_tz, base_tiles)
+        nb_overview_tiles = len(overview_tasks)
+        nb_pending_children = dict.fromkeys(overview_tasks, 0)
+        for parent, _, _ in bottom_tasks:
+            if parent in nb_pending_children:
+                nb_pending_children[parent] += 1
+        bottom_tasks = iter(bottom_tasks)
+        for tz, tx, ty in overview_tasks:
+            parent = (tz - 1, tx >> 1, ty >> 1)
+            if parent in nb_pending_children:
+                nb_pending_children[parent] += 1
+
+    # An overview tile is queued as soon as the tiles below it are generated, in
+    # priority over the base tiles, so that all the levels are processed at the
+    # same time. The number of queued tasks is limited, for the pool not to be
+    # busy with base tiles while overview tiles are ready.
+    done_queue = queue.Queue()
+
+    def submit(func, arg, parent, is_overview):
+        pool.apply_async(
+            func,
+            (arg,),
+            callback=lambda result: done_queue.put((parent, is_overview, result, None)),
+            error_callback=lambda e: done_queue.put((parent, is_overview, None, e)),
+        )
 
-            if not options.verbose:
-                overview_progress_bar = ProgressBar(count)
-                overview_progress_bar.start()
+    max_running_tasks = 4 * nb_processes
+    nb_running_tasks = 0
+    nb_running_bottom_tasks = 0
+    nb_enumerated_base_tiles = 0
+    base_tiles_done = False
+    # Overview tiles whose children are all generated, and the ones whose
+    # children are not yet committed into the container, to be read by the workers
+    ready_tiles = [t for t, nb in nb_pending_children.items() if nb == 0]
+    unflushed_tiles = []
+    nb_overview_tiles_done = 0
+    overview_progress_bar = None
+
+    def child_done(tile):
+        tz, tx, ty = tile
+        if lazy:
+            if tz < conf.tminz:
+                return
+            # The base tiles below an overview tile are generated by one task
+            if tz == bottom_tz - 1:
+                nb_children = 1
+            else:
+                nb_children = len(get_overview_children(conf, tz, tx, ty))
+            nb_pending = nb_pending_children.pop(tile, nb_children) - 1
+            if nb_pending:
+                nb_pending_children[tile] = nb_pending
+                return
+        elif tile in nb_pending_children:
+            nb_pending_children[tile] -= 1
+            if nb_pending_children[tile]:
+                return
+        else:
+            return
+        if tile_container is not None and tile_container.pending_tiles:
+            unflushed_tiles.append(tile)
+        else:
+            ready_tiles.append(tile)
 
-    for base_tz in range(conf.tmaxz, conf.tminz, -1):
-        base_tile_groups = group_overview_base_tiles(base_tz, output_folder, conf)
-        chunksize = max(1, min(128, len(base_tile_groups) // nb_processes))
-        for _ in pool.imap_unordered(
-            partial(
-                create_overview_tile,
-                base_tz,
-                output_folder=output_folder,
-                tile_job_info=conf,
-                options=options,
-            ),
-            base_tile_groups,
-            chunksize=chunksize,
+    while True:
+        if (
+            not base_tiles_done
+            and bottom_tasks is None
+            and nb_running_bottom_tasks == 0
         ):
-            if not options.verbose and not options.quiet:
+            base_tiles_done = True
+            if not options.quiet and nb_overview_tiles:
+                print("Generating Overview Tiles:")
+
+                if not options.verbose:
+                    overview_progress_bar = ProgressBar(nb_overview_tiles)
+                    overview_progress_bar.start()
+                    if nb_overview_tiles_done:
+                        overview_progress_bar.log_progress(nb_overview_tiles_done)
+
+        while nb_running_tasks < max_running_tasks:
+            if ready_tiles:
+                tz, tx, ty = ready_tiles.pop()
+                if lazy:
+                    base_tz = tz + 1
+                    base_tiles = get_overview_children(conf, tz, tx, ty)
+                else:
+                    base_tz, base_tiles = overview_tasks[(tz, tx, ty)]
+                submit(
+                    partial(
+                        create_overview_tile,
+                        base_tz,
+                        output_folder=output_folder,
+                        tile_job_info=conf,
+                        options=options,
+                    ),
+                    base_tiles,
+                    (tz - 1, tx >> 1, ty >> 1),
+                    True,
+                )
+            elif bottom_tasks is not None:
+                bottom_task = next(bottom_tasks, None)
+                if bottom_task is None:
+                    bottom_tasks = None
+                    # Tiles skipped because of --resume are not enumerated
+                    if lazy and not options.verbose and not options.quiet:
+                        nb_skipped_tiles = (
+                            base_progress_bar.total_items - nb_enumerated_base_tiles
+                        )
+                        if nb_skipped_tiles:
+                            base_progress_bar.log_progress(nb_skipped_tiles)
+                    continue
+                parent, func, arg = bottom_task
+                if lazy:
+                    nb_enumerated_base_tiles += len(arg)
+                    # No base tile to generate below that overview tile
+                    if func is None:
+                        child_done(parent)
+                        continue
+                submit(func, arg, parent, False)
+                nb_running_bottom_tasks += 1
+            elif unflushed_tiles:
+                tile_container.flush()
+                ready_tiles, unflushed_tiles = unflushed_tiles, []
+                continue
+            else:
+                break
+            nb_running_tasks += 1
+
+        if nb_running_tasks == 0:
+            break
+
+        parent, is_overview, result, exception = done_queue.get()
+        nb_running_tasks -= 1
+        if exception is not None:
+            raise exception
+
+        if is_overview:
+            if result is not None:
+                nb_deduplicated += store_encoded_tile(tile_container, result)
+            nb_overview_tiles_done += 1
+            if overview_progress_bar is not None:
                 overview_progress_bar.log_progress()
+        else:
+            nb_base_tiles, encoded_tiles = result
+            for encoded_tile in encoded_tiles:
+                nb_deduplicated += store_encoded_tile(tile_container, encoded_tile)
+            nb_running_bottom_tasks -= 1
+            if nb_base_tiles and not options.verbose and not options.quiet:
+                base_progress_bar.log_progress(nb_base_tiles)
+
+        child_done(parent)
+
+        # Commit by batches the tiles needed by the ready overview tiles
+        if len(unflushed_tiles) >= max_running_tasks:
+            tile_container.flush()
+            ready_tiles += unflushed_tiles
+            unflushed_tiles = []
+
+    if tile_container is not None:
+        tile_container.flush()
+    print_deduplicated_tiles(options, nb_deduplicated, tile_container)
+    if tile_container is not None:
+        tile_container.close()
 
     shutil.rmtree(os.path.dirname(conf.src_file))
 
 
+def executor_apply_async(
+    executor, func, args=(), callback=None, error_callback=None
+) -> None:
+    """multiprocessing.Pool.apply_async() for a concurrent.futures executor"""
+
+    def done(future):
+        exception = future.exception()
+        if exception is not None:
+            if error_callback is not None:
+                error_callback(exception)
+        elif callback is not None:
+            callback(future.result())
+
+    executor.submit(func, *args).add_done_callback(done)
+
+
 class UseExceptions(object):
     def __enter__(self):
         self.old_used_exceptions = gdal.GetUseExceptions()
@@ -4055,7 +5480,7 @@ def main(argv: List[str] = sys.argv) -> int:
             if pool is None:
                 return 0
             # add interface of multiprocessing.Pool to MPICommExecutor
-            pool.imap_unordered = partial(pool.map, unordered=True)
+            pool.apply_async = partial(executor_apply_async, pool)
             return submain(argv, pool, MPI.COMM_WORLD.Get_size())
     else:
         return submain(argv)
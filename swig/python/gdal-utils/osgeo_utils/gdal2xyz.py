@@ -29,22 +29,227 @@
 # FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 ###############################################################################
+import os
+import shutil
 import sys
+import tempfile
 import textwrap
+import threading
+import zipfile
 from numbers import Number, Real
 from typing import Optional, Sequence, Tuple, Union
 
 import numpy as np
 
-from osgeo import gdal
-from osgeo_utils.auxiliary.base import PathLikeOrStr
+from osgeo import gdal, ogr
+from osgeo_utils.auxiliary.base import PathLikeOrStr, is_path_like
 from osgeo_utils.auxiliary.gdal_argparse import GDALArgumentParser, GDALScript
 from osgeo_utils.auxiliary.numpy_util import GDALTypeCodeAndNumericTypeCodeFromDataSet
 from osgeo_utils.auxiliary.progress import (
     OptionalProgressCallback,
     get_progress_callback,
 )
-from osgeo_utils.auxiliary.util import PathOrDS, get_bands, open_ds
+from osgeo_utils.auxiliary.util import (
+    PathOrDS,
+    get_bands,
+    get_num_threads,
+    map_in_threads,
+    open_ds,
+)
+
+# number of pixels read at once, rounded to whole blocks of rows
+CHUNK_PIXELS = 1 << 20
+# number of lines formatted at once
+LINES_PER_WRITE = 4096
+
+output_formats = ("XYZ", "NPZ", "Arrow", "Parquet")
+output_format_by_ext = {
+    ".npz": "NPZ",
+    ".arrow": "Arrow",
+    ".arrows": "Arrow",
+    ".feather": "Arrow",
+    ".ipc": "Arrow",
+    ".parquet": "Parquet",
+}
+# layer creation option setting the number of rows of a row group
+row_group_size_options = {"Arrow": "BATCH_SIZE", "Parquet": "ROW_GROUP_SIZE"}
+
+
+def get_output_format(
+    dstfile: Optional[PathLikeOrStr], output_format: Optional[str] = None
+) -> str:
+    """Return the output format, guessed from the extension of dstfile if not given"""
+    if output_format is None:
+        if dstfile is None:
+            return "XYZ"
+        ext = os.path.splitext(str(dstfile))[1].lower()
+        return output_format_by_ext.get(ext, "XYZ")
+    for name in output_formats:
+        if name.lower() == output_format.lower():
+            return name
+    raise Exception(f"Unsupported output format: {output_format}")
+
+
+class XYZWriter:
+    """Writes the points as lines of text"""
+
+    def __init__(self, filename: Optional[PathLikeOrStr], frmt: str):
+        self.fh = open(filename, "wt") if filename is not None else sys.stdout
+        self.frmt = frmt
+
+    def write(self, geo_x, geo_y, data):
+        # format many lines with a single % operation
+        lines = np.column_stack((geo_x, geo_y, data.transpose()))
+        for i in range(0, len(lines), LINES_PER_WRITE):
+            values = lines[i : i + LINES_PER_WRITE]
+            self.fh.write((self.frmt * len(values)) % tuple(values.ravel().tolist()))
+
+    def close(self):
+        if self.fh is not sys.stdout:
+            self.fh.close()
+
+
+class NPZWriter:
+    """
+    Writes the points as the columns of a .npz file, one array per column.
+    The columns are written to temporary files until the number of points is
+    known, then copied to the .npz file.
+    """
+
+    def __init__(self, filename: PathLikeOrStr, names, dtypes):
+        self.filename = filename
+        self.names = names
+        self.dtypes = [np.dtype(dtype) for dtype in dtypes]
+        self.files = [tempfile.TemporaryFile() for _ in names]
+        self.count = 0
+
+    def write(self, geo_x, geo_y, data):
+        for f, dtype, column in zip(self.files, self.dtypes, (geo_x, geo_y, *data)):
+            f.write(np.ascontiguousarray(column, dtype=dtype).tobytes())
+        self.count += len(geo_x)
+
+    def close(self):
+        with zipfile.ZipFile(self.filename, "w", allowZip64=True) as zf:
+            for name, dtype, f in zip(self.names, self.dtypes, self.files):
+                header = {
+                    "descr": np.lib.format.dtype_to_descr(dtype),
+                    "fortran_order": False,
+                    "shape": (self.count,),
+                }
+                f.seek(0)
+                with zf.open(name + ".npy", "w", force_zip64=True) as out:
+                    np.lib.format.write_array_header_1_0(out, header)
+                    shutil.copyfileobj(f, out)
+                f.close()
+
+
+class ArrowWriter:
+    """
+    Writes the points as the columns of an Arrow (IPC) or Parquet file with
+    pyarrow, one record batch or row group per written chunk.
+    """
+
+    def __init__(self, filename: PathLikeOrStr, output_format: str, names, dtypes):
+        import pyarrow as pa
+
+        self.dtypes = [np.dtype(dtype) for dtype in dtypes]
+        for dtype in self.dtypes:
+            if dtype.kind not in "iuf":
+                raise Exception(
+                    f"Data type {dtype} is not supported by the {output_format} format."
+                )
+        self.schema = pa.schema(
+            [
+                (name, pa.from_numpy_dtype(dtype))
+                for name, dtype in zip(names, self.dtypes)
+            ]
+        )
+        self.pa = pa
+        filename = str(filename)
+        self.parquet = output_format == "Parquet"
+        if self.parquet:
+            import pyarrow.parquet as pq
+
+            self.writer = pq.ParquetWriter(filename, self.schema)
+        elif os.path.splitext(filename)[1].lower() == ".arrows":
+            self.writer = pa.ipc.new_stream(filename, self.schema)
+        else:
+            self.writer = pa.ipc.new_file(filename, self.schema)
+
+    def write(self, geo_x, geo_y, data):
+        count = len(geo_x)
+        if not count:
+            return
+        batch = self.pa.record_batch(
+            [
+                np.ascontiguousarray(column, dtype=dtype)
+                for column, dtype in zip((geo_x, geo_y, *data), self.dtypes)
+            ],
+            schema=self.schema,
+        )
+        if self.parquet:
+            self.writer.write_table(
+                self.pa.Table.from_batches([batch]), row_group_size=count
+            )
+        else:
+            self.writer.write_batch(batch)
+
+    def close(self):
+        self.writer.close()
+
+
+class OGRWriter:
+    """
+    Writes the points as the fields of the features of a table without
+    geometry, with the Arrow or Parquet driver of OGR, when pyarrow is not
+    available.
+    """
+
+    def __init__(
+        self, filename: PathLikeOrStr, driver_name: str, names, dtypes, row_group_size
+    ):
+        driver = ogr.GetDriverByName(driver_name)
+        if driver is None:
+            raise Exception(f"The {driver_name} driver is not available.")
+        filename = str(filename)
+        if os.path.exists(filename):
+            driver.DeleteDataSource(filename)
+        self.ds = driver.CreateDataSource(filename)
+        if self.ds is None:
+            raise Exception(f"Could not create {filename}.")
+        options = ["%s=%d" % (row_group_size_options[driver_name], row_group_size)]
+        layer_name = os.path.splitext(os.path.basename(filename))[0]
+        self.layer = self.ds.CreateLayer(layer_name, None, ogr.wkbNone, options)
+
+        for name, dtype in zip(names, dtypes):
+            dtype = np.dtype(dtype)
+            if dtype.kind in "iu":
+                if dtype.itemsize < 4 or dtype == np.int32:
+                    field_defn = ogr.FieldDefn(name, ogr.OFTInteger)
+                else:
+                    field_defn = ogr.FieldDefn(name, ogr.OFTInteger64)
+            elif dtype.kind == "f":
+                field_defn = ogr.FieldDefn(name, ogr.OFTReal)
+                if dtype == np.float32:
+                    field_defn.SetSubType(ogr.OFSTFloat32)
+            else:
+                raise Exception(
+                    f"Data type {dtype} is not supported by the {driver_name} format."
+                )
+            self.layer.CreateField(field_defn)
+        self.defn = self.layer.GetLayerDefn()
+
+    def write(self, geo_x, geo_y, data):
+        columns = [geo_x.tolist(), geo_y.tolist()] + [band.tolist() for band in data]
+        for values in zip(*columns):
+            feature = ogr.Feature(self.defn)
+            for i, value in enumerate(values):
+                feature.SetField(i, value)
+            self.layer.CreateFeature(feature)
+
+    def close(self):
+        self.layer = None
+        self.ds = None
 
 
 def gdal2xyz(
@@ -60,6 +265,8 @@ def gdal2xyz(
     return_np_arrays: bool = False,
     pre_allocate_np_arrays: bool = True,
     progress_callback: OptionalProgressCallback = ...,
+    output_format: Optional[str] = None,
+    num_threads: Optional[Union[int, str]] = None,
 ) -> Optional[Tuple]:
     """
     translates a raster file (or dataset) into xyz format
@@ -81,11 +288,18 @@ def gdal2xyz(
     pre_allocate_np_arrays - pre-allocated result arrays.
         Should be faster unless skip_nodata and the input is very sparse thus most data points will be skipped.
     progress_callback - progress callback function. use None for quiet or Ellipsis for using the default callback
+    output_format - The format of dstfile: XYZ (text), NPZ, Arrow or Parquet,
+        with columns x, y and band_<n> for each band.
+        default (`None`) - guess the format from the extension of dstfile, XYZ otherwise.
+    num_threads - The number of threads reading chunks of rows in parallel,
+        a number or ALL_CPUS (default 1). Each thread reads srcfile through its own dataset,
+        unless it is a dataset object. The chunks are written in order.
     """
 
     result = None
 
     progress_callback = get_progress_callback(progress_callback)
+    num_threads = get_num_threads(num_threads)
 
     # Open source file.
     ds = open_ds(srcfile)
@@ -103,15 +317,14 @@ def gdal2xyz(
 
     dt, np_dt = GDALTypeCodeAndNumericTypeCodeFromDataSet(ds)
 
-    # Open the output file.
-    if dstfile is not None:
-        dst_fh = open(dstfile, "wt")
-    elif return_np_arrays:
-        dst_fh = None
+    if dstfile is None and return_np_arrays:
+        output_format = None
     else:
-        dst_fh = sys.stdout
+        output_format = get_output_format(dstfile, output_format)
+        if output_format != "XYZ" and dstfile is None:
+            raise Exception(f"An output file is required for {output_format} output.")
 
-    if dst_fh:
+    if output_format == "XYZ":
         if dt == gdal.GDT_Int32 or dt == gdal.GDT_UInt32:
             band_format = (("%d" + delim) * len(bands)).rstrip(delim) + "\n"
         else:
@@ -124,10 +337,9 @@ def gdal2xyz(
             and abs(ds.RasterXSize * gt[1]) < 180
             and abs(ds.RasterYSize * gt[5]) < 180
         ):
-            frmt = "%.10g" + delim + "%.10g" + delim + "%s"
+            frmt = "%.10g" + delim + "%.10g" + delim + band_format
         else:
-            frmt = "%.3f" + delim + "%.3f" + delim + "%s"
-
+            frmt = "%.3f" + delim + "%.3f" + delim + band_format
     if isinstance(src_nodata, Number):
         src_nodata = [src_nodata] * band_count
     elif src_nodata is None:
@@ -153,79 +365,142 @@ def gdal2xyz(
     else:
         x_skip = y_skip = skip
 
-    x_off, y_off, x_size, y_size = srcwin
-    bands_count = len(bands)
+    x_off, y_off, x_size, y_size = (int(v) for v in srcwin)
 
-    nXBlocks = (x_size - x_off) // x_skip
-    nYBlocks = (y_size - y_off) // y_skip
-    progress_end = nXBlocks * nYBlocks
+    x_count = len(range(0, x_size, x_skip))
+    y_count = len(range(0, y_size, y_skip))
+    progress_end = x_count * y_count
     progress_curr = 0
-    progress_prev = -1
-    progress_parts = 100
+
+    # Read whole blocks of rows at once, a multiple of y_skip rows.
+    block_y_size = bands[0].GetBlockSize()[1]
+    chunk_rows = block_y_size * max(1, CHUNK_PIXELS // max(1, x_size * block_y_size))
+    if chunk_rows % y_skip:
+        chunk_rows += y_skip - chunk_rows % y_skip
+
+    # Open the output file.
+    writer = None
+    if output_format == "XYZ":
+        writer = XYZWriter(dstfile, frmt)
+    elif output_format is not None:
+        band_numbers = [band.GetBand() for band in bands]
+        names = ["x", "y"] + ["band_%d" % band_number for band_number in band_numbers]
+        dtypes = [np.float64, np.float64] + [np_dt] * band_count
+        if output_format == "NPZ":
+            writer = NPZWriter(dstfile, names, dtypes)
+        else:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                pyarrow = None
+            if pyarrow is not None:
+                writer = ArrowWriter(dstfile, output_format, names, dtypes)
+            else:
+                # row groups of the size of a full chunk
+                row_group_size = max(1, len(range(0, chunk_rows, y_skip)) * x_count)
+                writer = OGRWriter(
+                    dstfile, output_format, names, dtypes, row_group_size
+                )
 
     if return_np_arrays:
         size = progress_end if pre_allocate_np_arrays else 0
         all_geo_x = np.empty(size)
         all_geo_y = np.empty(size)
-        all_data = np.empty((size, band_count), dtype=np_dt)
-
-    # Loop emitting data.
-    idx = 0
-    for y in range(y_off, y_off + y_size, y_skip):
-
-        size = bands_count if pre_allocate_np_arrays else 0
-        data = np.empty((size, x_size), dtype=np_dt)  # dims: (bands_count, x_size)
-        for i_bnd, band in enumerate(bands):
-            band_data = band.ReadAsArray(x_off, y, x_size, 1)  # read one band line
-            if pre_allocate_np_arrays:
-                data[i_bnd] = band_data[0]
+        all_data = np.empty((band_count, size), dtype=np_dt)
+        chunks = []
+
+    # Each thread reads the chunks through its own dataset, reopened from its
+    # filename. A dataset given as an object is shared, and read under a lock.
+    thread_local = threading.local()
+    input_lock = threading.Lock()
+    shared = num_threads > 1 and not is_path_like(srcfile)
+
+    def get_thread_bands():
+        if num_threads == 1 or shared:
+            return bands
+        thread_bands = getattr(thread_local, "bands", None)
+        if thread_bands is None:
+            thread_local.ds = open_ds(srcfile)
+            thread_bands = get_bands(
+                thread_local.ds, [band.GetBand() for band in bands]
+            )
+            thread_local.bands = thread_bands
+        return thread_bands
+
+    x = np.arange(x_off, x_off + x_size, x_skip) + 0.5
+
+    def read_chunk(y_start):
+        rows = min(chunk_rows, y_off + y_size - y_start)
+
+        data = np.empty((band_count, rows, x_size), dtype=np_dt)
+        if shared:
+            input_lock.acquire()
+        try:
+            for i_bnd, band in enumerate(get_thread_bands()):
+                data[i_bnd] = band.ReadAsArray(x_off, y_start, x_size, rows)
+        finally:
+            if shared:
+                input_lock.release()
+        data = data[:, ::y_skip, ::x_skip].reshape(band_count, -1)
+        points = data.shape[1]
+
+        y = np.arange(y_start, y_start + rows, y_skip)[:, np.newaxis] + 0.5
+        geo_x = (gt[0] + x * gt[1] + y * gt[2]).ravel()
+        geo_y = (gt[3] + x * gt[4] + y * gt[5]).ravel()
+
+        if process_nodata:
+            nodata_mask = np.all(data == src_nodata[:, np.newaxis], axis=0)
+            if skip_nodata:
+                valid = ~nodata_mask
+                geo_x = geo_x[valid]
+                geo_y = geo_y[valid]
+                data = data[:, valid]
             else:
-                data = np.append(data, band_data, axis=0)
+                data[:, nodata_mask] = dst_nodata[:, np.newaxis]
 
-        for x_i in range(0, x_size, x_skip):
+        return geo_x, geo_y, data, points
 
-            progress_curr += 1
-            if progress_callback:
-                progress_frac = progress_curr / progress_end
-                progress = int(progress_frac * progress_parts)
-                if progress > progress_prev:
-                    progress_prev = progress
-                    progress_callback(progress_frac)
-
-            x_i_data = data[:, x_i]  # single pixel, dims: (bands)
-            if process_nodata and np.array_equal(src_nodata, x_i_data):
-                if skip_nodata:
-                    continue
-                elif replace_nodata:
-                    x_i_data = dst_nodata
-
-            x = x_i + x_off
-
-            geo_x = gt[0] + (x + 0.5) * gt[1] + (y + 0.5) * gt[2]
-            geo_y = gt[3] + (x + 0.5) * gt[4] + (y + 0.5) * gt[5]
-
-            if dst_fh:
-                band_str = band_format % tuple(x_i_data)
-                line = frmt % (float(geo_x), float(geo_y), band_str)
-                dst_fh.write(line)
+    y_starts = range(y_off, y_off + y_size, chunk_rows)
+    if num_threads == 1:
+        read_chunks = map(read_chunk, y_starts)
+    else:
+        read_chunks = map_in_threads(read_chunk, y_starts, num_threads)
+
+    # Loop emitting data.
+    idx = 0
+    try:
+        for geo_x, geo_y, data, points in read_chunks:
+            progress_curr += points
+            count = data.shape[1]
+            if writer is not None:
+                writer.write(geo_x, geo_y, data)
             if return_np_arrays:
                 if pre_allocate_np_arrays:
-                    all_geo_x[idx] = geo_x
-                    all_geo_y[idx] = geo_y
-                    all_data[idx] = x_i_data
+                    all_geo_x[idx : idx + count] = geo_x
+                    all_geo_y[idx : idx + count] = geo_y
+                    all_data[:, idx : idx + count] = data
                 else:
-                    all_geo_x = np.append(all_geo_x, geo_x)
-                    all_geo_y = np.append(all_geo_y, geo_y)
-                    all_data = np.append(all_data, [x_i_data], axis=0)
-            idx += 1
+                    chunks.append((geo_x, geo_y, data))
+            idx += count
+
+            if progress_callback:
+                progress_callback(progress_curr / progress_end)
+    finally:
+        if writer is not None:
+            writer.close()
 
     if return_np_arrays:
         nodata = None if skip_nodata else dst_nodata if replace_nodata else src_nodata
-        if idx != progress_curr:
+        if not pre_allocate_np_arrays:
+            if chunks:
+                all_geo_x = np.concatenate([chunk[0] for chunk in chunks])
+                all_geo_y = np.concatenate([chunk[1] for chunk in chunks])
+                all_data = np.concatenate([chunk[2] for chunk in chunks], axis=1)
+        elif idx != progress_curr:
             all_geo_x = all_geo_x[:idx]
             all_geo_y = all_geo_y[:idx]
-            all_data = all_data[:idx, :]
-        result = all_geo_x, all_geo_y, all_data.transpose(), nodata
+            all_data = all_data[:, :idx]
+        result = all_geo_x, all_geo_y, all_data, nodata
 
     return result
 
@@ -327,6 +602,24 @@ class GDAL2XYZ(GDALScript):
             "(per band or per dataset).",
         )
 
+        parser.add_argument(
+            "-of",
+            dest="output_format",
+            metavar="format",
+            type=str,
+            help="Output format: XYZ (text), NPZ, Arrow or Parquet. "
+            "Default - guess from the extension of the destination file, XYZ otherwise.",
+        )
+
+        parser.add_argument(
+            "-threads",
+            dest="num_threads",
+            metavar="threads",
+            type=str,
+            help="Number of threads reading chunks of rows in parallel, "
+            "a number or ALL_CPUS (default 1).",
+        )
+
         parser.add_argument(
             "srcfile",
             metavar="src_dataset",
@@ -32,12 +32,16 @@
 # ******************************************************************************
 
 import argparse
+import collections
+import concurrent.futures
 import glob
+import math
 import os
 import os.path
 import string
 import sys
 import textwrap
+import threading
 from numbers import Number
 from typing import Dict, Optional, Sequence, Tuple, Union
 
@@ -50,10 +54,18 @@ from osgeo_utils.auxiliary.color_table import ColorTableLike, get_color_table
 from osgeo_utils.auxiliary.extent_util import GT, Extent
 from osgeo_utils.auxiliary.gdal_argparse import GDALArgumentParser, GDALScript
 from osgeo_utils.auxiliary.rectangle import GeoRectangle
-from osgeo_utils.auxiliary.util import GetOutputDriverFor, open_ds
+from osgeo_utils.auxiliary.util import GetOutputDriverFor, get_num_threads, open_ds
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
 
 GDALDataType = int
 
+# default maximum size of the data of the chunks, in MB
+DEFAULT_CHUNK_MEMORY = 64
+
 # create alphabetic list (lowercase + uppercase) for storing input layers
 AlphaList = list(string.ascii_letters)
 
@@ -97,6 +109,335 @@ sum all files with hidden noDataValue
 """
 
 
+def get_nodata_dtype(
+    dtype: numpy.dtype, ndv: Number, out_dtype: numpy.dtype
+) -> numpy.dtype:
+    """
+    Return the smallest type holding the values of dtype, and the nodata value
+    as it is written into a band of type out_dtype
+    """
+    out_dtype = numpy.dtype(out_dtype)
+    with numpy.errstate(all="ignore"):
+        if out_dtype.kind == "f" and numpy.isfinite(out_dtype.type(ndv)):
+            # the nodata value is rounded to the output floating point type
+            ndv = out_dtype.type(ndv).item()
+        for candidate in (
+            numpy.dtype(dtype),
+            numpy.promote_types(dtype, numpy.float32),
+            numpy.promote_types(dtype, numpy.float64),
+        ):
+            try:
+                value = candidate.type(ndv).item()
+            except (OverflowError, ValueError):
+                continue
+            # compared as Python numbers, and NaN is held by floating point types
+            if value == ndv or (value != value and ndv != ndv):
+                return candidate
+    return numpy.dtype(numpy.float64)
+
+
+def count_block_reads(
+    size: int, chunk_size: int, offset: int, in_size: int, block_size: int
+) -> int:
+    """
+    Return the number of input blocks read along an axis, processing an output
+    of the given size by chunks, from an input at the given offset in pixels
+    """
+    starts = numpy.arange(0, size, chunk_size)
+    ends = numpy.clip(numpy.minimum(starts + chunk_size, size) + offset, 0, in_size)
+    starts = numpy.clip(starts + offset, 0, in_size)
+    valid = ends > starts
+    return int(
+        numpy.sum((ends[valid] - 1) // block_size - starts[valid] // block_size + 1)
+    )
+
+
+def get_block_size(
+    dimensions: Sequence[int],
+    bands: Sequence[gdal.Band],
+    offsets: Sequence[Tuple[int, int]],
+) -> Tuple[int, int]:
+    """
+    Return the size of the blocks to process the output by, among the block
+    sizes of the input bands, minimizing the amount of input blocks data read,
+    assuming blocks are not kept in the cache from a processed block to another
+    """
+    candidates = []
+    for band in bands:
+        block_size = tuple(min(b, d) for b, d in zip(band.GetBlockSize(), dimensions))
+        if block_size not in candidates:
+            candidates.append(block_size)
+
+    def cost(chunk_size):
+        total = 0
+        for band, offset in zip(bands, offsets):
+            block_size = band.GetBlockSize()
+            nb_blocks = count_block_reads(
+                dimensions[0], chunk_size[0], offset[0], band.XSize, block_size[0]
+            ) * count_block_reads(
+                dimensions[1], chunk_size[1], offset[1], band.YSize, block_size[1]
+            )
+            total += (
+                nb_blocks
+                * block_size[0]
+                * block_size[1]
+                * gdal.GetDataTypeSize(band.DataType)
+            )
+        return total
+
+    # the first input block size is kept in case of a tie
+    return min(candidates, key=cost)
+
+
+def get_chunk_size(
+    dimensions: Sequence[int],
+    block_size: Sequence[int],
+    pixel_bytes: int,
+    max_bytes: int,
+) -> Tuple[int, int]:
+    """
+    Return the size of the chunks to process the output by, grouping blocks of
+    block_size, first along the rows and then into strips of full rows, as long
+    as the data of a chunk, of pixel_bytes per pixel, does not exceed max_bytes.
+    The blocks are spread evenly between the chunks.
+    """
+
+    def spread(nb_blocks, max_blocks):
+        nb_chunks = -(-nb_blocks // max_blocks)
+        return -(-nb_blocks // nb_chunks)
+
+    max_blocks = max(1, max_bytes // (block_size[0] * block_size[1] * pixel_bytes))
+    nx_blocks = -(-dimensions[0] // block_size[0])
+    if max_blocks < nx_blocks:
+        return spread(nx_blocks, max_blocks) * block_size[0], block_size[1]
+    ny_blocks = -(-dimensions[1] // block_size[1])
+    chunk_ysize = spread(ny_blocks, max_blocks // nx_blocks) * block_size[1]
+    return dimensions[0], min(chunk_ysize, dimensions[1])
+
+
+def read_window(
+    band: gdal.Band,
+    xoff: int,
+    yoff: int,
+    buf_obj: numpy.ndarray,
+    coverage: Optional[numpy.ndarray] = None,
+) -> Optional[numpy.ndarray]:
+    """
+    Read into buf_obj a window of the band, which may extend beyond it: the
+    pixels outside of the band are set to its nodata value, or zero. If given,
+    the boolean array coverage is set to whether each pixel is within the band.
+    """
+    win_ysize, win_xsize = buf_obj.shape
+    x0, y0 = max(xoff, 0), max(yoff, 0)
+    x1 = min(xoff + win_xsize, band.XSize)
+    y1 = min(yoff + win_ysize, band.YSize)
+    if coverage is not None:
+        coverage.fill(False)
+        if x1 > x0 and y1 > y0:
+            coverage[y0 - yoff : y1 - yoff, x0 - xoff : x1 - xoff] = True
+    if (x0, y0, x1, y1) == (xoff, yoff, xoff + win_xsize, yoff + win_ysize):
+        return gdal_array.BandReadAsArray(
+            band,
+            xoff=xoff,
+            yoff=yoff,
+            win_xsize=win_xsize,
+            win_ysize=win_ysize,
+            buf_obj=buf_obj,
+        )
+
+    ndv = band.GetNoDataValue()
+    buf_obj.fill(0 if ndv is None else ndv)
+    if x1 > x0 and y1 > y0:
+        if (
+            gdal_array.BandReadAsArray(
+                band,
+                xoff=x0,
+                yoff=y0,
+                win_xsize=x1 - x0,
+                win_ysize=y1 - y0,
+                buf_obj=buf_obj[y0 - yoff : y1 - yoff, x0 - xoff : x1 - xoff],
+            )
+            is None
+        ):
+            return None
+    return buf_obj
+
+
+def to_datatype(array: numpy.ndarray, dtype: numpy.dtype) -> numpy.ndarray:
+    """
+    Return the array converted to dtype as GDAL does when writing it: values
+    are rounded, and clamped to the range of integer datatypes
+    """
+    dtype = numpy.dtype(dtype)
+    if array.dtype != dtype and dtype.kind in "iu":
+        if array.dtype.kind == "f":
+            array = numpy.nan_to_num(numpy.trunc(array + numpy.copysign(0.5, array)))
+        info = numpy.iinfo(dtype)
+        array = numpy.clip(array, info.min, info.max)
+    return array.astype(dtype, copy=False)
+
+
+def get_valid_mask(
+    array: numpy.ndarray, ndv: Optional[Number]
+) -> Optional[numpy.ndarray]:
+    """Return where the array is not nodata nor NaN, or None if it is everywhere"""
+    valid = None
+    if ndv is not None:
+        try:
+            ndv = array.dtype.type(ndv)
+        except (OverflowError, ValueError):
+            ndv = None
+        if ndv is not None and ndv == ndv:
+            valid = array != ndv
+    if array.dtype.kind == "f":
+        not_nan = ~numpy.isnan(array)
+        valid = not_nan if valid is None else valid & not_nan
+    return valid
+
+
+class BandReductions:
+    """
+    Statistics, histogram and zonal sums of the valid values of an output band,
+    accumulated block by block
+    """
+
+    def __init__(
+        self,
+        statistics: bool = False,
+        histogram: Optional[Sequence[Number]] = None,
+        zones: bool = False,
+    ):
+        self.statistics = statistics
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.mean = None
+        self.m2 = 0.0  # sum of the squared differences to the mean
+        if histogram:
+            self.histogram_min, self.histogram_max, buckets = histogram
+            self.histogram = numpy.zeros(int(buckets), dtype=numpy.int64)
+        else:
+            self.histogram = None
+        self.zone_counts = {} if zones else None
+        self.zone_sums = {} if zones else None
+
+    @property
+    def stddev(self) -> Optional[float]:
+        return math.sqrt(self.m2 / self.count) if self.count else None
+
+    def add(
+        self,
+        values: numpy.ndarray,
+        zone_ids: Optional[numpy.ndarray] = None,
+        zone_values: Optional[numpy.ndarray] = None,
+    ):
+        """
+        Add the valid values of a block, and the valid values of the block in a
+        valid zone, with their zones
+        """
+        if self.statistics and values.size:
+            other = BandReductions(statistics=True)
+            other.count = values.size
+            other.min = values.min().item()
+            other.max = values.max().item()
+            other.mean = values.mean(dtype=numpy.float64).item()
+            other.m2 = numpy.square(values - other.mean).sum().item()
+            self.update(other)
+
+        if self.histogram is not None and values.size:
+            buckets = len(self.histogram)
+            scale = buckets / (self.histogram_max - self.histogram_min)
+            index = numpy.floor((values - self.histogram_min) * scale)
+            index = index[(index >= 0) & (index < buckets)].astype(numpy.intp)
+            self.histogram += numpy.bincount(index, minlength=buckets)
+
+        if self.zone_sums is not None and zone_ids is not None and zone_ids.size:
+            # integer zones of a small range are counted without sorting them
+            small_range = False
+            if zone_ids.dtype.kind in "iu":
+                first = zone_ids.min().item()
+                small_range = zone_ids.max().item() - first < 65536
+            if small_range:
+                index = (zone_ids - first).astype(numpy.intp)
+                counts = numpy.bincount(index)
+                ids = numpy.flatnonzero(counts)
+                sums = numpy.bincount(index, weights=zone_values)[ids]
+                counts = counts[ids]
+                ids = ids + first
+            else:
+                ids, index, counts = numpy.unique(
+                    zone_ids, return_inverse=True, return_counts=True
+                )
+                sums = numpy.bincount(index.ravel(), weights=zone_values)
+            for zone, count, total in zip(ids.tolist(), counts.tolist(), sums.tolist()):
+                self.zone_counts[zone] = self.zone_counts.get(zone, 0) + count
+                self.zone_sums[zone] = self.zone_sums.get(zone, 0) + total
+
+    def update(self, other: "BandReductions"):
+        """Accumulate the reductions of another part of the band"""
+        if other.count:
+            if self.count:
+                count = self.count + other.count
+                delta = other.mean - self.mean
+                self.mean += delta * other.count / count
+                self.m2 += other.m2 + delta * delta * self.count * other.count / count
+                self.min = min(self.min, other.min)
+                self.max = max(self.max, other.max)
+                self.count = count
+            else:
+                self.count = other.count
+                self.min = other.min
+                self.max = other.max
+                self.mean = other.mean
+                self.m2 = other.m2
+        if self.histogram is not None and other.histogram is not None:
+            self.histogram += other.histogram
+        if self.zone_sums is not None and other.zone_sums is not None:
+            for zone, count in other.zone_counts.items():
+                self.zone_counts[zone] = self.zone_counts.get(zone, 0) + count
+                self.zone_sums[zone] = (
+                    self.zone_sums.get(zone, 0) + other.zone_sums[zone]
+                )
+
+    def set_to_band(self, band: gdal.Band):
+        """Set the reductions as the statistics, histogram and metadata of the band"""
+        if self.statistics and self.count:
+            band.SetStatistics(self.min, self.max, self.mean, self.stddev)
+        if self.histogram is not None:
+            band.SetDefaultHistogram(
+                self.histogram_min, self.histogram_max, self.histogram.tolist()
+            )
+        if self.zone_sums is not None:
+            metadata = {}
+            for zone in sorted(self.zone_sums):
+                metadata[f"ZONE_{zone}_COUNT"] = str(self.zone_counts[zone])
+                metadata[f"ZONE_{zone}_SUM"] = repr(self.zone_sums[zone])
+            band.SetMetadata(metadata, "ZONES")
+
+    def __str__(self):
+        lines = []
+        if self.statistics:
+            if self.count:
+                lines.append(
+                    f"Minimum={self.min:.3f}, Maximum={self.max:.3f}, "
+                    f"Mean={self.mean:.3f}, StdDev={self.stddev:.3f}"
+                )
+            lines.append(f"Valid pixel count={self.count}")
+        if self.histogram is not None:
+            lines.append(
+                f"{len(self.histogram)} buckets from {self.histogram_min} "
+                f"to {self.histogram_max}:"
+            )
+            lines.append("  " + " ".join(str(c) for c in self.histogram.tolist()))
+        if self.zone_sums is not None:
+            for zone in sorted(self.zone_sums):
+                lines.append(
+                    f"Zone {zone}: count={self.zone_counts[zone]}, "
+                    f"sum={self.zone_sums[zone]}"
+                )
+        return "\n".join(lines)
+
+
 def Calc(
     calc: MaybeSequence[str],
     outfile: Optional[PathLikeOrStr] = None,
@@ -114,6 +455,14 @@ def Calc(
     user_namespace: Optional[Dict] = None,
     debug: bool = False,
     quiet: bool = False,
+    num_threads: Optional[Union[int, str]] = None,
+    use_numexpr: bool = False,
+    chunk_size: Optional[Sequence[int]] = None,
+    chunk_memory: Optional[Number] = None,
+    statistics: bool = False,
+    histogram: Optional[Sequence[Number]] = None,
+    zones: Optional[Union[PathLikeOrStr, gdal.Dataset]] = None,
+    zones_band: int = 1,
     **input_files,
 ):
 
@@ -146,12 +495,19 @@ def Calc(
     if user_namespace:
         global_namespace.update(user_namespace)
 
+    # without an output file nor format, only the reductions are calculated
+    reduce = statistics or histogram or zones is not None
+    reduce_only = reduce and not outfile and not format
+
     if not calc:
         raise Exception("No calculation provided.")
-    elif not outfile and format.upper() != "MEM":
+    elif not outfile and not reduce_only and (not format or format.upper() != "MEM"):
         raise Exception("No output file provided.")
 
-    if format is None:
+    if histogram and (len(histogram) != 3 or histogram[0] >= histogram[1]):
+        raise Exception(f"Error! Invalid histogram min, max and buckets: {histogram}")
+
+    if format is None and not reduce_only:
         format = GetOutputDriverFor(outfile)
 
     if isinstance(extent, GeoRectangle):
@@ -198,7 +554,7 @@ def Calc(
     GeoTransformCheck = None  # GeoTransform of the output
     GeoTransforms = []  # GeoTransform of each input file
     GeoTransformDiffer = False  # True if we have inputs with different GeoTransforms
-    myTempFileNames = []  # vrt filename from each input file
+    myOffsets = []  # offset in pixels of the output grid in each input file
     myAlphaFileLists = []  # list of the Alphas which holds a list of inputs
 
     # loop through input files - checking dimensions
@@ -332,18 +688,40 @@ def Calc(
         )
         if GeoTransformCheck is None:
             raise Exception("Error! The requested extent is empty. Cannot proceed")
-        for i in range(len(myFileNames)):
-            temp_vrt_filename, temp_vrt_ds = extent_util.make_temp_vrt(
-                myFiles[i], ExtentCheck
-            )
-            myTempFileNames.append(temp_vrt_filename)
-            myFiles[i] = None  # close original ds
-            myFiles[i] = temp_vrt_ds  # replace original ds with vrt_ds
 
-            # update the new precise dimensions and gt from the new ds
-            GeoTransformCheck = temp_vrt_ds.GetGeoTransform()
-            DimensionsCheck = [temp_vrt_ds.RasterXSize, temp_vrt_ds.RasterYSize]
-        temp_vrt_ds = None
+        # output grid snapped on the requested extent, as done by gdalbuildvrt
+        GeoTransformCheck = (
+            ExtentCheck.min_x,
+            GeoTransformCheck[1],
+            0,
+            ExtentCheck.max_y,
+            0,
+            GeoTransformCheck[5],
+        )
+        DimensionsCheck = [
+            int(0.5 + ExtentCheck.w / abs(GeoTransformCheck[1])),
+            int(0.5 + ExtentCheck.h / abs(GeoTransformCheck[5])),
+        ]
+
+        # inputs have the same pixel size as the output: each output pixel is
+        # read from the nearest input pixel, at a constant offset
+        for myFileGeoTransform in GeoTransforms:
+            myOffsets.append(
+                (
+                    math.floor(
+                        0.5
+                        + (GeoTransformCheck[0] - myFileGeoTransform[0])
+                        / myFileGeoTransform[1]
+                    ),
+                    math.floor(
+                        0.5
+                        + (GeoTransformCheck[3] - myFileGeoTransform[3])
+                        / myFileGeoTransform[5]
+                    ),
+                )
+            )
+    else:
+        myOffsets = [(0, 0)] * len(myFiles)
 
     ################################################################
     # set up output file
@@ -383,6 +761,7 @@ def Calc(
 
         myOutB = myOut.GetRasterBand(1)
         myOutNDV = myOutB.GetNoDataValue()
+        myOutBandNDV = myOutNDV
         myOutType = myOutB.DataType
 
     else:
@@ -411,29 +790,32 @@ def Calc(
             if isinstance(myOutType, str):
                 myOutType = gdal.GetDataTypeByName(myOutType)
 
-        # create file
-        myOutDrv = gdal.GetDriverByName(format)
-        myOut = myOutDrv.Create(
-            os.fspath(outfile),
-            DimensionsCheck[0],
-            DimensionsCheck[1],
-            allBandsCount,
-            myOutType,
-            creation_options,
-        )
-        if myOut is None:
-            raise Exception(f"Error! Could not create output file {outfile}")
+        if reduce_only:
+            myOut = None
+        else:
+            # create file
+            myOutDrv = gdal.GetDriverByName(format)
+            myOut = myOutDrv.Create(
+                os.fspath(outfile),
+                DimensionsCheck[0],
+                DimensionsCheck[1],
+                allBandsCount,
+                myOutType,
+                creation_options,
+            )
+            if myOut is None:
+                raise Exception(f"Error! Could not create output file {outfile}")
 
-        # set output geo info based on first input layer
-        if not GeoTransformCheck:
-            GeoTransformCheck = myFiles[0].GetGeoTransform(can_return_null=True)
-        if GeoTransformCheck:
-            myOut.SetGeoTransform(GeoTransformCheck)
+            # set output geo info based on first input layer
+            if not GeoTransformCheck:
+                GeoTransformCheck = myFiles[0].GetGeoTransform(can_return_null=True)
+            if GeoTransformCheck:
+                myOut.SetGeoTransform(GeoTransformCheck)
 
-        if not ProjectionCheck:
-            ProjectionCheck = myFiles[0].GetProjection()
-        if ProjectionCheck:
-            myOut.SetProjection(ProjectionCheck)
+            if not ProjectionCheck:
+                ProjectionCheck = myFiles[0].GetProjection()
+            if ProjectionCheck:
+                myOut.SetProjection(ProjectionCheck)
 
         if NoDataValue is None:
             myOutNDV = DefaultNDVLookup[
@@ -444,214 +826,550 @@ def Calc(
         else:
             myOutNDV = NoDataValue  # use the given noDataValue
 
-        for i in range(1, allBandsCount + 1):
-            myOutB = myOut.GetRasterBand(i)
-            if myOutNDV is not None:
-                myOutB.SetNoDataValue(myOutNDV)
-            if color_table:
-                # set color table and color interpretation
-                if is_path_like(color_table):
-                    color_table = get_color_table(color_table)
-                myOutB.SetRasterColorTable(color_table)
-                myOutB.SetRasterColorInterpretation(gdal.GCI_PaletteIndex)
+        if myOut is not None:
+            for i in range(1, allBandsCount + 1):
+                myOutB = myOut.GetRasterBand(i)
+                if myOutNDV is not None:
+                    myOutB.SetNoDataValue(myOutNDV)
+                if color_table:
+                    # set color table and color interpretation
+                    if is_path_like(color_table):
+                        color_table = get_color_table(color_table)
+                    myOutB.SetRasterColorTable(color_table)
+                    myOutB.SetRasterColorInterpretation(gdal.GCI_PaletteIndex)
 
-            myOutB = None  # write to band
+                myOutB = None  # write to band
 
+        # the nodata value of the output bands, excluded from the reductions
+        myOutBandNDV = myOutNDV
         if hideNoData:
             myOutNDV = None
 
     myOutTypeName = gdal.GetDataTypeName(myOutType)
+    myOutNumericType = gdal_array.GDALTypeCodeToNumericTypeCode(myOutType)
     if debug:
         print(
-            f"output file: {outfile}, dimensions: {myOut.RasterXSize}, {myOut.RasterYSize}, type: {myOutTypeName}"
+            f"output file: {outfile}, dimensions: {DimensionsCheck[0]}, {DimensionsCheck[1]}, type: {myOutTypeName}"
         )
 
     ################################################################
-    # find block size to chop grids into bite-sized chunks
+    # set up reductions
     ################################################################
 
-    # use the block size of the first layer to read efficiently
-    myBlockSize = myFiles[0].GetRasterBand(myBands[0]).GetBlockSize()
-    # find total x and y blocks to be read
-    nXBlocks = (int)((DimensionsCheck[0] + myBlockSize[0] - 1) / myBlockSize[0])
-    nYBlocks = (int)((DimensionsCheck[1] + myBlockSize[1] - 1) / myBlockSize[1])
-    myBufSize = myBlockSize[0] * myBlockSize[1]
+    myZonesName = None  # zones filename
+    myZones = None  # zones DataSet
+    myZonesOffset = (0, 0)  # offset in pixels of the output grid in the zones
+    if zones is not None:
+        if is_path_like(zones):
+            myZonesName = zones
+            myZones = open_ds(zones)
+            if not myZones:
+                raise IOError(f"No such file or directory: '{zones}'")
+        else:
+            myZones = zones
+        myZonesGeoTransform = myZones.GetGeoTransform(can_return_null=True)
+        if (
+            extent != Extent.IGNORE
+            and GeoTransformCheck
+            and myZonesGeoTransform
+            and extent_util.gt_diff(
+                GeoTransformCheck,
+                myZonesGeoTransform,
+                eps=compatible_gt_eps,
+                diff_support=gt_diff_support,
+            )
+            in [GT.SAME, GT.ALMOST_SAME, GT.COMPATIBLE_DIFF]
+        ):
+            myZonesOffset = (
+                math.floor(
+                    0.5
+                    + (GeoTransformCheck[0] - myZonesGeoTransform[0])
+                    / myZonesGeoTransform[1]
+                ),
+                math.floor(
+                    0.5
+                    + (GeoTransformCheck[3] - myZonesGeoTransform[3])
+                    / myZonesGeoTransform[5]
+                ),
+            )
+        elif [myZones.RasterXSize, myZones.RasterYSize] != DimensionsCheck:
+            raise Exception(
+                f"Error! Dimensions of zones file {zones} ({myZones.RasterXSize:d}, "
+                f"{myZones.RasterYSize:d}) are different from the output "
+                f"({DimensionsCheck[0]:d}, {DimensionsCheck[1]:d}).  Cannot proceed"
+            )
+        myZonesNDV = myZones.GetRasterBand(zones_band).GetNoDataValue()
+
+    # reductions of each output band, accumulated by the writing thread
+    band_reductions = [
+        BandReductions(statistics, histogram, zones is not None)
+        for _ in range(allBandsCount)
+    ]
+
+    ################################################################
+    # find block size to chop grids into bite-sized chunks
+    ################################################################
 
+    num_threads = get_num_threads(num_threads)
+    if debug:
+        print(f"using {num_threads} thread(s)")
+
+    # use the block size of the input layers that reads them most efficiently
+    myInputBands = [
+        myFile.GetRasterBand(myBand) for myFile, myBand in zip(myFiles, myBands)
+    ]
+    myInputOffsets = list(myOffsets)
+    if myZones is not None:
+        myInputBands.append(myZones.GetRasterBand(zones_band))
+        myInputOffsets.append(myZonesOffset)
+    myBlockSize = get_block_size(DimensionsCheck, myInputBands, myInputOffsets)
     if debug:
         print(f"using blocksize {myBlockSize[0]} x {myBlockSize[1]}")
 
+    if chunk_size:
+        myChunkSize = [min(c, d) for c, d in zip(chunk_size, DimensionsCheck)]
+        if min(myChunkSize) < 1:
+            raise Exception(f"Error! Invalid chunk size: {chunk_size}")
+    else:
+        # group blocks into chunks of a few MB, so that the time spent per chunk
+        # in Python is negligible. By default, the blocks read concurrently must
+        # also fit in the GDAL block cache, not to be read several times.
+        if chunk_memory:
+            max_bytes = int(chunk_memory * 1024 * 1024)
+        else:
+            max_bytes = min(
+                DEFAULT_CHUNK_MEMORY * 1024 * 1024,
+                gdal.GetCacheMax() // (2 * num_threads),
+            )
+        # the inputs, the output, and the nodata mask plus temporary arrays
+        pixel_bytes = (
+            sum(gdal.GetDataTypeSize(band.DataType) // 8 for band in myInputBands)
+            + gdal.GetDataTypeSize(myOutType) // 8
+            + 8
+        )
+        myChunkSize = get_chunk_size(
+            DimensionsCheck, myBlockSize, pixel_bytes, max_bytes
+        )
+    myInputBands = None
+    # find total x and y chunks to be read
+    nXBlocks = (int)((DimensionsCheck[0] + myChunkSize[0] - 1) / myChunkSize[0])
+    nYBlocks = (int)((DimensionsCheck[1] + myChunkSize[1] - 1) / myChunkSize[1])
+
+    if debug:
+        print(f"using chunk size {myChunkSize[0]} x {myChunkSize[1]}")
+
     # variables for displaying progress
     ProgressCt = -1
     ProgressMk = -1
     ProgressEnd = nXBlocks * nYBlocks * allBandsCount
 
     ################################################################
-    # start looping through each band in allBandsCount
+    # set up threads
+    ################################################################
+
+    # the blocks go through a pipeline of three stages, so that the reading of
+    # the inputs, the calculations and the writing of the output overlap: the
+    # inputs are read by num_threads threads, the calculations are evaluated by
+    # num_threads other threads, and the output is written, in order, by a
+    # single thread. Each reading thread reads the inputs through its own
+    # handles, reopened from their filenames. Datasets given as objects are
+    # shared, and read under a lock.
+    thread_local = threading.local()
+    input_lock = threading.Lock()
+
+    # maximum number of blocks in the pipeline, each one using its own set of
+    # buffers until it is written
+    max_pending = 2 * num_threads + 1
+    buffer_sets = [{} for _ in range(max_pending)]
+
+    def get_buffer(buffers, key, shape, dtype):
+        """Return an array of the buffer set of a block, reused across blocks"""
+        key = (key, shape, numpy.dtype(dtype))
+        buffer = buffers.get(key)
+        if buffer is None:
+            buffer = numpy.empty(shape, dtype=dtype)
+            buffers[key] = buffer
+        return buffer
+
+    def get_thread_files():
+        """Return the input datasets and the zones dataset of the current thread"""
+        if num_threads == 1:
+            return myFiles, myZones
+        files = getattr(thread_local, "files", None)
+        if files is None:
+            files = [
+                open_ds(name) if name else myFile
+                for name, myFile in zip(
+                    myFileNames + [myZonesName], myFiles + [myZones]
+                )
+            ]
+            thread_local.files = files
+        return files[:-1], files[-1]
+
+    ################################################################
+    # compile the calculations
     ################################################################
 
-    for bandNo in range(1, allBandsCount + 1):
+    calc_code = []
+    for this_calc in calc:
+        try:
+            calc_code.append(compile(this_calc, "<calc>", "eval"))
+        except SyntaxError:
+            print(f"evaluation of calculation {this_calc} failed")
+            raise
+
+    if use_numexpr and numexpr is None:
+        raise Exception("Error! numexpr is not available. Cannot proceed")
+    # calculations not supported by numexpr are evaluated with numpy
+    use_numexpr_calc = [use_numexpr] * len(calc)
 
-        ################################################################
-        # start looping through blocks of data
-        ################################################################
+    # arrays of the global namespace, that must not be modified in place
+    user_arrays = [v for v in global_namespace.values() if isinstance(v, numpy.ndarray)]
+
+    ################################################################
+    # read, calculate and write a block of data
+    ################################################################
+
+    def read_block(
+        buffers,
+        bandNo,
+        count_file_per_alpha,
+        largest_datatype_per_alpha,
+        myX,
+        myY,
+        nXValid,
+        nYValid,
+    ):
+        files, zones_file = get_thread_files()
+        shape = (nYValid, nXValid)
+
+        # create empty buffer to mark where nodata occurs
+        myNDVs = None
+
+        # make local namespace for calculation
+        local_namespace = {}
 
-        # store these numbers in variables that may change later
-        nXValid = myBlockSize[0]
-        nYValid = myBlockSize[1]
+        # Create destination numpy arrays for each alpha
+        numpy_arrays = {}
+        counter_per_alpha = {}
+        for Alpha in count_file_per_alpha:
+            dtype = gdal_array.GDALTypeCodeToNumericTypeCode(
+                largest_datatype_per_alpha[Alpha]
+            )
+            if count_file_per_alpha[Alpha] == 1:
+                numpy_arrays[Alpha] = get_buffer(buffers, Alpha, shape, dtype)
+            else:
+                numpy_arrays[Alpha] = get_buffer(
+                    buffers, Alpha, (count_file_per_alpha[Alpha],) + shape, dtype
+                )
+            counter_per_alpha[Alpha] = 0
 
-        count_file_per_alpha = {}
-        largest_datatype_per_alpha = {}
+        # fetch data for each input layer
         for i, Alpha in enumerate(myAlphaList):
+
+            # populate lettered arrays with values
+            if allBandsIndex is not None and allBandsIndex == i:
+                myBandNo = bandNo
+            else:
+                myBandNo = myBands[i]
+
             if Alpha in myAlphaFileLists:
-                # populate lettered arrays with values
-                if allBandsIndex is not None and allBandsIndex == i:
-                    myBandNo = bandNo
-                else:
-                    myBandNo = myBands[i]
-                band = myFiles[i].GetRasterBand(myBandNo)
-                if Alpha not in count_file_per_alpha:
-                    count_file_per_alpha[Alpha] = 1
-                    largest_datatype_per_alpha[Alpha] = band.DataType
+                if count_file_per_alpha[Alpha] == 1:
+                    buf_obj = numpy_arrays[Alpha]
                 else:
-                    count_file_per_alpha[Alpha] += 1
-                    if hasattr(gdal, "DataTypeUnion"):
-                        largest_datatype_per_alpha[Alpha] = gdal.DataTypeUnion(
-                            largest_datatype_per_alpha[Alpha], band.DataType
-                        )
+                    buf_obj = numpy_arrays[Alpha][counter_per_alpha[Alpha]]
+                counter_per_alpha[Alpha] += 1
+            else:
+                band = files[i].GetRasterBand(myBandNo)
+                buf_obj = get_buffer(
+                    buffers,
+                    i,
+                    shape,
+                    gdal_array.GDALTypeCodeToNumericTypeCode(band.DataType),
+                )
+            shared = num_threads > 1 and files[i] is myFiles[i]
+            if shared:
+                input_lock.acquire()
+            try:
+                myval = read_window(
+                    files[i].GetRasterBand(myBandNo),
+                    myX + myOffsets[i][0],
+                    myY + myOffsets[i][1],
+                    buf_obj,
+                )
+            finally:
+                if shared:
+                    input_lock.release()
+            if myval is None:
+                raise Exception(
+                    f"Input block reading failed from filename {myFileNames[i]}"
+                )
 
-        # loop through X-lines
-        for X in range(0, nXBlocks):
+            # fill in nodata values
+            if myNDV[i] is not None:
+                # myNDVs is a boolean buffer.
+                # a cell is True if there is NDV in any of the corresponding cells in input raster bands.
+                if myNDVs is None:
+                    # this is the first band that has NDV set
+                    myNDVs = numpy.equal(
+                        myval, myNDV[i], out=get_buffer(buffers, "ndv", shape, bool)
+                    )
+                else:
+                    myNDVs |= numpy.equal(
+                        myval,
+                        myNDV[i],
+                        out=get_buffer(buffers, "ndv_band", shape, bool),
+                    )
 
-            # in case the blocks don't fit perfectly
-            # change the block size of the final piece
-            if X == nXBlocks - 1:
-                nXValid = DimensionsCheck[0] - X * myBlockSize[0]
+            # add an array of values for this block to the eval namespace
+            if Alpha not in myAlphaFileLists:
+                local_namespace[Alpha] = myval
+            myval = None
+
+        for lst in myAlphaFileLists:
+            local_namespace[lst] = numpy_arrays[lst]
+
+        # fetch the zones of the block, and where the zones raster covers it
+        myZoneIds = None
+        myZoneCoverage = None
+        if zones_file is not None:
+            band = zones_file.GetRasterBand(zones_band)
+            shared = num_threads > 1 and zones_file is myZones
+            myZoneCoverage = get_buffer(buffers, "zones_coverage", shape, bool)
+            if shared:
+                input_lock.acquire()
+            try:
+                myZoneIds = read_window(
+                    band,
+                    myX + myZonesOffset[0],
+                    myY + myZonesOffset[1],
+                    get_buffer(
+                        buffers,
+                        "zones",
+                        shape,
+                        gdal_array.GDALTypeCodeToNumericTypeCode(band.DataType),
+                    ),
+                    myZoneCoverage,
+                )
+            finally:
+                if shared:
+                    input_lock.release()
+            if myZoneIds is None:
+                raise Exception(f"Zones block reading failed from filename {zones}")
+            if myZoneCoverage.all():
+                myZoneCoverage = None
 
-            # find X offset
-            myX = X * myBlockSize[0]
+        return local_namespace, myNDVs, myZoneIds, myZoneCoverage
 
-            # reset buffer size for start of Y loop
-            nYValid = myBlockSize[1]
-            myBufSize = nXValid * nYValid
+    def calc_block(read_future, bandNo, shape):
+        local_namespace, myNDVs, myZoneIds, myZoneCoverage = read_future.result()
 
-            # loop through Y lines
-            for Y in range(0, nYBlocks):
-                ProgressCt += 1
-                if 10 * ProgressCt / ProgressEnd % 10 != ProgressMk and not quiet:
-                    ProgressMk = 10 * ProgressCt / ProgressEnd % 10
-                    print("%d.." % (10 * ProgressMk), end=" ")
+        # try the calculation on the array blocks
+        calc_index = bandNo - 1 if len(calc) > 1 else 0
+        try:
+            myResult = None
+            if use_numexpr_calc[calc_index]:
+                try:
+                    myResult = numexpr.evaluate(
+                        calc[calc_index],
+                        local_dict=local_namespace,
+                        global_dict=global_namespace,
+                    )
+                except Exception:
+                    # not supported by numexpr, fall back to numpy
+                    use_numexpr_calc[calc_index] = False
+                    if debug:
+                        print(f"using numpy for calculation {calc[calc_index]}")
+            if myResult is None:
+                myResult = eval(
+                    calc_code[calc_index], global_namespace, local_namespace
+                )
+        except Exception:
+            print(f"evaluation of calculation {calc[calc_index]} failed")
+            raise
+
+        if numpy.ndim(myResult) == 0:
+            myResult = numpy.ones(shape) * myResult
+        elif any(numpy.shares_memory(myResult, array) for array in user_arrays):
+            # do not modify an array given by the user
+            myResult = myResult.copy()
+
+        # Propagate nodata values, in place unless the result cannot hold
+        # the nodata value
+        if myNDVs is not None and myOutNDV is not None:
+            dtype = get_nodata_dtype(myResult.dtype, myOutNDV, myOutNumericType)
+            if (
+                dtype != myResult.dtype
+                or myResult.shape != shape
+                or not myResult.flags.writeable
+            ):
+                myResult = numpy.array(numpy.broadcast_to(myResult, shape), dtype=dtype)
+            numpy.copyto(myResult, myOutNDV, casting="unsafe", where=myNDVs)
+
+        # reduce the values written to the output band
+        myReductions = None
+        if reduce:
+            myReductions = BandReductions(statistics, histogram, zones is not None)
+            myValues = to_datatype(
+                numpy.broadcast_to(myResult, shape), myOutNumericType
+            )
+            myValid = get_valid_mask(myValues, myOutBandNDV)
+            myZoneValues = None
+            if myZoneIds is not None:
+                # values in a valid zone
+                myZoneValid = get_valid_mask(myZoneIds, myZonesNDV)
+                # and within the zones raster
+                if myZoneCoverage is not None:
+                    myZoneValid = (
+                        myZoneCoverage
+                        if myZoneValid is None
+                        else myZoneValid & myZoneCoverage
+                    )
+                if myValid is not None:
+                    myZoneValid = (
+                        myValid if myZoneValid is None else myZoneValid & myValid
+                    )
+                if myZoneValid is None:
+                    myZoneIds, myZoneValues = myZoneIds.ravel(), myValues.ravel()
+                else:
+                    myZoneIds = myZoneIds[myZoneValid]
+                    myZoneValues = myValues[myZoneValid]
+            myReductions.add(
+                myValues.ravel() if myValid is None else myValues[myValid],
+                myZoneIds,
+                myZoneValues,
+            )
 
-                # change the block size of the final piece
-                if Y == nYBlocks - 1:
-                    nYValid = DimensionsCheck[1] - Y * myBlockSize[1]
-                    myBufSize = nXValid * nYValid
+        return myResult, myReductions
 
-                # find Y offset
-                myY = Y * myBlockSize[1]
+    def write_block(calc_future, bandNo, myX, myY):
+        myResult, myReductions = calc_future.result()
 
-                # create empty buffer to mark where nodata occurs
-                myNDVs = None
+        if myReductions is not None:
+            band_reductions[bandNo - 1].update(myReductions)
 
-                # make local namespace for calculation
-                local_namespace = {}
+        # write data block to the output file
+        if myOut is not None:
+            myOutB = myOut.GetRasterBand(bandNo)
+            if gdal_array.BandWriteArray(myOutB, myResult, xoff=myX, yoff=myY) != 0:
+                raise Exception("Block writing failed")
+            myOutB = None  # write to band
 
-                # Create destination numpy arrays for each alpha
-                numpy_arrays = {}
-                counter_per_alpha = {}
-                for Alpha in count_file_per_alpha:
-                    dtype = gdal_array.GDALTypeCodeToNumericTypeCode(
-                        largest_datatype_per_alpha[Alpha]
-                    )
-                    if count_file_per_alpha[Alpha] == 1:
-                        numpy_arrays[Alpha] = numpy.empty(
-                            (nYValid, nXValid), dtype=dtype
-                        )
-                    else:
-                        numpy_arrays[Alpha] = numpy.empty(
-                            (count_file_per_alpha[Alpha], nYValid, nXValid), dtype=dtype
-                        )
-                    counter_per_alpha[Alpha] = 0
+    def generate_blocks():
+        ################################################################
+        # start looping through each band in allBandsCount
+        ################################################################
 
-                # fetch data for each input layer
-                for i, Alpha in enumerate(myAlphaList):
+        # the input datasets are not used by this thread anymore once the
+        # first block is being read
+        alpha_counts_per_band = []
+        for bandNo in range(1, allBandsCount + 1):
 
+            count_file_per_alpha = {}
+            largest_datatype_per_alpha = {}
+            for i, Alpha in enumerate(myAlphaList):
+                if Alpha in myAlphaFileLists:
                     # populate lettered arrays with values
                     if allBandsIndex is not None and allBandsIndex == i:
                         myBandNo = bandNo
                     else:
                         myBandNo = myBands[i]
-
-                    if Alpha in myAlphaFileLists:
-                        if count_file_per_alpha[Alpha] == 1:
-                            buf_obj = numpy_arrays[Alpha]
-                        else:
-                            buf_obj = numpy_arrays[Alpha][counter_per_alpha[Alpha]]
-                        myval = gdal_array.BandReadAsArray(
-                            myFiles[i].GetRasterBand(myBandNo),
-                            xoff=myX,
-                            yoff=myY,
-                            win_xsize=nXValid,
-                            win_ysize=nYValid,
-                            buf_obj=buf_obj,
-                        )
-                        counter_per_alpha[Alpha] += 1
+                    band = myFiles[i].GetRasterBand(myBandNo)
+                    if Alpha not in count_file_per_alpha:
+                        count_file_per_alpha[Alpha] = 1
+                        largest_datatype_per_alpha[Alpha] = band.DataType
                     else:
-                        myval = gdal_array.BandReadAsArray(
-                            myFiles[i].GetRasterBand(myBandNo),
-                            xoff=myX,
-                            yoff=myY,
-                            win_xsize=nXValid,
-                            win_ysize=nYValid,
-                        )
-                    if myval is None:
-                        raise Exception(
-                            f"Input block reading failed from filename {filename[i]}"
-                        )
+                        count_file_per_alpha[Alpha] += 1
+                        if hasattr(gdal, "DataTypeUnion"):
+                            largest_datatype_per_alpha[Alpha] = gdal.DataTypeUnion(
+                                largest_datatype_per_alpha[Alpha], band.DataType
+                            )
+            alpha_counts_per_band.append(
+                (bandNo, count_file_per_alpha, largest_datatype_per_alpha)
+            )
 
-                    # fill in nodata values
-                    if myNDV[i] is not None:
-                        # myNDVs is a boolean buffer.
-                        # a cell equals to 1 if there is NDV in any of the corresponding cells in input raster bands.
-                        if myNDVs is None:
-                            # this is the first band that has NDV set. we initializes myNDVs to a zero buffer
-                            # as we didn't see any NDV value yet.
-                            myNDVs = numpy.zeros(myBufSize)
-                            myNDVs.shape = (nYValid, nXValid)
-                        myNDVs = 1 * numpy.logical_or(myNDVs == 1, myval == myNDV[i])
-
-                    # add an array of values for this block to the eval namespace
-                    if Alpha not in myAlphaFileLists:
-                        local_namespace[Alpha] = myval
-                    myval = None
-
-                for lst in myAlphaFileLists:
-                    local_namespace[lst] = numpy_arrays[lst]
-
-                # try the calculation on the array blocks
-                this_calc = calc[bandNo - 1 if len(calc) > 1 else 0]
-                try:
-                    myResult = eval(this_calc, global_namespace, local_namespace)
-                except Exception:
-                    print(f"evaluation of calculation {this_calc} failed")
-                    raise
-
-                # Propagate nodata values (set nodata cells to zero
-                # then add nodata value to these cells).
-                if myNDVs is not None and myOutNDV is not None:
-                    myResult = ((1 * (myNDVs == 0)) * myResult) + (myOutNDV * myNDVs)
-                elif not isinstance(myResult, numpy.ndarray):
-                    myResult = numpy.ones((nYValid, nXValid)) * myResult
-
-                # write data block to the output file
-                myOutB = myOut.GetRasterBand(bandNo)
-                if gdal_array.BandWriteArray(myOutB, myResult, xoff=myX, yoff=myY) != 0:
-                    raise Exception("Block writing failed")
-                myOutB = None  # write to band
+        for (
+            bandNo,
+            count_file_per_alpha,
+            largest_datatype_per_alpha,
+        ) in alpha_counts_per_band:
+
+            ################################################################
+            # start looping through blocks of data
+            ################################################################
+
+            # loop through X-lines
+            for X in range(0, nXBlocks):
+
+                # find X offset, and change the block size of the final piece
+                # in case the blocks don't fit perfectly
+                myX = X * myChunkSize[0]
+                nXValid = min(myChunkSize[0], DimensionsCheck[0] - myX)
+
+                # loop through Y lines
+                for Y in range(0, nYBlocks):
+
+                    # find Y offset, and change the block size of the final piece
+                    myY = Y * myChunkSize[1]
+                    nYValid = min(myChunkSize[1], DimensionsCheck[1] - myY)
+
+                    yield (
+                        bandNo,
+                        count_file_per_alpha,
+                        largest_datatype_per_alpha,
+                        myX,
+                        myY,
+                        nXValid,
+                        nYValid,
+                    )
 
-    # remove temp files
-    for idx, tempFile in enumerate(myTempFileNames):
-        myFiles[idx] = None
-        os.remove(tempFile)
+    def block_done():
+        nonlocal ProgressCt, ProgressMk
+        ProgressCt += 1
+        if 10 * ProgressCt / ProgressEnd % 10 != ProgressMk and not quiet:
+            ProgressMk = 10 * ProgressCt / ProgressEnd % 10
+            print("%d.." % (10 * ProgressMk), end=" ")
+
+    # each stage of a block waits for the result of its previous stage. The
+    # blocks are submitted in order to each stage, so that the threads of a
+    # stage never wait for a block not yet submitted to the previous one.
+    readers = concurrent.futures.ThreadPoolExecutor(num_threads)
+    calculators = concurrent.futures.ThreadPoolExecutor(num_threads)
+    writer = concurrent.futures.ThreadPoolExecutor(1)
+    with readers, calculators, writer:
+        pending = collections.deque()
+        try:
+            for block_index, block in enumerate(generate_blocks()):
+                if len(pending) >= max_pending:
+                    # the oldest block is written before its buffers are reused
+                    pending.popleft()[-1].result()
+                    block_done()
+                (bandNo, _, _, myX, myY, nXValid, nYValid) = block
+                read_future = readers.submit(
+                    read_block, buffer_sets[block_index % max_pending], *block
+                )
+                calc_future = calculators.submit(
+                    calc_block, read_future, bandNo, (nYValid, nXValid)
+                )
+                write_future = writer.submit(write_block, calc_future, bandNo, myX, myY)
+                pending.append((read_future, calc_future, write_future))
+            while pending:
+                pending.popleft()[-1].result()
+                block_done()
+        except BaseException:
+            for futures in pending:
+                for future in futures:
+                    future.cancel()
+            raise
+
+    if myOut is None:
+        if not quiet:
+            print("100 - Done")
+        return band_reductions
+
+    if reduce:
+        for bandNo, myReductions in enumerate(band_reductions, start=1):
+            myReductions.set_to_band(myOut.GetRasterBand(bandNo))
 
     gdal.ErrorReset()
     myOut.FlushCache()
@@ -664,11 +1382,21 @@ def Calc(
     return myOut
 
 
+def print_reductions(result):
+    """Print the reductions returned by Calc when there is no output file"""
+    if isinstance(result, list):
+        for bandNo, reductions in enumerate(result, start=1):
+            print(f"Band {bandNo}:")
+            print(textwrap.indent(str(reductions), "  "))
+
+
 def doit(opts):
     kwargs = vars(opts)
     if "outF" in kwargs:
         kwargs["outfile"] = kwargs.pop("outF")
-    return Calc(**kwargs)
+    result = Calc(**kwargs)
+    print_reductions(result)
+    return result
 
 
 class GDALCalc(GDALScript):
@@ -768,9 +1496,9 @@ class GDALCalc(GDALScript):
         parser.add_argument(
             "--outfile",
             dest="outfile",
-            required=True,
             metavar="filename",
-            help="output file to generate or fill",
+            help="output file to generate or fill. May be omitted when only "
+            "reductions (--stats, --hist, --zones) are requested",
         )
         parser.add_argument(
             "--NoDataValue",
@@ -842,6 +1570,75 @@ class GDALCalc(GDALScript):
             "--color-table", type=str, dest="color_table", help="color table file name"
         )
 
+        parser.add_argument(
+            "--numexpr",
+            dest="use_numexpr",
+            action="store_true",
+            help="evaluate the calculations with numexpr, when they are supported by it",
+        )
+
+        parser.add_argument(
+            "--threads",
+            dest="num_threads",
+            type=str,
+            metavar="{ALL_CPUS|number}",
+            help="number of threads calculating blocks of data in parallel (default 1)",
+        )
+
+        parser.add_argument(
+            "--chunk-size",
+            dest="chunk_size",
+            type=int,
+            nargs=2,
+            metavar=("xsize", "ysize"),
+            help="size in pixels of the chunks of data calculated at once "
+            "(default: grouped blocks of the inputs, within the --chunk-memory limit)",
+        )
+
+        parser.add_argument(
+            "--chunk-memory",
+            dest="chunk_memory",
+            type=float,
+            metavar="MB",
+            help=f"maximum size of the data of a chunk, in MB (default: "
+            f"{DEFAULT_CHUNK_MEMORY}, or less to fit in the GDAL block cache)",
+        )
+
+        parser.add_argument(
+            "--stats",
+            dest="statistics",
+            action="store_true",
+            help="compute the minimum, maximum, mean and standard deviation of each "
+            "output band, while calculating it",
+        )
+
+        parser.add_argument(
+            "--hist",
+            dest="histogram",
+            type=float,
+            nargs=3,
+            metavar=("min", "max", "buckets"),
+            help="compute the histogram of each output band, while calculating it",
+        )
+
+        parser.add_argument(
+            "--zones",
+            dest="zones",
+            type=str,
+            metavar="filename",
+            help="categorical raster of zones, to compute the count and sum of the "
+            "values of each output band in each zone, while calculating it",
+        )
+
+        parser.add_argument(
+            "--zones_band",
+            dest="zones_band",
+            type=int,
+            default=1,
+            metavar="n",
+            help="number of raster band of the zones file (default 1)",
+        )
+
         group = parser.add_mutually_exclusive_group()
         group.add_argument(
             "--extent",
@@ -870,7 +1667,9 @@ class GDALCalc(GDALScript):
         return parser
 
     def doit(self, **kwargs):
-        return Calc(**kwargs)
+        result = Calc(**kwargs)
+        print_reductions(result)
+        return result
 
     def augment_kwargs(self, kwargs) -> dict:
         # create the input_files dict from the alpha arguments ('-a' and '--a_band')
@@ -30,12 +30,16 @@
 # building the stack.
 # anssi.pekkarinen@fao.org
 
+import collections
+import concurrent.futures
+import json
 import math
 import sys
+import threading
 import time
 
-from osgeo import gdal
-from osgeo_utils.auxiliary.util import GetOutputDriverFor
+from osgeo import gdal, ogr
+from osgeo_utils.auxiliary.util import GetOutputDriverFor, get_num_threads
 
 progress = gdal.TermProgress_nocb
 
@@ -58,6 +62,7 @@ def raster_copy(
     t_band_n,
     nodata=None,
     verbose=0,
+    t_lock=None,
 ):
 
     if verbose != 0:
@@ -66,6 +71,10 @@ def raster_copy(
             % (s_xoff, s_yoff, s_xsize, s_ysize, t_xoff, t_yoff, t_xsize, t_ysize)
         )
 
+    # the target is accessed under t_lock, when it is shared between threads
+    if t_lock is None:
+        t_lock = threading.Lock()
+
     if nodata is not None:
         return raster_copy_with_nodata(
             s_fh,
@@ -81,6 +90,7 @@ def raster_copy(
             t_ysize,
             t_band_n,
             nodata,
+            t_lock,
         )
 
     s_band = s_fh.GetRasterBand(s_band_n)
@@ -106,6 +116,7 @@ def raster_copy(
             t_ysize,
             t_band_n,
             m_band,
+            t_lock,
         )
 
     s_band = s_fh.GetRasterBand(s_band_n)
@@ -114,9 +125,10 @@ def raster_copy(
     data = s_band.ReadRaster(
         s_xoff, s_yoff, s_xsize, s_ysize, t_xsize, t_ysize, t_band.DataType
     )
-    t_band.WriteRaster(
-        t_xoff, t_yoff, t_xsize, t_ysize, data, t_xsize, t_ysize, t_band.DataType
-    )
+    with t_lock:
+        t_band.WriteRaster(
+            t_xoff, t_yoff, t_xsize, t_ysize, data, t_xsize, t_ysize, t_band.DataType
+        )
 
     return 0
 
@@ -138,23 +150,29 @@ def raster_copy_with_nodata(
     t_ysize,
     t_band_n,
     nodata,
+    t_lock=None,
 ):
     import numpy as np
 
+    if t_lock is None:
+        t_lock = threading.Lock()
+
     s_band = s_fh.GetRasterBand(s_band_n)
     t_band = t_fh.GetRasterBand(t_band_n)
 
     data_src = s_band.ReadAsArray(s_xoff, s_yoff, s_xsize, s_ysize, t_xsize, t_ysize)
-    data_dst = t_band.ReadAsArray(t_xoff, t_yoff, t_xsize, t_ysize)
 
     if not np.isnan(nodata):
         nodata_test = np.equal(data_src, nodata)
     else:
         nodata_test = np.isnan(data_src)
 
-    to_write = np.choose(nodata_test, (data_src, data_dst))
+    with t_lock:
+        data_dst = t_band.ReadAsArray(t_xoff, t_yoff, t_xsize, t_ysize)
 
-    t_band.WriteArray(to_write, t_xoff, t_yoff)
+        to_write = np.choose(nodata_test, (data_src, data_dst))
+
+        t_band.WriteArray(to_write, t_xoff, t_yoff)
 
     return 0
 
@@ -176,20 +194,27 @@ def raster_copy_with_mask(
     t_ysize,
     t_band_n,
     m_band,
+    t_lock=None,
 ):
     import numpy as np
 
+    if t_lock is None:
+        t_lock = threading.Lock()
+
     s_band = s_fh.GetRasterBand(s_band_n)
     t_band = t_fh.GetRasterBand(t_band_n)
 
     data_src = s_band.ReadAsArray(s_xoff, s_yoff, s_xsize, s_ysize, t_xsize, t_ysize)
     data_mask = m_band.ReadAsArray(s_xoff, s_yoff, s_xsize, s_ysize, t_xsize, t_ysize)
-    data_dst = t_band.ReadAsArray(t_xoff, t_yoff, t_xsize, t_ysize)
 
     mask_test = np.equal(data_mask, 0)
-    to_write = np.choose(mask_test, (data_src, data_dst))
 
-    t_band.WriteArray(to_write, t_xoff, t_yoff)
+    with t_lock:
+        data_dst = t_band.ReadAsArray(t_xoff, t_yoff, t_xsize, t_ysize)
+
+        to_write = np.choose(mask_test, (data_src, data_dst))
+
+        t_band.WriteArray(to_write, t_xoff, t_yoff)
 
     return 0
 
@@ -197,12 +222,66 @@ def raster_copy_with_mask(
 # =============================================================================
 
 
-def names_to_fileinfos(names):
+def raster_read(
+    s_fh,
+    s_xoff,
+    s_yoff,
+    s_xsize,
+    s_ysize,
+    s_band_n,
+    t_xsize,
+    t_ysize,
+    t_type,
+    nodata=None,
+):
+    """
+    Read a window of a source band, as raster_copy() would copy it into a
+    t_xsize x t_ysize window of a target band of type t_type.
+
+    Returns the array of the values, converted to t_type, and the boolean
+    array of the pixels to copy, or None if all of them are to be copied.
+    """
+    import numpy as np
+
+    s_band = s_fh.GetRasterBand(s_band_n)
+    data = s_band.ReadAsArray(
+        s_xoff, s_yoff, s_xsize, s_ysize, t_xsize, t_ysize, buf_type=t_type
+    )
+
+    def read_source():
+        # the values are tested in the data type of the source band
+        if s_band.DataType == t_type:
+            return data
+        return s_band.ReadAsArray(s_xoff, s_yoff, s_xsize, s_ysize, t_xsize, t_ysize)
+
+    if nodata is not None:
+        if not np.isnan(nodata):
+            return data, np.not_equal(read_source(), nodata)
+        return data, np.logical_not(np.isnan(read_source()))
+
+    if s_band.GetMaskFlags() != gdal.GMF_ALL_VALID:
+        m_band = s_band.GetMaskBand()
+        data_mask = m_band.ReadAsArray(
+            s_xoff, s_yoff, s_xsize, s_ysize, t_xsize, t_ysize
+        )
+        return data, np.not_equal(data_mask, 0)
+
+    if s_band.GetColorInterpretation() == gdal.GCI_AlphaBand:
+        return data, np.not_equal(read_source(), 0)
+
+    return data, None
+
+
+def names_to_fileinfos(names, footprints=None):
     """
     Translate a list of GDAL filenames, into file_info objects.
 
     names -- list of valid GDAL dataset names.
 
+    footprints -- optional dictionary of the headers of files, as returned by
+    load_footprints(). The files whose header is in it, and which did not
+    change since, are not opened.
+
     Returns a list of file_info objects.  There may be less file_info objects
     than names if some of the names could not be opened as GDAL files.
     """
@@ -210,12 +289,91 @@ def names_to_fileinfos(names):
     file_infos = []
     for name in names:
         fi = file_info()
-        if fi.init_from_name(name) == 1:
+        if footprints is not None and fi.init_from_dict(name, footprints.get(name)):
             file_infos.append(fi)
+        elif fi.init_from_name(name) == 1:
+            file_infos.append(fi)
+
+    return file_infos
+
+
+def tileindex_to_fileinfos(tileindex, field="location", footprints=None):
+    """
+    Translate the features of a tile index, as created by gdaltindex, into
+    file_info objects.
+
+    tileindex -- name of the vector dataset of the tile index. The footprints
+    of its features are assumed to be in the coordinate system of the files.
+
+    field -- name of the field holding the filenames.
+
+    footprints -- optional dictionary of the headers of files, as returned by
+    load_footprints().
+
+    Returns a list of file_info objects. The files are not opened: the header
+    of the ones not in footprints is only read when it is needed.
+    """
+    ds = ogr.Open(tileindex)
+    if ds is None:
+        return None
+    lyr = ds.GetLayer(0)
+    if lyr.GetLayerDefn().GetFieldIndex(field) < 0:
+        return None
+
+    file_infos = []
+    for feat in lyr:
+        name = feat.GetField(field)
+        geom = feat.GetGeometryRef()
+        if not name or geom is None:
+            continue
+        fi = file_info()
+        if footprints is None or not fi.init_from_dict(name, footprints.get(name)):
+            minx, maxx, miny, maxy = geom.GetEnvelope()
+            fi.init_from_footprint(name, minx, maxy, maxx, miny)
+        file_infos.append(fi)
 
     return file_infos
 
 
+def get_file_stamp(filename):
+    """Return the size and modification time of a file, or None"""
+    stat = gdal.VSIStatL(filename)
+    if stat is None:
+        return None
+    return [stat.size, stat.mtime]
+
+
+def load_footprints(filename):
+    """
+    Load the headers of files saved by save_footprints().
+
+    Returns a dictionary of the headers by filename, empty if filename does
+    not exist or can't be read.
+    """
+    if gdal.VSIStatL(filename) is None:
+        return {}
+    try:
+        with open(filename) as f:
+            return json.load(f)["files"]
+    except (OSError, ValueError, KeyError, TypeError):
+        print("Ignoring invalid footprints file %s." % filename)
+        return {}
+
+
+def save_footprints(filename, file_infos, footprints=None):
+    """
+    Save the headers of the files whose header was read, with the ones of
+    footprints, in a JSON file.
+    """
+    footprints = dict(footprints or {})
+    for fi in file_infos:
+        d = fi.to_dict()
+        if d is not None:
+            footprints[fi.filename] = d
+    with open(filename, "w") as f:
+        json.dump({"files": footprints}, f)
+
+
 # *****************************************************************************
 
 
@@ -235,6 +393,7 @@ class file_info(object):
         self.uly = None
         self.xsize = None
         self.ysize = None
+        self.unreadable = False
 
     def init_from_name(self, filename):
         """
@@ -248,17 +407,29 @@ class file_info(object):
         if fh is None:
             return 0
 
+        return self.init_from_dataset(filename, fh)
+
+    def init_from_dataset(self, filename, fh):
+        """
+        Initialize file_info from an opened dataset
+
+        filename -- Name of the file.
+
+        fh -- gdal.Dataset object of the file.
+
+        Returns 1.
+        """
         self.filename = filename
         self.bands = fh.RasterCount
         self.xsize = fh.RasterXSize
         self.ysize = fh.RasterYSize
         self.band_type = fh.GetRasterBand(1).DataType
         self.projection = fh.GetProjection()
-        self.geotransform = fh.GetGeoTransform()
-        self.ulx = self.geotransform[0]
-        self.uly = self.geotransform[3]
-        self.lrx = self.ulx + self.geotransform[1] * self.xsize
-        self.lry = self.uly + self.geotransform[5] * self.ysize
+        geotransform = fh.GetGeoTransform()
+        self.ulx = geotransform[0]
+        self.uly = geotransform[3]
+        self.lrx = self.ulx + geotransform[1] * self.xsize
+        self.lry = self.uly + geotransform[5] * self.ysize
 
         ct = fh.GetRasterBand(1).GetRasterColorTable()
         if ct is not None:
@@ -266,37 +437,123 @@ class file_info(object):
         else:
             self.ct = None
 
+        # set last, as the header is known to be read once it is set
+        self.geotransform = geotransform
+
+        return 1
+
+    def init_from_footprint(self, filename, ulx, uly, lrx, lry):
+        """
+        Initialize file_info from filename and footprint only, the rest of
+        the header being read by load() when needed.
+        """
+        self.filename = filename
+        self.ulx = ulx
+        self.uly = uly
+        self.lrx = lrx
+        self.lry = lry
+
+    def init_from_dict(self, filename, d):
+        """
+        Initialize file_info from a header returned by to_dict().
+
+        Returns 1 on success or 0 if d is None or filename changed since.
+        """
+        if d is None or d.get("stamp") is None:
+            return 0
+        if get_file_stamp(filename) != d["stamp"]:
+            return 0
+
+        self.filename = filename
+        self.bands = d["bands"]
+        self.xsize = d["xsize"]
+        self.ysize = d["ysize"]
+        self.band_type = d["band_type"]
+        self.projection = d["projection"]
+        geotransform = tuple(d["geotransform"])
+        self.ulx = geotransform[0]
+        self.uly = geotransform[3]
+        self.lrx = self.ulx + geotransform[1] * self.xsize
+        self.lry = self.uly + geotransform[5] * self.ysize
+
+        if d.get("ct") is not None:
+            self.ct = gdal.ColorTable()
+            for i, entry in enumerate(d["ct"]):
+                self.ct.SetColorEntry(i, tuple(entry))
+        else:
+            self.ct = None
+
+        self.geotransform = geotransform
+
         return 1
 
+    def to_dict(self):
+        """
+        Return the header of the file as a dictionary, that can be saved as
+        JSON, or None if it was not read or the file is not a regular file.
+        """
+        if self.geotransform is None:
+            return None
+        stamp = get_file_stamp(self.filename)
+        if stamp is None:
+            return None
+        ct = None
+        if self.ct is not None:
+            ct = [self.ct.GetColorEntry(i) for i in range(self.ct.GetCount())]
+        return {
+            "stamp": stamp,
+            "bands": self.bands,
+            "xsize": self.xsize,
+            "ysize": self.ysize,
+            "band_type": self.band_type,
+            "projection": self.projection,
+            "geotransform": list(self.geotransform),
+            "ct": ct,
+        }
+
+    def load(self, fh=None):
+        """
+        Read the header of the file, if only its footprint is known.
+
+        fh -- optional gdal.Dataset object of the file, if already opened.
+
+        Returns 1 on success or 0 if the file can't be opened.
+        """
+        if self.geotransform is not None:
+            return 1
+        if not self.unreadable:
+            if fh is None:
+                fh = gdal.Open(self.filename)
+            if fh is not None:
+                return self.init_from_dataset(self.filename, fh)
+        self.unreadable = True
+        return 0
+
     def report(self):
         print("Filename: " + self.filename)
         print("File Size: %dx%dx%d" % (self.xsize, self.ysize, self.bands))
         print("Pixel Size: %f x %f" % (self.geotransform[1], self.geotransform[5]))
         print("UL:(%f,%f)   LR:(%f,%f)" % (self.ulx, self.uly, self.lrx, self.lry))
 
-    def copy_into(self, t_fh, s_band=1, t_band=1, nodata_arg=None, verbose=0):
+    def get_copy_windows(self, t_geotransform, t_xsize, t_ysize, t_tile=None):
         """
-        Copy this files image into target file.
+        Compute the windows of this file and of a target file to copy.
 
-        This method will compute the overlap area of the file_info objects
-        file, and the target gdal.Dataset object, and copy the image data
-        for the common window area.  It is assumed that the files are in
-        a compatible projection ... no checking or warping is done.  However,
-        if the destination file is a different resolution, or different
-        image pixel type, the appropriate resampling and conversions will
-        be done (using normal GDAL promotion/demotion rules).
+        t_geotransform, t_xsize, t_ysize -- geotransform and size of the target
+        file, which is assumed to be in a compatible projection.
 
-        t_fh -- gdal.Dataset object for the file into which some or all
-        of this file may be copied.
+        t_tile -- optional (xoff, yoff, xsize, ysize) window of the target file
+        the copy is restricted to. The source window, scaled as the one of the
+        whole copy, is then given in floating point pixel coordinates if the
+        resolutions differ, so that the same pixels are copied.
 
-        Returns 1 on success (or if nothing needs to be copied), and zero one
-        failure.
+        Returns the source and target (xoff, yoff, xsize, ysize) windows, or
+        None if nothing needs to be copied.
         """
-        t_geotransform = t_fh.GetGeoTransform()
         t_ulx = t_geotransform[0]
         t_uly = t_geotransform[3]
-        t_lrx = t_geotransform[0] + t_fh.RasterXSize * t_geotransform[1]
-        t_lry = t_geotransform[3] + t_fh.RasterYSize * t_geotransform[5]
+        t_lrx = t_geotransform[0] + t_xsize * t_geotransform[1]
+        t_lry = t_geotransform[3] + t_ysize * t_geotransform[5]
 
         # figure out intersection region
         tgw_ulx = max(t_ulx, self.ulx)
@@ -310,11 +567,11 @@ class file_info(object):
 
         # do they even intersect?
         if tgw_ulx >= tgw_lrx:
-            return 1
+            return None
         if t_geotransform[5] < 0 and tgw_uly <= tgw_lry:
-            return 1
+            return None
         if t_geotransform[5] > 0 and tgw_uly >= tgw_lry:
-            return 1
+            return None
 
         # compute target window in pixel coordinates.
         tw_xoff = int((tgw_ulx - t_geotransform[0]) / t_geotransform[1] + 0.1)
@@ -327,7 +584,7 @@ class file_info(object):
         )
 
         if tw_xsize < 1 or tw_ysize < 1:
-            return 1
+            return None
 
         # Compute source window in pixel coordinates.
         sw_xoff = int((tgw_ulx - self.geotransform[0]) / self.geotransform[1] + 0.1)
@@ -340,29 +597,381 @@ class file_info(object):
         )
 
         if sw_xsize < 1 or sw_ysize < 1:
+            return None
+
+        if t_tile is None:
+            return (
+                (sw_xoff, sw_yoff, sw_xsize, sw_ysize),
+                (tw_xoff, tw_yoff, tw_xsize, tw_ysize),
+            )
+
+        def clip(s_off, s_size, t_off, t_size, tile_off, tile_size):
+            off = max(t_off, tile_off)
+            size = min(t_off + t_size, tile_off + tile_size) - off
+            if s_size == t_size:
+                return s_off + off - t_off, size, off, size
+            scale = s_size / t_size
+            return s_off + (off - t_off) * scale, size * scale, off, size
+
+        sx_off, sx_size, tx_off, tx_size = clip(
+            sw_xoff, sw_xsize, tw_xoff, tw_xsize, t_tile[0], t_tile[2]
+        )
+        sy_off, sy_size, ty_off, ty_size = clip(
+            sw_yoff, sw_ysize, tw_yoff, tw_ysize, t_tile[1], t_tile[3]
+        )
+        if tx_size < 1 or ty_size < 1:
+            return None
+        return (sx_off, sy_off, sx_size, sy_size), (tx_off, ty_off, tx_size, ty_size)
+
+    def copy_into(self, t_fh, s_band=1, t_band=1, nodata_arg=None, verbose=0):
+        """
+        Copy this files image into target file.
+
+        This method will compute the overlap area of the file_info objects
+        file, and the target gdal.Dataset object, and copy the image data
+        for the common window area.  It is assumed that the files are in
+        a compatible projection ... no checking or warping is done.  However,
+        if the destination file is a different resolution, or different
+        image pixel type, the appropriate resampling and conversions will
+        be done (using normal GDAL promotion/demotion rules).
+
+        t_fh -- gdal.Dataset object for the file into which some or all
+        of this file may be copied.
+
+        Returns 1 on success (or if nothing needs to be copied), and zero one
+        failure.
+        """
+        if self.load() == 0:
+            return 0
+
+        windows = self.get_copy_windows(
+            t_fh.GetGeoTransform(), t_fh.RasterXSize, t_fh.RasterYSize
+        )
+        if windows is None:
             return 1
+        s_window, t_window = windows
 
         # Open the source file, and copy the selected region.
         s_fh = gdal.Open(self.filename)
 
         return raster_copy(
             s_fh,
-            sw_xoff,
-            sw_yoff,
-            sw_xsize,
-            sw_ysize,
+            *s_window,
             s_band,
             t_fh,
-            tw_xoff,
-            tw_yoff,
-            tw_xsize,
-            tw_ysize,
+            *t_window,
             t_band,
             nodata_arg,
             verbose,
         )
 
 
+# =============================================================================
+
+
+# Number of pixels of the tiles the target file is composited by
+TILE_PIXELS = 1024 * 1024
+
+
+def get_tile_size(t_fh, tile_pixels=None):
+    """
+    Return the size of the tiles the target file is composited by: groups of
+    whole blocks of the target file, of about tile_pixels pixels, TILE_PIXELS
+    by default.
+    """
+    if tile_pixels is None:
+        tile_pixels = TILE_PIXELS
+    block_xsize, block_ysize = t_fh.GetRasterBand(1).GetBlockSize()
+    xsize = block_xsize * max(1, int(math.sqrt(tile_pixels)) // block_xsize)
+    xsize = min(xsize, t_fh.RasterXSize)
+    ysize = block_ysize * max(1, tile_pixels // (xsize * block_ysize))
+    ysize = min(ysize, t_fh.RasterYSize)
+    return xsize, ysize
+
+
+class footprint_index(object):
+    """
+    An index of the footprints of files over the grid of tiles of a target
+    file, giving the files intersecting each tile in their order.
+    """
+
+    def __init__(self, file_infos, t_geotransform, t_xsize, t_ysize, tile_size):
+        """
+        file_infos -- list of file_info objects, of which only the footprint
+        is used.
+
+        t_geotransform, t_xsize, t_ysize -- geotransform and size of the
+        target file.
+
+        tile_size -- (xsize, ysize) of the tiles, the last ones of each row
+        and column being possibly smaller.
+        """
+        self.tile_xsize, self.tile_ysize = tile_size
+        self.tiles = collections.defaultdict(list)
+        nb_cols = -(-t_xsize // self.tile_xsize)
+        nb_rows = -(-t_ysize // self.tile_ysize)
+
+        def get_range(coord1, coord2, origin, pixel_size, tile_size, nb_tiles):
+            # one pixel margin, get_copy_windows() having the last word
+            pixel1 = (coord1 - origin) / pixel_size
+            pixel2 = (coord2 - origin) / pixel_size
+            first = int(math.floor((min(pixel1, pixel2) - 1) / tile_size))
+            last = int(math.floor((max(pixel1, pixel2) + 1) / tile_size))
+            return range(max(first, 0), min(last, nb_tiles - 1) + 1)
+
+        for i, fi in enumerate(file_infos):
+            cols = get_range(
+                fi.ulx,
+                fi.lrx,
+                t_geotransform[0],
+                t_geotransform[1],
+                self.tile_xsize,
+                nb_cols,
+            )
+            rows = get_range(
+                fi.uly,
+                fi.lry,
+                t_geotransform[3],
+                t_geotransform[5],
+                self.tile_ysize,
+                nb_rows,
+            )
+            for row in rows:
+                for col in cols:
+                    self.tiles[(col, row)].append(i)
+
+    def get_files(self, tile):
+        """
+        Return the indices, in order, of the files whose footprint may
+        intersect a (xoff, yoff, xsize, ysize) tile.
+        """
+        return self.tiles.get(
+            (tile[0] // self.tile_xsize, tile[1] // self.tile_ysize), []
+        )
+
+
+def merge_tiles(
+    file_infos,
+    band_maps,
+    t_fh,
+    nodata=None,
+    verbose=0,
+    num_threads=1,
+    callback=None,
+    max_open_files=64,
+    init_values=None,
+    read_target=False,
+):
+    """
+    Copy files into a target file, tile by tile of the target file.
+
+    Each tile is composited from the files intersecting it, in order, by one
+    of num_threads threads, so that the memory used only depends on the size
+    of the tiles. Each thread reads the files through its own datasets, and
+    keeps up to max_open_files of them open. The files intersecting each tile
+    are found from their footprints, and only the ones intersecting the
+    target file are opened.
+
+    When numpy is available, each tile is composited in memory, and each
+    band of it written once, without reading the target file again.
+    Otherwise, the files are copied one after the other into the target file.
+
+    file_infos -- list of file_info objects of the files to copy.
+
+    band_maps -- for each file, list of the (source band, target band) to copy.
+
+    t_fh -- gdal.Dataset object of the target file.
+
+    callback -- optional function called with the ratio of tiles done.
+
+    init_values -- optional list of the values, for each target band, every
+    tile is initialized with. Otherwise, the tiles are initialized with the
+    nodata value of the target bands, or 0.
+
+    read_target -- whether the tiles are initialized from the target file
+    instead, to update it.
+    """
+    t_geotransform = t_fh.GetGeoTransform()
+    t_xsize = t_fh.RasterXSize
+    t_ysize = t_fh.RasterYSize
+    tile_xsize, tile_ysize = get_tile_size(t_fh)
+    tiles = [
+        (xoff, yoff, min(tile_xsize, t_xsize - xoff), min(tile_ysize, t_ysize - yoff))
+        for yoff in range(0, t_ysize, tile_ysize)
+        for xoff in range(0, t_xsize, tile_xsize)
+    ]
+    index = footprint_index(
+        file_infos, t_geotransform, t_xsize, t_ysize, (tile_xsize, tile_ysize)
+    )
+
+    try:
+        import numpy as np
+
+        from osgeo import gdal_array
+    except ImportError:
+        np = gdal_array = None
+
+    t_bands = range(1, t_fh.RasterCount + 1)
+    t_types = {}
+    t_initial_values = {}
+    for t_band in t_bands:
+        t_types[t_band] = t_fh.GetRasterBand(t_band).DataType
+        if init_values is not None:
+            t_initial_values[t_band] = init_values[t_band - 1]
+        else:
+            t_initial_values[t_band] = t_fh.GetRasterBand(t_band).GetNoDataValue()
+
+    if gdal_array is None and init_values is not None:
+        for t_band in t_bands:
+            t_fh.GetRasterBand(t_band).Fill(init_values[t_band - 1])
+
+    t_lock = threading.Lock()
+    thread_local = threading.local()
+
+    def open_file(fi):
+        datasets = thread_local.__dict__.setdefault(
+            "datasets", collections.OrderedDict()
+        )
+        s_fh = datasets.pop(fi.filename, None)
+        if s_fh is None:
+            s_fh = gdal.Open(fi.filename)
+            if len(datasets) >= max_open_files:
+                datasets.popitem(last=False)
+        datasets[fi.filename] = s_fh
+        return s_fh
+
+    def get_tile_files(tile):
+        # yield the files intersecting a tile, opened, with their windows
+        for i in index.get_files(tile):
+            fi = file_infos[i]
+            s_fh = None
+            # files only known by their footprint are read when first needed
+            if fi.geotransform is None:
+                s_fh = open_file(fi)
+                if fi.load(s_fh) == 0:
+                    continue
+            windows = fi.get_copy_windows(t_geotransform, t_xsize, t_ysize, tile)
+            if windows is None:
+                continue
+            if s_fh is None:
+                s_fh = open_file(fi)
+            yield (s_fh,) + windows + (band_maps[i],)
+
+    def new_tile_array(t_band, tile):
+        dtype = gdal_array.GDALTypeCodeToNumericTypeCode(t_types[t_band])
+        value = t_initial_values[t_band]
+        array = np.zeros((tile[3], tile[2]), dtype)
+        if value is None:
+            return array
+        # converted as GDAL would, rounding and clamping integer values
+        if np.issubdtype(dtype, np.integer):
+            if np.isnan(value):
+                return array
+            info = np.iinfo(dtype)
+            value = min(max(math.floor(value + 0.5), info.min), info.max)
+        array.fill(value)
+        return array
+
+    def composite_tile(tile):
+        arrays = {}
+
+        def get_tile_array(t_band):
+            array = arrays.get(t_band)
+            if array is None:
+                if read_target:
+                    with t_lock:
+                        array = t_fh.GetRasterBand(t_band).ReadAsArray(*tile)
+                else:
+                    array = new_tile_array(t_band, tile)
+                arrays[t_band] = array
+            return array
+
+        # the whole target is initialized, even where there are no files
+        if init_values is not None:
+            for t_band in t_bands:
+                get_tile_array(t_band)
+
+        for s_fh, s_window, t_window, band_map in get_tile_files(tile):
+            t_xoff, t_yoff, t_xsize_w, t_ysize_w = t_window
+            for s_band, t_band in band_map:
+                if verbose != 0:
+                    print(
+                        "Copy %d,%d,%d,%d to %d,%d,%d,%d."
+                        % (tuple(s_window) + tuple(t_window))
+                    )
+                data, valid = raster_read(
+                    s_fh,
+                    *s_window,
+                    s_band,
+                    t_xsize_w,
+                    t_ysize_w,
+                    t_types[t_band],
+                    nodata,
+                )
+                t_data = get_tile_array(t_band)[
+                    t_yoff - tile[1] : t_yoff - tile[1] + t_ysize_w,
+                    t_xoff - tile[0] : t_xoff - tile[0] + t_xsize_w,
+                ]
+                if valid is None:
+                    t_data[...] = data
+                else:
+                    np.copyto(t_data, data, where=valid)
+
+        # each band of the tile is written once, when composited
+        for t_band, array in arrays.items():
+            with t_lock:
+                t_fh.GetRasterBand(t_band).WriteArray(array, tile[0], tile[1])
+
+    def merge_tile(tile):
+        if gdal_array is not None:
+            return composite_tile(tile)
+
+        for s_fh, s_window, t_window, band_map in get_tile_files(tile):
+            for s_band, t_band in band_map:
+                raster_copy(
+                    s_fh,
+                    *s_window,
+                    s_band,
+                    t_fh,
+                    *t_window,
+                    t_band,
+                    nodata,
+                    verbose,
+                    t_lock,
+                )
+
+    def tile_done(nb_done):
+        if callback is not None:
+            callback(nb_done / len(tiles))
+
+    if num_threads == 1:
+        for nb_done, tile in enumerate(tiles, start=1):
+            merge_tile(tile)
+            tile_done(nb_done)
+        thread_local.__dict__.pop("datasets", None)
+        return
+
+    # tiles are independent, and composited in any order by the threads,
+    # with a bounded number of them queued
+    nb_done = 0
+    with concurrent.futures.ThreadPoolExecutor(num_threads) as executor:
+        futures = set()
+        for tile in tiles:
+            if len(futures) >= 2 * num_threads:
+                done, futures = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    future.result()
+                    nb_done += 1
+                    tile_done(nb_done)
+            futures.add(executor.submit(merge_tile, tile))
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
+            nb_done += 1
+            tile_done(nb_done)
+
+
 # =============================================================================
 def Usage():
     print("Usage: gdal_merge.py [-o out_filename] [-of out_format] [-co NAME=VALUE]*")
@@ -371,7 +980,11 @@ def Usage():
     )
     print('                     [-ul_lr ulx uly lrx lry] [-init "value [value...]"]')
     print("                     [-n nodata_value] [-a_nodata output_nodata_value]")
-    print("                     [-ot datatype] [-createonly] input_files")
+    print(
+        "                     [-ot datatype] [-createonly] [-threads {ALL_CPUS|number}]"
+    )
+    print("                     [-tileindex filename [-tileindex_field field_name]]")
+    print("                     [-footprints filename] input_files")
     print("                     [--help-general]")
     print("")
     return 2
@@ -394,6 +1007,10 @@ def gdal_merge(argv=None):
     pre_init = []
     band_type = None
     createonly = 0
+    num_threads = 1
+    tileindex = None
+    tileindex_field = "location"
+    footprints_file = None
     bTargetAlignedPixels = False
     start_time = time.time()
 
@@ -467,6 +1084,26 @@ def gdal_merge(argv=None):
         elif arg == "-tap":
             bTargetAlignedPixels = True
 
+        elif arg == "-threads":
+            i = i + 1
+            try:
+                num_threads = get_num_threads(argv[i])
+            except Exception:
+                print("Invalid number of threads: %s" % argv[i])
+                return 1
+
+        elif arg == "-tileindex":
+            i = i + 1
+            tileindex = argv[i]
+
+        elif arg == "-tileindex_field":
+            i = i + 1
+            tileindex_field = argv[i]
+
+        elif arg == "-footprints":
+            i = i + 1
+            footprints_file = argv[i]
+
         elif arg == "-ul_lr":
             ulx = float(argv[i + 1])
             uly = float(argv[i + 2])
@@ -483,7 +1120,7 @@ def gdal_merge(argv=None):
 
         i = i + 1
 
-    if not names:
+    if not names and tileindex is None:
         print("No input files selected.")
         return Usage()
 
@@ -504,7 +1141,32 @@ def gdal_merge(argv=None):
         return 1
 
     # Collect information on all the source files.
-    file_infos = names_to_fileinfos(names)
+    footprints = None
+    if footprints_file is not None:
+        footprints = load_footprints(footprints_file)
+
+    file_infos = names_to_fileinfos(names, footprints)
+
+    if tileindex is not None:
+        tileindex_infos = tileindex_to_fileinfos(tileindex, tileindex_field, footprints)
+        if tileindex_infos is None:
+            print(
+                "Cannot read the %s field of the tile index %s."
+                % (tileindex_field, tileindex)
+            )
+            return 1
+        file_infos += tileindex_infos
+
+    # The headers of the files only known by their footprint are read when
+    # needed, except for the first file, and all of them with -separate.
+    if separate != 0:
+        file_infos = [fi for fi in file_infos if fi.load() == 1]
+    while file_infos and file_infos[0].load() == 0:
+        del file_infos[0]
+
+    if not file_infos:
+        print("No input files could be opened.")
+        return 1
 
     if ulx is None:
         ulx = file_infos[0].ulx
@@ -529,6 +1191,7 @@ def gdal_merge(argv=None):
     gdal.PushErrorHandler("CPLQuietErrorHandler")
     t_fh = gdal.Open(out_file, gdal.GA_Update)
     gdal.PopErrorHandler()
+    read_target = t_fh is not None
 
     # Create output file if it does not already exist.
     if t_fh is None:
@@ -581,49 +1244,70 @@ def gdal_merge(argv=None):
             t_fh.GetRasterBand(i + 1).SetNoDataValue(a_nodata)
 
     # Do we need to pre-initialize the whole mosaic file to some value?
+    # This is done while compositing it, unless -createonly is used.
+    init_values = None
     if pre_init is not None:
         if t_fh.RasterCount <= len(pre_init):
-            for i in range(t_fh.RasterCount):
-                t_fh.GetRasterBand(i + 1).Fill(pre_init[i])
+            init_values = pre_init[: t_fh.RasterCount]
         elif len(pre_init) == 1:
-            for i in range(t_fh.RasterCount):
-                t_fh.GetRasterBand(i + 1).Fill(pre_init[0])
+            init_values = pre_init * t_fh.RasterCount
+    if init_values is not None:
+        read_target = False
 
     # Copy data from source files into output file.
-    t_band = 1
-
-    if quiet == 0 and verbose == 0:
-        progress(0.0)
-    fi_processed = 0
+    if createonly != 0:
+        if init_values is not None:
+            for i in range(t_fh.RasterCount):
+                t_fh.GetRasterBand(i + 1).Fill(init_values[i])
+        t_fh = None
+        if footprints_file is not None:
+            save_footprints(footprints_file, file_infos, footprints)
+        return 0
 
+    band_maps = []
+    t_band = 1
     for fi in file_infos:
-        if createonly != 0:
-            continue
+        if separate == 0:
+            band_maps.append([(band, band) for band in range(1, bands + 1)])
+        else:
+            band_maps.append(
+                [(band, t_band + band - 1) for band in range(1, fi.bands + 1)]
+            )
+            t_band = t_band + fi.bands
 
-        if verbose != 0:
+    if verbose != 0:
+        for fi_processed, fi in enumerate(file_infos):
             print("")
-            print(
-                "Processing file %5d of %5d, %6.3f%% completed in %d minutes."
-                % (
-                    fi_processed + 1,
-                    len(file_infos),
-                    fi_processed * 100.0 / len(file_infos),
-                    int(round((time.time() - start_time) / 60.0)),
-                )
-            )
-            fi.report()
+            print("Processing file %5d of %5d." % (fi_processed + 1, len(file_infos)))
+            if fi.load() == 1:
+                fi.report()
 
-        if separate == 0:
-            for band in range(1, bands + 1):
-                fi.copy_into(t_fh, band, band, nodata, verbose)
-        else:
-            for band in range(1, fi.bands + 1):
-                fi.copy_into(t_fh, band, t_band, nodata, verbose)
-                t_band = t_band + 1
+    if quiet == 0 and verbose == 0:
+        progress(0.0)
+        callback = progress
+    else:
+        callback = None
+
+    merge_tiles(
+        file_infos,
+        band_maps,
+        t_fh,
+        nodata,
+        verbose,
+        num_threads,
+        callback,
+        init_values=init_values,
+        read_target=read_target,
+    )
+
+    if footprints_file is not None:
+        save_footprints(footprints_file, file_infos, footprints)
 
-        fi_processed = fi_processed + 1
-        if quiet == 0 and verbose == 0:
-            progress(fi_processed / float(len(file_infos)))
+    if verbose != 0:
+        print(
+            "Processed %d files in %d minutes."
+            % (len(file_infos), int(round((time.time() - start_time) / 60.0)))
+        )
 
     # Force file to be closed.
     t_fh = None
@@ -30,9 +30,13 @@
 ###############################################################################
 from __future__ import print_function
 
+import collections
+import multiprocessing
+import multiprocessing.pool
 import os
 import shutil
 import sys
+import threading
 
 from osgeo import gdal, ogr, osr
 
@@ -71,33 +75,52 @@ class AffineTransformDecorator(object):
 
 
 class DataSetCache(object):
-    """A class for caching source tiles"""
+    """A class for caching source tiles, closing the least recently used ones"""
 
-    def __init__(self):
-        self.cacheSize = 8
-        self.queue = []
-        self.dict = {}
+    def __init__(self, cacheSize=64, cacheBytes=None):
+        """
+        cacheSize -- maximum number of open datasets.
+
+        cacheBytes -- optional maximum total uncompressed size of the open
+        datasets, the last opened one being kept open whatever its size.
+        """
+        self.cacheSize = cacheSize
+        self.cacheBytes = cacheBytes
+        self.dict = collections.OrderedDict()
+        self.sizes = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
 
     def get(self, name):
 
         if name in self.dict:
+            self.hits += 1
+            self.dict.move_to_end(name)
             return self.dict[name]
+        self.misses += 1
         result = gdal.Open(name)
         if result is None:
-            print("Error opening: %s" % NameError)
+            print("Error opening: %s" % name)
             return 1
-        if len(self.queue) == self.cacheSize:
-            toRemove = self.queue.pop(0)
-            del self.dict[toRemove]
-        self.queue.append(name)
+        size = result.RasterXSize * result.RasterYSize * result.RasterCount
+        if result.RasterCount > 0:
+            size *= gdal.GetDataTypeSize(result.GetRasterBand(1).DataType) // 8
+        while self.dict and (
+            len(self.dict) >= self.cacheSize
+            or (self.cacheBytes is not None and self.bytes + size > self.cacheBytes)
+        ):
+            toRemove, _ = self.dict.popitem(last=False)
+            self.bytes -= self.sizes.pop(toRemove)
         self.dict[name] = result
+        self.sizes[name] = size
+        self.bytes += size
         return result
 
     def __del__(self):
-        for dataset in self.dict.values():
-            del dataset
-        del self.queue
+        self.dict.clear()
         del self.dict
+        del self.sizes
 
 
 class tile_info(object):
@@ -132,16 +155,19 @@ class tile_info(object):
 class mosaic_info(object):
     """A class holding information about a GDAL file or a GDAL fileset"""
 
-    def __init__(self, filename, inputDS):
+    def __init__(self, filename, inputDS, cacheSize=64, cacheBytes=None):
         """
         Initialize mosaic_info from filename
 
         filename -- Name of file to read.
 
+        cacheSize, cacheBytes -- capacity of the cache of the source tiles,
+        see DataSetCache.
+
         """
         self.TempDriver = gdal.GetDriverByName("MEM")
         self.filename = filename
-        self.cache = DataSetCache()
+        self.cache = DataSetCache(cacheSize, cacheBytes)
         self.ogrTileIndexDS = inputDS
 
         self.ogrTileIndexDS.GetLayer().ResetReading()
@@ -318,6 +344,251 @@ class mosaic_info(object):
         print("UL:(%f,%f)   LR:(%f,%f)" % (self.ulx, self.uly, self.lrx, self.lry))
 
 
+class level_buffer(object):
+    """
+    A class holding in memory the rows of a level of the pyramid as its tiles
+    are created, and creating the tiles of the next level from them as soon
+    as the rows these tiles cover are complete.
+
+    It stands for the mosaic_info of the level below in createPyramidTile().
+    """
+
+    def __init__(self, g, level, xsize, ysize, ulx, uly, scaleX, scaleY, filename):
+        """
+        Initialize level_buffer for the tiles of level
+
+        xsize, ysize, ulx, uly, scaleX, scaleY -- size and georeferencing of
+        the level below.
+
+        filename -- Name of the mosaic, the tiles are named after.
+
+        """
+        self.g = g
+        self.TempDriver = gdal.GetDriverByName("MEM")
+        self.level = level
+        self.filename = filename
+        self.xsize = xsize
+        self.ysize = ysize
+        self.ulx = ulx
+        self.uly = uly
+        self.scaleX = scaleX
+        self.scaleY = scaleY
+
+        # set from the first tile of the level below
+        self.bands = None
+        self.band_type = None
+        self.projection = None
+        self.nodata = None
+        self.ct = None
+        self.ci = None
+
+        self.ti = tile_info(
+            int(xsize / 2), int(ysize / 2), g.TileWidth, g.TileHeight, g.Overlap
+        )
+        self.OGRDS = createTileIndex(
+            g.Verbose,
+            "TileResult_" + str(level),
+            g.TileIndexFieldName,
+            g.Source_SRS,
+            g.TileIndexDriverTyp,
+        )
+
+        # (offsetY, dataset) of the complete strips of full rows of the level
+        # below still covered by the next rows of tiles, and the strip being
+        # filled
+        self.strips = []
+        self.strip = None
+        self.stripOffsetY = None
+        self.rowsDone = 0
+        self.yIndex = 1
+        self.lastRowIndx = -1
+
+        self.nextLevel = None
+        if level < g.Levels:
+            self.nextLevel = level_buffer(
+                g,
+                level + 1,
+                self.ti.width,
+                self.ti.height,
+                ulx,
+                uly,
+                scaleX * 2,
+                scaleY * 2,
+                filename,
+            )
+
+    def addTile(self, offsetX, offsetY, fh):
+        """
+        Copy the tile fh of the level below at offsetX, offsetY
+
+        The tiles of a row must all be added before the tiles of the next row.
+        """
+        if self.bands is None:
+            self.bands = fh.RasterCount
+            self.band_type = fh.GetRasterBand(1).DataType
+            self.projection = fh.GetProjection()
+            self.nodata = fh.GetRasterBand(1).GetNoDataValue()
+            ct = fh.GetRasterBand(1).GetRasterColorTable()
+            if ct is not None:
+                self.ct = ct.Clone()
+            self.ci = [0] * self.bands
+            for iband in range(self.bands):
+                self.ci[iband] = fh.GetRasterBand(
+                    iband + 1
+                ).GetRasterColorInterpretation()
+
+        if self.strip is not None and self.stripOffsetY != offsetY:
+            self.endStrip()
+        if self.strip is None:
+            self.strip = self.TempDriver.Create(
+                "", self.xsize, fh.RasterYSize, self.bands, self.band_type
+            )
+            self.stripOffsetY = offsetY
+            if self.nodata is not None:
+                for bandNr in range(1, self.bands + 1):
+                    self.strip.GetRasterBand(bandNr).Fill(self.nodata)
+
+        for bandNr in range(1, self.bands + 1):
+            data = fh.GetRasterBand(bandNr).ReadRaster(
+                0,
+                0,
+                fh.RasterXSize,
+                fh.RasterYSize,
+                fh.RasterXSize,
+                fh.RasterYSize,
+                self.band_type,
+            )
+            self.strip.GetRasterBand(bandNr).WriteRaster(
+                offsetX, 0, fh.RasterXSize, fh.RasterYSize, data
+            )
+
+    def endStrip(self):
+        """The strip being filled is complete: create the tiles it completes"""
+        self.strips.append((self.stripOffsetY, self.strip))
+        self.rowsDone = max(self.rowsDone, self.stripOffsetY + self.strip.RasterYSize)
+        self.strip = None
+        self.createTiles()
+
+    def finish(self):
+        """
+        The level below is complete: create the remaining tiles and save the
+        tile index, then finish the next level
+        """
+        if self.strip is not None:
+            self.endStrip()
+        self.rowsDone = self.ysize
+        self.createTiles()
+        self.strips = []
+
+        copyLevelTileIndex(self.g, self.OGRDS, self.level)
+
+        if self.nextLevel is not None:
+            self.nextLevel.finish()
+
+    def createTiles(self):
+        """Create the rows of tiles whose rows of the level below are complete"""
+        g = self.g
+        ti = self.ti
+        while self.yIndex <= ti.countTilesY:
+            offsetY = (self.yIndex - 1) * (ti.tileHeight - ti.overlap)
+            height = ti.tileHeight
+            if offsetY + height > ti.height:
+                height = ti.height - offsetY
+            if 2 * (offsetY + height) > self.rowsDone:
+                break
+
+            # the rows of the levels are created alternately
+            g.LastRowIndx = self.lastRowIndx
+            for xIndex in range(1, ti.countTilesX + 1):
+                offsetX = (xIndex - 1) * (ti.tileWidth - ti.overlap)
+                width = ti.tileWidth
+                if offsetX + width > ti.width:
+                    width = ti.width - offsetX
+
+                tilename = getTileName(g, self, ti, xIndex, self.yIndex, self.level)
+
+                if g.Resume and os.path.exists(tilename):
+                    createPyramidTile(
+                        g,
+                        self,
+                        offsetX,
+                        offsetY,
+                        width,
+                        height,
+                        tilename,
+                        self.OGRDS,
+                        True,
+                    )
+                    if self.nextLevel is not None:
+                        self.nextLevel.addTile(offsetX, offsetY, gdal.Open(tilename))
+                else:
+                    createPyramidTile(
+                        g,
+                        self,
+                        offsetX,
+                        offsetY,
+                        width,
+                        height,
+                        tilename,
+                        self.OGRDS,
+                        False,
+                        self.nextLevel,
+                    )
+            self.lastRowIndx = g.LastRowIndx
+            self.yIndex += 1
+
+            # release the strips above the next row of tiles
+            nextOffsetY = 2 * (self.yIndex - 1) * (ti.tileHeight - ti.overlap)
+            self.strips = [
+                (stripOffsetY, strip)
+                for stripOffsetY, strip in self.strips
+                if stripOffsetY + strip.RasterYSize > nextOffsetY
+            ]
+
+    def getDataSet(self, minx, miny, maxx, maxy):
+
+        resultSizeX = int((maxx - minx) / self.scaleX + 0.5)
+        resultSizeY = int((miny - maxy) / self.scaleY + 0.5)
+        xoff = int((minx - self.ulx) / self.scaleX + 0.5)
+        yoff = int((maxy - self.uly) / self.scaleY + 0.5)
+
+        resultDS = self.TempDriver.Create(
+            "TEMP", resultSizeX, resultSizeY, self.bands, self.band_type, []
+        )
+        resultDS.SetGeoTransform([minx, self.scaleX, 0, maxy, 0, self.scaleY])
+
+        for bandNr in range(1, self.bands + 1):
+            t_band = resultDS.GetRasterBand(bandNr)
+            if self.nodata is not None:
+                t_band.Fill(self.nodata)
+                t_band.SetNoDataValue(self.nodata)
+            if self.ct is not None:
+                t_band.SetRasterColorTable(self.ct)
+            t_band.SetRasterColorInterpretation(self.ci[bandNr - 1])
+
+        xsize = min(resultSizeX, self.xsize - xoff)
+        for stripOffsetY, strip in self.strips:
+            sw_yoff = max(yoff, stripOffsetY)
+            sw_ysize = (
+                min(yoff + resultSizeY, stripOffsetY + strip.RasterYSize) - sw_yoff
+            )
+            if sw_ysize <= 0 or xsize <= 0:
+                continue
+
+            for bandNr in range(1, self.bands + 1):
+                data = strip.GetRasterBand(bandNr).ReadRaster(
+                    xoff, sw_yoff - stripOffsetY, xsize, sw_ysize
+                )
+                resultDS.GetRasterBand(bandNr).WriteRaster(
+                    0, sw_yoff - yoff, xsize, sw_ysize, data
+                )
+
+        return resultDS
+
+    def closeDataSet(self, memDS):
+        del memDS
+
+
 def getTileIndexFromFiles(g):
     if g.Verbose:
         print("Building internal Index for %d tile(s) ..." % len(g.Names), end=" ")
@@ -351,11 +622,164 @@ def getTargetDir(g, level=-1):
     return g.TargetDir + str(level) + os.sep
 
 
-def tileImage(g, minfo, ti):
+def getTileIndexFeatures(ogrTileIndexDS):
+    """
+    Return the location and envelope of the features of a tile index
+    """
+    features = []
+    ogrTileIndexDS.GetLayer().ResetReading()
+    while True:
+        feature = ogrTileIndexDS.GetLayer().GetNextFeature()
+        if feature is None:
+            break
+        features.append((feature.GetField(0), feature.GetGeometryRef().GetEnvelope()))
+    ogrTileIndexDS.GetLayer().ResetReading()
+    return features
+
+
+# the globals and mosaic of the worker processes or threads
+workerLocal = threading.local()
+
+
+def initWorker(g, srsWkt, useMemDriver, cacheMax, filename, features):
+    """
+    Initialize a worker process or thread, with its own copy of the
+    globals and its own mosaic, dataset cache and tile index
+    """
+    if cacheMax is not None:
+        gdal.SetCacheMax(cacheMax)
+    g.Driver = gdal.GetDriverByName(g.Format)
+    if useMemDriver:
+        g.MemDriver = gdal.GetDriverByName("MEM")
+    if srsWkt is not None:
+        g.Source_SRS = osr.SpatialReference()
+        g.Source_SRS.ImportFromWkt(srsWkt)
+
+    ogrTileIndexDS = createTileIndex(
+        False, "TileIndex", g.TileIndexFieldName, None, g.TileIndexDriverTyp
+    )
+    for location, (minx, maxx, miny, maxy) in features:
+        addFeature(
+            g.TileIndexFieldName,
+            ogrTileIndexDS,
+            location,
+            [minx, maxx, maxx, minx],
+            [maxy, maxy, miny, miny],
+        )
+
+    workerLocal.g = g
+    workerLocal.minfo = mosaic_info(filename, ogrTileIndexDS, g.CacheSize, g.CacheBytes)
+
+
+def runWorkerTask(task):
+    """
+    Run createTile() or createPyramidTile() in a worker, the feature of the
+    tile being added to the tile index by the main process
+
+    Returns the hits and misses of the dataset cache of the worker
+    """
+    func, args = task
+    cache = workerLocal.minfo.cache
+    hits, misses = cache.hits, cache.misses
+    func(workerLocal.g, workerLocal.minfo, *args, None, False)
+    return cache.hits - hits, cache.misses - misses
+
+
+def createWorkerPool(g, minfo):
+    """
+    Return a pool of g.Processes processes or g.Threads threads, creating
+    tiles of the mosaic minfo, or None if tiles are created serially
+    """
+    if g.Processes <= 1 and g.Threads <= 1:
+        return None
+
+    # GDAL objects can't be sent to processes: they are created again
+    workerGlobals = RetileGlobals()
+    for name in RetileGlobals.__slots__:
+        setattr(workerGlobals, name, getattr(g, name))
+    workerGlobals.Driver = None
+    workerGlobals.MemDriver = None
+    workerGlobals.Source_SRS = None
+    srsWkt = None
+    if g.Source_SRS is not None:
+        srsWkt = g.Source_SRS.ExportToWkt()
+
+    if g.Processes > 1:
+        # the processes share the GDAL block cache size
+        cacheMax = max(1024 * 1024, gdal.GetCacheMax() // g.Processes)
+    else:
+        cacheMax = None
+
+    initargs = (
+        workerGlobals,
+        srsWkt,
+        g.MemDriver is not None,
+        cacheMax,
+        minfo.filename,
+        getTileIndexFeatures(minfo.ogrTileIndexDS),
+    )
+    if g.Processes > 1:
+        # See gdal2tiles.py: needed by the spawn start method when run as script
+        import __main__
+
+        if not hasattr(__main__, "__spec__"):
+            __main__.__spec__ = None
+        return multiprocessing.Pool(g.Processes, initWorker, initargs)
+    return multiprocessing.pool.ThreadPool(g.Threads, initWorker, initargs)
+
+
+def runTileTasks(g, minfo, tasks, callback=None, nextLevel=None):
+    """
+    Create the tiles of the mosaic minfo, serially or in g.Processes
+    processes or g.Threads threads, calling callback as each one is done.
+
+    tasks -- list of (yIndex, xIndex, createTile or createPyramidTile,
+    (offsetX, offsetY, width, height, tilename)).
+
+    nextLevel -- level_buffer the tiles are added to, when created serially.
+
+    The rows of tiles are created alternately from left to right and from
+    right to left, so that consecutive tiles overlap the same source tiles,
+    which are still in the dataset cache.
+    """
+    tasks = sorted(
+        tasks, key=lambda task: (task[0], task[1] if task[0] % 2 else -task[1])
+    )
+    tasks = [(func, args) for _, _, func, args in tasks]
+
+    hits = 0
+    misses = 0
+    pool = createWorkerPool(g, minfo)
+    if pool is None:
+        hits, misses = minfo.cache.hits, minfo.cache.misses
+        for func, args in tasks:
+            func(g, minfo, *args, None, False, nextLevel)
+            if callback is not None:
+                callback()
+        hits, misses = minfo.cache.hits - hits, minfo.cache.misses - misses
+    else:
+        try:
+            for taskHits, taskMisses in pool.imap_unordered(runWorkerTask, tasks):
+                hits += taskHits
+                misses += taskMisses
+                if callback is not None:
+                    callback()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    if g.Verbose:
+        print("Dataset cache: %d hits, %d misses" % (hits, misses))
+
+
+def tileImage(g, minfo, ti, nextLevel=None):
     """
 
     Tile image in mosaicinfo minfo  based on tileinfo ti
 
+    nextLevel -- level_buffer the tiles are added to, to create the first
+    level of the pyramid from.
+
     returns list of created tiles
 
     """
@@ -377,6 +801,14 @@ def tileImage(g, minfo, ti):
         processed = 0
         total = len(xRange) * len(yRange)
 
+    def tileDone():
+        nonlocal processed
+        if not g.Quiet and not g.Verbose:
+            processed += 1
+            progress(processed / float(total))
+
+    tasks = []
+
     for yIndex in yRange:
         for xIndex in xRange:
             offsetY = (yIndex - 1) * (ti.tileHeight - ti.overlap)
@@ -393,14 +825,32 @@ def tileImage(g, minfo, ti):
             if offsetY + height > ti.height:
                 height = ti.height - offsetY
 
-            feature_only = g.Resume and os.path.exists(tilename)
-            createTile(
-                g, minfo, offsetX, offsetY, width, height, tilename, OGRDS, feature_only
-            )
+            # the features are added in order, the tiles by runTileTasks()
+            createTile(g, minfo, offsetX, offsetY, width, height, tilename, OGRDS, True)
+
+            if g.Resume and os.path.exists(tilename):
+                if nextLevel is None:
+                    tileDone()
+                else:
+                    tasks.append(
+                        (
+                            yIndex,
+                            xIndex,
+                            addExistingTile,
+                            (offsetX, offsetY, width, height, tilename),
+                        )
+                    )
+            else:
+                tasks.append(
+                    (
+                        yIndex,
+                        xIndex,
+                        createTile,
+                        (offsetX, offsetY, width, height, tilename),
+                    )
+                )
 
-            if not g.Quiet and not g.Verbose:
-                processed += 1
-                progress(processed / float(total))
+    runTileTasks(g, minfo, tasks, tileDone, nextLevel)
 
     if g.TileIndexName is not None:
         if g.UseDirForEachRow and not g.PyramidOnly:
@@ -466,7 +916,16 @@ def copyTileIndexToCSV(g, OGRDS, fileName):
 
 
 def createPyramidTile(
-    g, levelMosaicInfo, offsetX, offsetY, width, height, tileName, OGRDS, feature_only
+    g,
+    levelMosaicInfo,
+    offsetX,
+    offsetY,
+    width,
+    height,
+    tileName,
+    OGRDS,
+    feature_only,
+    nextLevel=None,
 ):
 
     temp_tilename = tileName + ".tmp"
@@ -537,6 +996,9 @@ def createPyramidTile(
 
     levelMosaicInfo.closeDataSet(s_fh)
 
+    if nextLevel is not None:
+        nextLevel.addTile(offsetX, offsetY, t_fh)
+
     if g.MemDriver is None:
         t_fh.FlushCache()
     else:
@@ -565,12 +1027,24 @@ def createPyramidTile(
 
 
 def createTile(
-    g, minfo, offsetX, offsetY, width, height, tilename, OGRDS, feature_only
+    g,
+    minfo,
+    offsetX,
+    offsetY,
+    width,
+    height,
+    tilename,
+    OGRDS,
+    feature_only,
+    nextLevel=None,
 ):
     """
 
     Create tile
 
+    nextLevel -- level_buffer the tile is added to, to create the first level
+    of the pyramid from.
+
     """
     temp_tilename = tilename + ".tmp"
 
@@ -640,6 +1114,9 @@ def createTile(
 
     minfo.closeDataSet(s_fh)
 
+    if nextLevel is not None:
+        nextLevel.addTile(offsetX, offsetY, t_fh)
+
     if g.MemDriver is None:
         t_fh.FlushCache()
     else:
@@ -667,6 +1144,42 @@ def createTile(
         )
 
 
+def addExistingTile(
+    g, minfo, offsetX, offsetY, width, height, tilename, OGRDS, feature_only, nextLevel
+):
+    """
+
+    Add the tile already created to nextLevel, when resuming
+
+    """
+    nextLevel.addTile(offsetX, offsetY, gdal.Open(tilename))
+
+
+def addMosaicToLevel(g, minfo, ti, nextLevel):
+    """
+
+    Add the mosaic minfo to nextLevel one row of tiles ti at a time, to
+    create the pyramid without creating the tiles
+
+    """
+    for yIndex in range(1, ti.countTilesY + 1):
+        offsetY = (yIndex - 1) * (ti.tileHeight - ti.overlap)
+        height = ti.tileHeight
+        if offsetY + height > ti.height:
+            height = ti.height - offsetY
+
+        s_fh = minfo.getDataSet(
+            minfo.ulx,
+            minfo.uly + (offsetY + height) * minfo.scaleY,
+            minfo.ulx + ti.width * minfo.scaleX,
+            minfo.uly + offsetY * minfo.scaleY,
+        )
+        if s_fh is None:
+            continue
+        nextLevel.addTile(0, offsetY, s_fh)
+        minfo.closeDataSet(s_fh)
+
+
 def createTileIndex(Verbose, dsName, fieldName, srs, driverName):
     OGRDriver = ogr.GetDriverByName(driverName)
     if OGRDriver is None:
@@ -742,7 +1255,9 @@ def buildPyramid(g, minfo, createdTileIndexDS, tileWidth, tileHeight, overlap):
     inputDS = createdTileIndexDS
     for level in range(1, g.Levels + 1):
         g.LastRowIndx = -1
-        levelMosaicInfo = mosaic_info(minfo.filename, inputDS)
+        levelMosaicInfo = mosaic_info(
+            minfo.filename, inputDS, g.CacheSize, g.CacheBytes
+        )
         levelOutputTileInfo = tile_info(
             int(levelMosaicInfo.xsize / 2),
             int(levelMosaicInfo.ysize / 2),
@@ -765,6 +1280,8 @@ def buildPyramidLevel(g, levelMosaicInfo, levelOutputTileInfo, level):
         g.TileIndexDriverTyp,
     )
 
+    tasks = []
+
     for yIndex in yRange:
         for xIndex in xRange:
             offsetY = (yIndex - 1) * (
@@ -785,7 +1302,7 @@ def buildPyramidLevel(g, levelMosaicInfo, levelOutputTileInfo, level):
                 g, levelMosaicInfo, levelOutputTileInfo, xIndex, yIndex, level
             )
 
-            feature_only = g.Resume and os.path.exists(tilename)
+            # the features are added in order, the tiles by runTileTasks()
             createPyramidTile(
                 g,
                 levelMosaicInfo,
@@ -795,9 +1312,27 @@ def buildPyramidLevel(g, levelMosaicInfo, levelOutputTileInfo, level):
                 height,
                 tilename,
                 OGRDS,
-                feature_only,
+                True,
             )
 
+            if not (g.Resume and os.path.exists(tilename)):
+                tasks.append(
+                    (
+                        yIndex,
+                        xIndex,
+                        createPyramidTile,
+                        (offsetX, offsetY, width, height, tilename),
+                    )
+                )
+
+    runTileTasks(g, levelMosaicInfo, tasks)
+
+    copyLevelTileIndex(g, OGRDS, level)
+
+    return OGRDS
+
+
+def copyLevelTileIndex(g, OGRDS, level):
     if g.TileIndexName is not None:
         shapeName = getTargetDir(g, level) + g.TileIndexName
         copyTileIndexToDisk(g, OGRDS, shapeName)
@@ -806,8 +1341,6 @@ def buildPyramidLevel(g, levelMosaicInfo, levelOutputTileInfo, level):
         csvName = getTargetDir(g, level) + g.CsvFileName
         copyTileIndexToCSV(g, OGRDS, csvName)
 
-    return OGRDS
-
 
 def getTileName(g, minfo, ti, xIndex, yIndex, level=-1):
     """
@@ -874,6 +1407,9 @@ def Usage():
     print("        [-s_srs srs_def]  [-pyramidOnly] -levels numberoflevels")
     print("        [-r {near/bilinear/cubic/cubicspline/lanczos}]")
     print("        [-useDirForEachRow] [-resume]")
+    print("        [-processes numberofprocesses | -threads numberofthreads]")
+    print("        [-cacheSize numberofdatasets] [-cacheMemory megabytes]")
+    print("        [-pyramidInMemory]")
     print("        -targetDir TileDirectory input_files")
     return 2
 
@@ -985,6 +1521,23 @@ def main(args=None, g=None):
             g.UseDirForEachRow = True
         elif arg == "-resume":
             g.Resume = True
+        elif arg == "-processes":
+            i += 1
+            g.Processes = int(argv[i])
+        elif arg == "-threads":
+            i += 1
+            g.Threads = int(argv[i])
+        elif arg == "-cacheSize":
+            i += 1
+            g.CacheSize = int(argv[i])
+            if g.CacheSize < 1:
+                print("Invalid cache size : %d" % g.CacheSize)
+                return 1
+        elif arg == "-cacheMemory":
+            i += 1
+            g.CacheBytes = int(float(argv[i]) * 1024 * 1024)
+        elif arg == "-pyramidInMemory":
+            g.PyramidInMemory = True
         elif arg[:1] == "-":
             print("Unrecognized command option: %s" % arg)
             return Usage()
@@ -1008,6 +1561,14 @@ def main(args=None, g=None):
         print("Missing Directory for Tiles -targetDir")
         return Usage()
 
+    if g.Processes > 1 and g.Threads > 1:
+        print("-processes and -threads are mutually exclusive")
+        return 1
+
+    if g.PyramidInMemory and (g.Processes > 1 or g.Threads > 1):
+        print("-pyramidInMemory cannot be used with -processes or -threads")
+        return 1
+
     # create level 0 directory if needed
     if g.UseDirForEachRow and not g.PyramidOnly:
         leveldir = g.TargetDir + str(0) + os.sep
@@ -1041,7 +1602,7 @@ def main(args=None, g=None):
     if tileIndexDS is None:
         print("Error building tile index")
         return 1
-    minfo = mosaic_info(g.Names[0], tileIndexDS)
+    minfo = mosaic_info(g.Names[0], tileIndexDS, g.CacheSize, g.CacheBytes)
     ti = tile_info(minfo.xsize, minfo.ysize, g.TileWidth, g.TileHeight, g.Overlap)
 
     if g.Source_SRS is None and minfo.projection:
@@ -1054,13 +1615,31 @@ def main(args=None, g=None):
         minfo.report()
         ti.report()
 
+    levelBuffer = None
+    if g.PyramidInMemory and g.Levels > 0:
+        levelBuffer = level_buffer(
+            g,
+            1,
+            ti.width,
+            ti.height,
+            minfo.ulx,
+            minfo.uly,
+            minfo.scaleX,
+            minfo.scaleY,
+            minfo.filename,
+        )
+
     if not g.PyramidOnly:
-        dsCreatedTileIndex = tileImage(g, minfo, ti)
+        dsCreatedTileIndex = tileImage(g, minfo, ti, levelBuffer)
         tileIndexDS.Destroy()
     else:
         dsCreatedTileIndex = tileIndexDS
+        if levelBuffer is not None:
+            addMosaicToLevel(g, minfo, ti, levelBuffer)
 
-    if g.Levels > 0:
+    if levelBuffer is not None:
+        levelBuffer.finish()
+    elif g.Levels > 0:
         buildPyramid(g, minfo, dsCreatedTileIndex, g.TileWidth, g.TileHeight, g.Overlap)
 
     if g.Verbose:
@@ -1095,6 +1674,11 @@ class RetileGlobals:
         "LastRowIndx",
         "UseDirForEachRow",
         "Resume",
+        "Processes",
+        "Threads",
+        "CacheSize",
+        "CacheBytes",
+        "PyramidInMemory",
     ]
 
     def __init__(self):
@@ -1125,6 +1709,11 @@ class RetileGlobals:
         self.LastRowIndx = -1
         self.UseDirForEachRow = False
         self.Resume = False
+        self.Processes = 1
+        self.Threads = 1
+        self.CacheSize = 64
+        self.CacheBytes = None
+        self.PyramidInMemory = False
 
 
 if __name__ == "__main__":
@@ -30,13 +30,29 @@
 # ******************************************************************************
 
 import filecmp
+import math
 import os
 import sys
+import threading
+from collections import Counter
 
 from osgeo import gdal, osr
 
 #######################################################
 from osgeo_utils.auxiliary.base import PathLikeOrStr
+from osgeo_utils.auxiliary.util import get_num_threads, map_in_threads
+
+# number of pixels compared at once, rounded to whole blocks of rows
+CHUNK_PIXELS = 1 << 20
+
+
+def get_option(options, name, default=None):
+    """Return the value of a NAME=VALUE option, or default"""
+    for option in options:
+        key, _, value = option.partition("=")
+        if key.upper() == name:
+            return value
+    return default
 
 
 def compare_metadata(golden_md, new_md, ident, options=None):
@@ -67,28 +83,274 @@ def compare_metadata(golden_md, new_md, ident, options=None):
 
 
 #######################################################
-# Review and report on the actual image pixels that differ.
+# Statistics of the pixels of a band that differ.
+class PixelDiffStats:
+    def __init__(self):
+        self.diff_count = 0
+        self.max_diff = 0
+        # (xmin, ymin, xmax, ymax) of the differing pixels
+        self.bbox = None
+        # differing pixel count by ceil(log10(difference))
+        self.histogram = Counter()
+        # whether the comparison stopped after max_diff_pixels differences
+        self.stopped = False
+
+    def add(self, other):
+        self.diff_count += other.diff_count
+        self.max_diff = max(self.max_diff, other.max_diff)
+        if other.bbox is not None:
+            if self.bbox is None:
+                self.bbox = other.bbox
+            else:
+                self.bbox = (
+                    min(self.bbox[0], other.bbox[0]),
+                    min(self.bbox[1], other.bbox[1]),
+                    max(self.bbox[2], other.bbox[2]),
+                    max(self.bbox[3], other.bbox[3]),
+                )
+        self.histogram.update(other.histogram)
+        self.stopped = self.stopped or other.stopped
+
+
+def get_pixel_chunks(band):
+    """Return the (yoff, ysize) of the chunks of rows of a band, aligned on its blocks"""
+    block_ysize = band.GetBlockSize()[1]
+    chunk_ysize = block_ysize * max(1, CHUNK_PIXELS // (band.XSize * block_ysize))
+    return [
+        (yoff, min(chunk_ysize, band.YSize - yoff))
+        for yoff in range(0, band.YSize, chunk_ysize)
+    ]
+
+
+def compare_pixel_chunk(golden_band, new_band, yoff, ysize, tolerance=0):
+    """Compare the pixels of a chunk of rows of two bands"""
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    if np is None:
+        # Without numpy, only identical pixels can be compared
+        buf_type = gdal.GDT_CFloat64
+        if not any(
+            gdal.DataTypeIsComplex(band.DataType) for band in (golden_band, new_band)
+        ):
+            buf_type = gdal.GDT_Float64
+        golden = golden_band.ReadRaster(
+            0, yoff, golden_band.XSize, ysize, buf_type=buf_type
+        )
+        new = new_band.ReadRaster(0, yoff, golden_band.XSize, ysize, buf_type=buf_type)
+        if golden == new:
+            return PixelDiffStats()
+        raise ImportError("numpy is required to compare differing pixels")
+
+    golden = golden_band.ReadAsArray(0, yoff, golden_band.XSize, ysize)
+    new = new_band.ReadAsArray(0, yoff, golden_band.XSize, ysize)
+
+    dtype = (
+        np.complex128 if np.iscomplexobj(golden) or np.iscomplexobj(new) else np.float64
+    )
+    golden = golden.astype(dtype)
+    new = new.astype(dtype)
+    diff = np.abs(golden - new)
+    nan = np.isnan(diff)
+    if nan.any():
+        # NaN equals NaN, and differs infinitely from any other value
+        diff[nan] = np.where(np.isnan(golden[nan]) & np.isnan(new[nan]), 0, np.inf)
+
+    stats = PixelDiffStats()
+    stats.max_diff = diff.max() if diff.size else 0
+    differs = diff > tolerance
+    stats.diff_count = int(np.count_nonzero(differs))
+    if stats.diff_count:
+        rows, cols = np.nonzero(differs)
+        stats.bbox = (
+            int(cols.min()),
+            yoff + int(rows.min()),
+            int(cols.max()),
+            yoff + int(rows.max()),
+        )
+        exponents, counts = np.unique(
+            np.ceil(np.log10(diff[differs])), return_counts=True
+        )
+        stats.histogram.update(dict(zip(exponents.tolist(), counts.tolist())))
+    return stats
+
+
+#######################################################
+# Review the actual image pixels that differ, block row by block row.
 def compare_image_pixels(golden_band, new_band, ident, options=None):
     # pylint: disable=unused-argument
 
-    diff_count = 0
-    max_diff = 0
+    options = [] if options is None else options
+    tolerance = float(get_option(options, "TOLERANCE", 0))
+    max_diff_pixels = int(get_option(options, "MAX_DIFF_PIXELS", 0))
+
+    stats = PixelDiffStats()
+    for yoff, ysize in get_pixel_chunks(golden_band):
+        if max_diff_pixels and stats.diff_count >= max_diff_pixels:
+            stats.stopped = True
+            break
+        stats.add(compare_pixel_chunk(golden_band, new_band, yoff, ysize, tolerance))
+
+    return stats
+
+
+def report_image_pixels(stats, options=None):
+    options = [] if options is None else options
+
+    if stats.stopped:
+        print("  Pixels Differing: at least " + str(stats.diff_count))
+    else:
+        print("  Pixels Differing: " + str(stats.diff_count))
+    print("  Maximum Pixel Difference: " + str(stats.max_diff))
+    print("  Differing Pixels Bounding Box: (%d,%d) - (%d,%d)" % stats.bbox)
+
+    if "PIXEL_STATS" in options:
+        print("  Histogram of Differences:")
+        for exponent, count in sorted(stats.histogram.items()):
+            if math.isinf(exponent):
+                print("    infinite: %d" % count)
+            else:
+                print(
+                    "    (%g, %g]: %d" % (10 ** (exponent - 1), 10**exponent, count)
+                )
+
+
+def get_pixel_comparisons(golden_band, new_band, ident, path):
+    """
+    Return the (ident, path) of the band, and of the overviews and mask bands
+    whose pixels compare_band() compares, path being the band number followed by
+    overview indices or "mask"
+    """
+    comparisons = []
+    if (golden_band.XSize, golden_band.YSize) == (new_band.XSize, new_band.YSize):
+        comparisons.append((ident, path))
+    if golden_band.GetOverviewCount() == new_band.GetOverviewCount():
+        for i in range(golden_band.GetOverviewCount()):
+            comparisons += get_pixel_comparisons(
+                golden_band.GetOverview(i),
+                new_band.GetOverview(i),
+                ident + " overview " + str(i),
+                path + (i,),
+            )
+    if golden_band.GetMaskFlags() == new_band.GetMaskFlags() and (
+        golden_band.GetMaskFlags() in (gdal.GMF_PER_DATASET, 0)
+    ):
+        comparisons += get_pixel_comparisons(
+            golden_band.GetMaskBand(),
+            new_band.GetMaskBand(),
+            ident + " mask band",
+            path + ("mask",),
+        )
+    return comparisons
+
+
+def get_band_by_path(ds, path):
+    band = ds.GetRasterBand(path[0])
+    for step in path[1:]:
+        band = band.GetMaskBand() if step == "mask" else band.GetOverview(step)
+    return band
+
+
+def reopen_ds(ds):
+    """
+    Return a new handle of a dataset, opened from its description, or None if it
+    cannot be reopened
+    """
+    filename = ds.GetDescription()
+    if not filename or ds.GetDriver().ShortName == "MEM":
+        return None
+    gdal.PushErrorHandler("CPLQuietErrorHandler")
+    try:
+        return gdal.OpenEx(filename, gdal.OF_RASTER)
+    except RuntimeError:
+        return None
+    finally:
+        gdal.PopErrorHandler()
+
+
+def compare_db_pixels(golden_db, new_db, options=None):
+    """
+    Compare the pixels of all the bands, overviews and mask bands of two
+    datasets, by chunks of rows compared in parallel with the NUM_THREADS option.
+    Each thread reads the datasets through its own handles, reopened from their
+    descriptions after flushing them. Datasets that cannot be reopened, such as
+    MEM ones, are compared in a single thread.
+
+    returns a dictionary of the PixelDiffStats by band ident
+    """
+    options = [] if options is None else options
+    tolerance = float(get_option(options, "TOLERANCE", 0))
+    max_diff_pixels = int(get_option(options, "MAX_DIFF_PIXELS", 0))
+    num_threads = get_num_threads(get_option(options, "NUM_THREADS"))
 
-    for line in range(golden_band.YSize):
-        golden_line = golden_band.ReadAsArray(0, line, golden_band.XSize, 1)[0]
-        new_line = new_band.ReadAsArray(0, line, golden_band.XSize, 1)[0]
-        diff_line = golden_line.astype(float) - new_line.astype(float)
-        max_diff = max(max_diff, abs(diff_line).max())
-        diff_count += len(diff_line.nonzero()[0])
+    comparisons = []
+    for i in range(golden_db.RasterCount):
+        comparisons += get_pixel_comparisons(
+            golden_db.GetRasterBand(i + 1),
+            new_db.GetRasterBand(i + 1),
+            str(i + 1),
+            (i + 1,),
+        )
+    stats = {ident: PixelDiffStats() for ident, _ in comparisons}
+    tasks = [
+        (ident, path, yoff, ysize)
+        for ident, path in comparisons
+        for yoff, ysize in get_pixel_chunks(get_band_by_path(golden_db, path))
+    ]
+
+    # Handles reopened for the threads, the first ones being checked here
+    spare_dbs = []
+    if num_threads > 1:
+        # for the reopened handles to see pending writes
+        golden_db.FlushCache()
+        new_db.FlushCache()
+        dbs = tuple(reopen_ds(ds) for ds in (golden_db, new_db))
+        if None in dbs:
+            num_threads = 1
+        else:
+            spare_dbs.append(dbs)
+    thread_local = threading.local()
+    stats_lock = threading.Lock()
+
+    def compare_task(task):
+        ident, path, yoff, ysize = task
+        if max_diff_pixels and stats[ident].diff_count >= max_diff_pixels:
+            stats[ident].stopped = True
+            return
+        if num_threads == 1:
+            dbs = golden_db, new_db
+        else:
+            dbs = getattr(thread_local, "dbs", None)
+            if dbs is None:
+                with stats_lock:
+                    dbs = spare_dbs.pop() if spare_dbs else None
+                if dbs is None:
+                    dbs = tuple(
+                        gdal.OpenEx(ds.GetDescription(), gdal.OF_RASTER)
+                        for ds in (golden_db, new_db)
+                    )
+                thread_local.dbs = dbs
+        golden_band, new_band = (get_band_by_path(ds, path) for ds in dbs)
+        chunk_stats = compare_pixel_chunk(golden_band, new_band, yoff, ysize, tolerance)
+        with stats_lock:
+            stats[ident].add(chunk_stats)
+
+    if num_threads == 1:
+        results = map(compare_task, tasks)
+    else:
+        results = map_in_threads(compare_task, tasks, num_threads)
+    for _ in results:
+        pass
 
-    print("  Pixels Differing: " + str(diff_count))
-    print("  Maximum Pixel Difference: " + str(max_diff))
+    return stats
 
 
 #######################################################
 
 
-def compare_band(golden_band, new_band, ident, options=None):
+def compare_band(golden_band, new_band, ident, options=None, pixel_stats=None):
     found_diff = 0
 
     options = [] if options is None else options
@@ -117,12 +379,21 @@ def compare_band(golden_band, new_band, ident, options=None):
         )
         found_diff += 1
 
-    if golden_band.Checksum() != new_band.Checksum():
-        print("Band %s checksum difference:" % ident)
-        print("  Golden: " + str(golden_band.Checksum()))
-        print("  New:    " + str(new_band.Checksum()))
+    # Pixels, compared in a single pass instead of first comparing checksums
+    if (golden_band.XSize, golden_band.YSize) != (new_band.XSize, new_band.YSize):
+        print("Band %s size difference:" % ident)
+        print("  Golden: [%d,%d]" % (golden_band.XSize, golden_band.YSize))
+        print("  New:    [%d,%d]" % (new_band.XSize, new_band.YSize))
+        found_diff += 1
+        stats = PixelDiffStats()
+    elif pixel_stats is not None and ident in pixel_stats:
+        stats = pixel_stats[ident]
+    else:
+        stats = compare_image_pixels(golden_band, new_band, ident, options)
+    if stats.diff_count:
+        print("Band %s pixel values differ:" % ident)
+        report_image_pixels(stats, options)
         found_diff += 1
-        compare_image_pixels(golden_band, new_band, ident, options)
 
     # Check overviews
     if golden_band.GetOverviewCount() != new_band.GetOverviewCount():
@@ -137,6 +408,7 @@ def compare_band(golden_band, new_band, ident, options=None):
                 new_band.GetOverview(i),
                 ident + " overview " + str(i),
                 options,
+                pixel_stats,
             )
 
     # Metadata
@@ -157,6 +429,7 @@ def compare_band(golden_band, new_band, ident, options=None):
             new_band.GetMaskBand(),
             ident + " mask band",
             options,
+            pixel_stats,
         )
 
     # TODO: Color Table, gain/bias, units, blocksize, min/max
@@ -241,12 +514,14 @@ def compare_db(golden_db, new_db, options=None):
 
     # If so-far-so-good, then compare pixels
     if found_diff == 0:
+        pixel_stats = compare_db_pixels(golden_db, new_db, options)
         for i in range(golden_db.RasterCount):
             found_diff += compare_band(
                 golden_db.GetRasterBand(i + 1),
                 new_db.GetRasterBand(i + 1),
                 str(i + 1),
                 options,
+                pixel_stats,
             )
 
     return found_diff
@@ -285,7 +560,10 @@ def compare_sds(golden_db, new_db, options=None):
 
 
 def find_diff(
-    golden_file: PathLikeOrStr, new_file: PathLikeOrStr, check_sds: bool = False
+    golden_file: PathLikeOrStr,
+    new_file: PathLikeOrStr,
+    check_sds: bool = False,
+    options=None,
 ):
     # Compare Files
     found_diff = 0
@@ -303,10 +581,10 @@ def find_diff(
     # compare as GDAL Datasets.
     golden_db = gdal.Open(golden_file)
     new_db = gdal.Open(new_file)
-    found_diff += compare_db(golden_db, new_db)
+    found_diff += compare_db(golden_db, new_db, options)
 
     if check_sds:
-        found_diff += compare_sds(golden_db, new_db)
+        found_diff += compare_sds(golden_db, new_db, options)
 
     return found_diff
 
@@ -315,7 +593,11 @@ def find_diff(
 
 
 def Usage():
-    print("Usage: gdalcompare.py [-sds] <golden_file> <new_file>")
+    print(
+        "Usage: gdalcompare.py [-sds] [-tolerance value] [-max_diff_pixels count]\n"
+        "                      [-stats] [-threads count|ALL_CPUS]\n"
+        "                      <golden_file> <new_file>"
+    )
     return 2
 
 
@@ -338,6 +620,7 @@ def main(argv=sys.argv):
     golden_file = None
     new_file = None
     check_sds = 0
+    options = []
 
     i = 1
     while i < len(argv):
@@ -345,6 +628,21 @@ def main(argv=sys.argv):
         if argv[i] == "-sds":
             check_sds = 1
 
+        elif argv[i] == "-tolerance" and i < len(argv) - 1:
+            options.append("TOLERANCE=" + argv[i + 1])
+            i = i + 1
+
+        elif argv[i] == "-max_diff_pixels" and i < len(argv) - 1:
+            options.append("MAX_DIFF_PIXELS=" + argv[i + 1])
+            i = i + 1
+
+        elif argv[i] == "-stats":
+            options.append("PIXEL_STATS")
+
+        elif argv[i] == "-threads" and i < len(argv) - 1:
+            options.append("NUM_THREADS=" + argv[i + 1])
+            i = i + 1
+
         elif golden_file is None:
             golden_file = argv[i]
 
@@ -358,7 +656,7 @@ def main(argv=sys.argv):
         i = i + 1
         # next argument
 
-    found_diff = find_diff(golden_file, new_file, check_sds)
+    found_diff = find_diff(golden_file, new_file, check_sds, options)
     print("Differences Found: " + str(found_diff))
     sys.exit(found_diff)
 
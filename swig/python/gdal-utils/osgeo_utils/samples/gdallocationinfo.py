@@ -79,6 +79,163 @@ CoordinateTransformationOrSRS = Optional[
     Union[osr.CoordinateTransformation, LocationInfoSRS, AnySRS]
 ]
 
+resample_algs = {
+    "near": gdalconst.GRIORA_NearestNeighbour,
+    "bilinear": gdalconst.GRIORA_Bilinear,
+    "cubic": gdalconst.GRIORA_Cubic,
+}
+
+# maximum number of points sampled at once by sample_points()
+CHUNK_POINTS = 1 << 16
+
+
+def bilinear_kernel(d: np.ndarray) -> np.ndarray:
+    return np.maximum(0, 1 - np.abs(d))
+
+
+def cubic_kernel(d: np.ndarray) -> np.ndarray:
+    """the cubic convolution kernel of GDAL (a = -0.5)"""
+    d = np.abs(d)
+    return np.where(
+        d < 1,
+        (1.5 * d - 2.5) * d * d + 1,
+        np.where(d < 2, ((-0.5 * d + 2.5) * d - 4) * d + 2, 0),
+    )
+
+
+# kernel size and kernel function of the resampling algorithms of sample_points()
+sample_kernels = {
+    gdalconst.GRIORA_NearestNeighbour: (1, None),
+    gdalconst.GRIORA_Bilinear: (2, bilinear_kernel),
+    gdalconst.GRIORA_Cubic: (4, cubic_kernel),
+}
+
+
+def get_kernel_taps(
+    coords: np.ndarray, size: int, kernel_size: int, kernel
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    returns the indices of the pixels of the kernel centered on each coordinate
+    (-1 outside [0, size)), and their weights (None for the nearest neighbour)
+    """
+    if kernel is None:
+        taps = np.floor(coords + 1e-10).astype(np.int64)
+        return np.minimum(taps, size - 1)[:, np.newaxis], None
+    first = np.floor(coords - 0.5).astype(np.int64) - (kernel_size // 2 - 1)
+    taps = first[:, np.newaxis] + np.arange(kernel_size)
+    weights = kernel(taps + 0.5 - coords[:, np.newaxis])
+    outside = (taps < 0) | (taps >= size)
+    taps[outside] = -1
+    weights[outside] = 0
+    return taps, weights
+
+
+def round_to_dtype(values: np.ndarray, dtype) -> np.ndarray:
+    if not np.issubdtype(dtype, np.integer):
+        return values.astype(dtype)
+    info = np.iinfo(dtype)
+    values = np.trunc(values + np.copysign(0.5, values))
+    return np.clip(values, info.min, info.max).astype(dtype)
+
+
+def sample_points(
+    bands: Sequence[gdal.Band],
+    pixels: np.ndarray,
+    lines: np.ndarray,
+    resample_alg=gdalconst.GRIORA_NearestNeighbour,
+    dtype=np.float64,
+) -> np.ndarray:
+    """
+    Samples the bands at pixel/line coordinates with the nearest neighbour,
+    bilinear or cubic resampling, as RasterIO of 1x1 windows centered on them.
+
+    The points are sorted by the block of their pixel. The blocks needed by
+    the kernels of each chunk of points are read once per band, and the values
+    are gathered and interpolated with numpy.
+    The pixels outside the raster or equal to the nodata value are left out of
+    the kernels. The points outside the raster, or without any valid pixel,
+    get the nodata value of the band (or 0).
+
+    returns an array of shape (band count, point count)
+    """
+    kernel_size, kernel = sample_kernels[resample_alg]
+    xsize, ysize = bands[0].XSize, bands[0].YSize
+    block_xsize, block_ysize = bands[0].GetBlockSize()
+    x_blocks = (xsize + block_xsize - 1) // block_xsize
+    nodata_values = [band.GetNoDataValue() for band in bands]
+
+    results = np.empty((len(bands), len(pixels)), dtype=dtype)
+    for bnd_idx, nodata in enumerate(nodata_values):
+        results[bnd_idx] = 0 if nodata is None else nodata
+
+    pixels = np.asarray(pixels, dtype=np.float64)
+    lines = np.asarray(lines, dtype=np.float64)
+    points = np.flatnonzero(
+        (pixels >= 0) & (pixels < xsize) & (lines >= 0) & (lines < ysize)
+    )
+    point_blocks = (lines[points] // block_ysize).astype(np.int64) * x_blocks + (
+        pixels[points] // block_xsize
+    ).astype(np.int64)
+    points = points[np.argsort(point_blocks, kind="stable")]
+
+    for start in range(0, len(points), CHUNK_POINTS):
+        chunk = points[start : start + CHUNK_POINTS]
+        cols, weights_x = get_kernel_taps(pixels[chunk], xsize, kernel_size, kernel)
+        rows, weights_y = get_kernel_taps(lines[chunk], ysize, kernel_size, kernel)
+
+        # the pixels of the kernel of each point, of shape (points, taps)
+        taps_shape = (len(chunk), rows.shape[1], cols.shape[1])
+        cols = np.broadcast_to(cols[:, np.newaxis, :], taps_shape)
+        rows = np.broadcast_to(rows[:, :, np.newaxis], taps_shape)
+        cols = cols.reshape(len(chunk), -1)
+        rows = rows.reshape(len(chunk), -1)
+        valid = (cols >= 0) & (rows >= 0)
+        taps = np.flatnonzero(valid)
+        tap_cols = cols.ravel()[taps]
+        tap_rows = rows.ravel()[taps]
+        if kernel is not None:
+            weights = weights_y[:, :, np.newaxis] * weights_x[:, np.newaxis, :]
+            weights = weights.reshape(len(chunk), -1)
+
+        # the pixels grouped by block
+        tap_blocks = (tap_rows // block_ysize) * x_blocks + tap_cols // block_xsize
+        order = np.argsort(tap_blocks, kind="stable")
+        groups = np.split(order, np.flatnonzero(np.diff(tap_blocks[order])) + 1)
+
+        for bnd_idx, (band, nodata) in enumerate(zip(bands, nodata_values)):
+            values = np.zeros(cols.shape, dtype=dtype if kernel is None else np.float64)
+            flat_values = values.reshape(-1)
+            for group in groups:
+                block = int(tap_blocks[group[0]])
+                xoff = (block % x_blocks) * block_xsize
+                yoff = (block // x_blocks) * block_ysize
+                data = band.ReadAsArray(
+                    xoff,
+                    yoff,
+                    min(block_xsize, xsize - xoff),
+                    min(block_ysize, ysize - yoff),
+                )
+                flat_values[taps[group]] = data[
+                    tap_rows[group] - yoff, tap_cols[group] - xoff
+                ]
+
+            if kernel is None:
+                results[bnd_idx, chunk] = values[:, 0]
+                continue
+            band_weights = weights * valid
+            if nodata is not None:
+                is_nodata = np.isnan(values) if np.isnan(nodata) else values == nodata
+                band_weights[is_nodata] = 0
+            values[band_weights == 0] = 0
+            total = band_weights.sum(axis=1)
+            interpolated = total != 0
+            results[bnd_idx, chunk[interpolated]] = round_to_dtype(
+                (band_weights * values).sum(axis=1)[interpolated] / total[interpolated],
+                dtype,
+            )
+
+    return results
+
 
 def gdallocationinfo(
     filename_or_ds: PathOrDS,
@@ -164,7 +321,6 @@ def gdallocationinfo(
 
     shape = (bnd_count, point_count)
     np_dtype, np_dtype = GDALTypeCodeAndNumericTypeCodeFromDataSet(ds)
-    results = np.empty(shape=shape, dtype=np_dtype)
 
     check_outside = not quiet_mode or not allow_xy_outside_extent
     if check_outside and (
@@ -192,29 +348,35 @@ def gdallocationinfo(
     else:
         lines_q = y * line_fact
 
-    buf_xsize = buf_ysize = 1
-    buf_type, typecode = GDALTypeCodeAndNumericTypeCodeFromDataSet(ds)
-    buf_obj = np.empty([buf_ysize, buf_xsize], dtype=typecode)
-
-    for idx, (pixel, line) in enumerate(zip(pixels_q, lines_q)):
-        for bnd_idx, band in enumerate(bands):
-            if (
-                BandRasterIONumPy(
-                    band,
-                    0,
-                    pixel - 0.5,
-                    line - 0.5,
-                    1,
-                    1,
-                    buf_obj,
-                    buf_type,
-                    resample_alg,
-                    None,
-                    None,
-                )
-                == 0
-            ):
-                results[bnd_idx][idx] = buf_obj[0][0]
+    if resample_alg in sample_kernels and not np.issubdtype(
+        np_dtype, np.complexfloating
+    ):
+        results = sample_points(bands, pixels_q, lines_q, resample_alg, np_dtype)
+    else:
+        results = np.empty(shape=shape, dtype=np_dtype)
+        buf_xsize = buf_ysize = 1
+        buf_type, typecode = GDALTypeCodeAndNumericTypeCodeFromDataSet(ds)
+        buf_obj = np.empty([buf_ysize, buf_xsize], dtype=typecode)
+
+        for idx, (pixel, line) in enumerate(zip(pixels_q, lines_q)):
+            for bnd_idx, band in enumerate(bands):
+                if (
+                    BandRasterIONumPy(
+                        band,
+                        0,
+                        pixel - 0.5,
+                        line - 0.5,
+                        1,
+                        1,
+                        buf_obj,
+                        buf_type,
+                        resample_alg,
+                        None,
+                        None,
+                    )
+                    == 0
+                ):
+                    results[bnd_idx][idx] = buf_obj[0][0]
 
     is_scaled, scales, offsets = get_scales_and_offsets(bands)
     if is_scaled:
@@ -430,12 +592,20 @@ class GDALLocationInfo(GDALScript):
             "otherwise a warning will be issued (unless quiet).",
         )
 
-        parser.add_argument(
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
             "-interp",
             dest="resample_alg",
             action="store_true",
             help="If set, a Bilinear interpolation would be used, otherwise the NearestNeighbour sampling.",
         )
+        group.add_argument(
+            "-r",
+            dest="resample_alg_name",
+            choices=list(resample_algs),
+            type=str,
+            help="Resampling algorithm of the values at the locations (default near).",
+        )
 
         parser.add_argument(
             "-b",
@@ -535,13 +705,15 @@ class GDALLocationInfo(GDALScript):
         else:
             kwargs["output_mode"] = LocationInfoOutput.PixelLineValVerbose
 
-        kwargs["resample_alg"] = (
-            gdal.GRIORA_Bilinear
-            if kwargs["resample_alg"]
-            else gdal.GRIORA_NearestNeighbour
-        )
+        if kwargs["resample_alg"]:
+            kwargs["resample_alg"] = gdal.GRIORA_Bilinear
+        elif kwargs["resample_alg_name"]:
+            kwargs["resample_alg"] = resample_algs[kwargs["resample_alg_name"]]
+        else:
+            kwargs["resample_alg"] = gdal.GRIORA_NearestNeighbour
 
         del kwargs["xy"]
+        del kwargs["resample_alg_name"]
 
         del kwargs["geoloc"]
         del kwargs["llgeoloc"]
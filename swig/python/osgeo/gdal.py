@@ -2702,6 +2702,20 @@ class Dataset(MajorObject):
                                             callback=callback,
                                             callback_data=callback_data)
 
+    def SamplePoints(self, xs, ys,
+                     band_list=None,
+                     resample_alg=gdalconst.GRIORA_NearestNeighbour,
+                     georeferenced=False):
+        """Sample the bands (all by default) at arrays of x and y coordinates, as
+        Band.SamplePoints(). A float64 array of shape (len(band_list),) + xs.shape is returned"""
+
+        from osgeo import gdal_array
+
+        return gdal_array.DatasetSamplePoints(self, xs, ys,
+                                              band_list=band_list,
+                                              resample_alg=resample_alg,
+                                              georeferenced=georeferenced)
+
     def WriteRaster(self, xoff, yoff, xsize, ysize,
                     buf_string,
                     buf_xsize=None, buf_ysize=None, buf_type=None,
@@ -4077,6 +4091,21 @@ class Band(MajorObject):
                                           callback=callback,
                                           callback_data=callback_data)
 
+    def SamplePoints(self, xs, ys,
+                     resample_alg=gdalconst.GRIORA_NearestNeighbour,
+                     georeferenced=False):
+        """Sample the band at arrays of x and y coordinates, in pixel/line space, or in the
+        georeferenced space of its dataset if georeferenced is set. The points are grouped by
+        block and read without holding the GIL. The nearest neighbour, bilinear and cubic
+        resampling algorithms are supported. A float64 array of the shape of xs is returned,
+        with the nodata value (or 0) for the points outside of the raster"""
+
+        from osgeo import gdal_array
+
+        return gdal_array.BandSamplePoints(self, xs, ys,
+                                            resample_alg=resample_alg,
+                                            georeferenced=georeferenced)
+
     def GetVirtualMemArray(self, eAccess=gdalconst.GF_Read, xoff=0, yoff=0,
                            xsize=None, ysize=None, bufxsize=None, bufysize=None,
                            datatype=None,
@@ -110,6 +110,10 @@ def BandRasterIONumPy(band: "Band", bWrite: "int", xoff: "double", yoff: "double
     r"""BandRasterIONumPy(Band band, int bWrite, double xoff, double yoff, double xsize, double ysize, PyArrayObject * psArray, GDALDataType buf_type, GDALRIOResampleAlg resample_alg, GDALProgressFunc callback=0, void * callback_data=None) -> CPLErr"""
     return _gdal_array.BandRasterIONumPy(band, bWrite, xoff, yoff, xsize, ysize, psArray, buf_type, resample_alg, callback, callback_data)
 
+def BandSamplePointsNumPy(band: "Band", psXArray: "PyArrayObject *", psYArray: "PyArrayObject *", psArray: "PyArrayObject *", resample_alg: "GDALRIOResampleAlg") -> "CPLErr":
+    r"""BandSamplePointsNumPy(Band band, PyArrayObject * psXArray, PyArrayObject * psYArray, PyArrayObject * psArray, GDALRIOResampleAlg resample_alg) -> CPLErr"""
+    return _gdal_array.BandSamplePointsNumPy(band, psXArray, psYArray, psArray, resample_alg)
+
 def DatasetIONumPy(ds: "Dataset", bWrite: "int", xoff: "double", yoff: "double", xsize: "double", ysize: "double", psArray: "PyArrayObject *", buf_type: "GDALDataType", resample_alg: "GDALRIOResampleAlg", callback: "GDALProgressFunc"=0, callback_data: "void *"=None, binterleave: "bool"=True, band_list: "int"=0) -> "CPLErr":
     r"""DatasetIONumPy(Dataset ds, int bWrite, double xoff, double yoff, double xsize, double ysize, PyArrayObject * psArray, GDALDataType buf_type, GDALRIOResampleAlg resample_alg, GDALProgressFunc callback=0, void * callback_data=None, bool binterleave=True, int band_list=0) -> CPLErr"""
     return _gdal_array.DatasetIONumPy(ds, bWrite, xoff, yoff, xsize, ysize, psArray, buf_type, resample_alg, callback, callback_data, binterleave, band_list)
@@ -491,6 +495,66 @@ def BandWriteArray(band, array, xoff=0, yoff=0,
         _RaiseException()
     return ret
 
+def _SamplePointsPixelLine(ds, xs, ys):
+    """Convert the coordinates to float64 arrays, and from the georeferenced
+    space of ds to pixel/line space if ds is not None."""
+
+    xs = numpy.asarray(xs, dtype=numpy.float64)
+    ys = numpy.asarray(ys, dtype=numpy.float64)
+    if xs.shape != ys.shape:
+        raise ValueError("xs and ys should have the same shape")
+    if ds is None:
+        return xs, ys
+
+    gt = ds.GetGeoTransform(can_return_null=True)
+    if gt is None:
+        raise ValueError("dataset has no geotransform")
+    inv_gt = gdal.InvGeoTransform(gt)
+    if inv_gt is None:
+        raise ValueError("cannot invert the geotransform")
+    return (inv_gt[0] + inv_gt[1] * xs + inv_gt[2] * ys,
+            inv_gt[3] + inv_gt[4] * xs + inv_gt[5] * ys)
+
+def BandSamplePoints(band, xs, ys, resample_alg=gdal.GRIORA_NearestNeighbour,
+                     georeferenced=False):
+    """Sample a GDAL band at arrays of x and y coordinates into a float64
+    array.  Used by the gdal.Band.SamplePoints method."""
+
+    if georeferenced:
+        ds = band.GetDataset()
+        if ds is None:
+            raise ValueError("band has no dataset")
+    else:
+        ds = None
+    xs, ys = _SamplePointsPixelLine(ds, xs, ys)
+
+    values = numpy.empty(xs.shape, dtype=numpy.float64)
+    if BandSamplePointsNumPy(band, xs.reshape(-1), ys.reshape(-1),
+                             values.reshape(-1), resample_alg) != 0:
+        _RaiseException()
+        return None
+
+    return values
+
+def DatasetSamplePoints(ds, xs, ys, band_list=None,
+                        resample_alg=gdal.GRIORA_NearestNeighbour,
+                        georeferenced=False):
+    """Sample bands of a GDAL dataset at arrays of x and y coordinates into a
+    float64 array.  Used by the gdal.Dataset.SamplePoints method."""
+
+    if band_list is None:
+        band_list = range(1, ds.RasterCount + 1)
+    xs, ys = _SamplePointsPixelLine(ds if georeferenced else None, xs, ys)
+
+    values = numpy.empty((len(band_list),) + xs.shape, dtype=numpy.float64)
+    for i, band_num in enumerate(band_list):
+        band = ds.GetRasterBand(band_num)
+        if band is None:
+            raise ValueError("invalid band number %d" % band_num)
+        values[i] = BandSamplePoints(band, xs, ys, resample_alg=resample_alg)
+
+    return values
+
 def _ExtendedDataTypeToNumPyDataType(dt):
     klass = dt.GetClass()
 